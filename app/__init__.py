@@ -5,47 +5,48 @@ registers commands, and manages the REPL (Read, Evaluate, Print, Loop) that allo
 interact with various commands.
 
 The `App` class supports:
-- Dynamic loading of commands from the `plugins` directory.
-- Manually registering the `MenuCommand`.
+- Dynamic loading of commands from the `plugins` directory, importing each plugin lazily.
+- Manually registering the `MenuCommand` and the `StatsCommand`.
+- Writing per-command latency statistics to COMMAND_STATS_FILE as JSON on exit.
 - Handling user input in a continuous loop, where users can execute commands or exit the app.
+- An asyncio-based REPL in which slow commands run in the background while the prompt
+  stays usable.
+- Replaying a script of commands without prompts, with buffered output and a summary.
+- Serving the commands and the calculator over HTTP/JSON (see `app.server`).
+- Restoring the calculation history from the log file named in HISTORY_LOG_FILE, and
+  sharing it with other processes through the file named in HISTORY_SHARED_FILE.
+- An explicit, idempotent `bootstrap` step that loads `.env` and configures logging.
 
 Modules used:
-- `pkgutil`: For walking through packages and finding modules in the plugins directory.
-- `importlib`: For dynamically importing plugin modules.
+- `app.plugin_manifest`: For discovering plugin commands through a cached manifest.
 - `os`: For file path operations.
 - `dotenv`: For loading environment variables from a `.env` file.
-- `logging`: For logging application behavior and errors.
+- `logging`: For logging application behavior and errors, through `app.log_pipeline`.
 """
 
-import pkgutil
-import importlib
+import asyncio
+import atexit
 import os
 import logging
+import queue
+import threading
+from contextlib import redirect_stdout
 from dotenv import load_dotenv
-from app.commands import CommandHandler
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.history_log import HistoryLog
+from app.calculator.shared_history import SharedHistory
+from app.commands import CommandHandler, redirected_input, scripted_input
+from app.log_pipeline import configure_logging
+from app.plugin_manifest import DEFAULT_MANIFEST_FILE, PluginManifest
 from app.plugins.menu import MenuCommand
-from app.commands import Command
+from app.plugins.stats import StatsCommand
 
-# Load environment variables from the .env file
-load_dotenv()
+LOG_DIR = 'logs'
 
-# Create 'log' folder if it doesn't exist
-if not os.path.exists('logs'):
-    os.makedirs('logs')
-
-# Configure logging to write to a file in the 'log' folder
-log_file = os.path.join('logs', 'app.log')
-logging.basicConfig(
-    level=logging.DEBUG if os.getenv("DEBUG") == "true" else logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),  # Log to file
-        logging.StreamHandler()         # Log to console
-    ]
-)
-
-if os.getenv("ENVIRONMENT") != "production":
-    load_dotenv()
+# Seconds the asyncio REPL waits, after starting a command or answering one, for the
+# command to finish or ask for more input before prompting again; commands still
+# running after that continue in the background
+COMMAND_START_GRACE = 0.05
 
 class App:
     """
@@ -57,49 +58,112 @@ class App:
         command_handler (CommandHandler): 
         An instance of `CommandHandler` used to register and execute commands.
     """
+    _bootstrapped = False
+
+    @classmethod
+    def bootstrap(cls):
+        """
+        Prepare the process for running the app. Only the first call has any effect.
+
+        - Loads environment variables from the `.env` file.
+        - Creates the 'logs' folder and configures queued logging to a file and the
+          console (see `app.log_pipeline`).
+        - Applies the history settings from the environment.
+
+        Importing `app` does none of this, so modules that only need e.g. `Calculator`
+        stay free of side effects.
+        """
+        if cls._bootstrapped:
+            return
+        cls._bootstrapped = True
+
+        # Load environment variables from the .env file
+        load_dotenv()
+
+        # Create 'logs' folder if it doesn't exist
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        # Configure logging to write to a file in the 'logs' folder and the console,
+        # through a queue drained by a background thread
+        configure_logging(logging.DEBUG if os.getenv("DEBUG") == "true" else logging.INFO,
+                          os.path.join(LOG_DIR, 'app.log'))
+
+        CalculationsHistory.configure()
+
     def __init__(self):
+        self.bootstrap()
         self.command_handler = CommandHandler()
         self.environment = os.getenv("ENVIRONMENT", "production")
         self.debug = os.getenv("DEBUG", "false").lower() == 'true'
         
         # Log the startup message
-        logging.info(f"App started in {self.environment} environment.")
+        logging.info("App started in %s environment.", self.environment)
         
         if self.debug:
             logging.debug("Debugging is enabled.")
 
+        stats_file = os.getenv("COMMAND_STATS_FILE")
+        if stats_file:
+            self.dump_stats_on_exit(stats_file)
+
+    def dump_stats_on_exit(self, path):
+        """
+        Write the per-command latency statistics to a JSON file when the process exits.
+
+        Args:
+            path (str): The output file.
+        """
+        atexit.register(self.command_handler.stats.dump, path)
+
     def load_plugins(self):
-        """Dynamically load all command modules in the plugins directory, 
-           including subdirectories."""
+        """
+        Register every command in the plugins directory, including subdirectories.
+
+        Commands are read from the cached plugin manifest (see `app.plugin_manifest`)
+        and registered as lazy proxies, so a plugin module is only imported when its
+        command is first executed.
+        """
         plugins_package = 'app.plugins'
         package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plugins')
+        manifest = PluginManifest(package_dir, plugins_package,
+                                  os.getenv("PLUGIN_MANIFEST_FILE", DEFAULT_MANIFEST_FILE))
 
-        # Walk through all modules and submodules in the plugins directory
-        for module_finder, module_name, is_pkg in pkgutil.walk_packages([package_dir]):
-            if not is_pkg and not module_name.startswith(plugins_package):
-                continue
+        for command_name, module_name, class_name in manifest.commands():
+            self.command_handler.register_lazy_command(command_name, module_name, class_name)
+            logging.info("Registered command '%s' from %s", command_name, module_name)
 
-            full_module_name = f'{plugins_package}.{module_name.split(".")[-1]}'
+    def restore_history(self):
+        """
+        Attach the history log named in HISTORY_LOG_FILE, restoring its calculations,
+        and the shared history named in HISTORY_SHARED_FILE.
 
-            # Skip MenuCommand since it's manually registered
-            if 'menu' in module_name:
-                continue
+        Does nothing for a variable that is not set or a file that is already attached.
+        """
+        log_file = os.getenv("HISTORY_LOG_FILE")
+        if log_file and CalculationsHistory.log is None:
+            CalculationsHistory.attach_log(HistoryLog(log_file))
+            logging.info("Restored %s calculations from %s.",
+                         len(CalculationsHistory.get_history()), log_file)
+        shared_file = os.getenv("HISTORY_SHARED_FILE")
+        if shared_file and CalculationsHistory.shared is None:
+            shared = SharedHistory(shared_file)
+            CalculationsHistory.attach_shared(shared)
+            if shared.claim():
+                logging.info("Sharing the history through %s.", shared_file)
+            else:
+                logging.warning("Every segment of %s has a writer; calculations will not "
+                                "be shared until one is released.", shared_file)
 
-            try:
-                # Import the module dynamically
-                module = importlib.import_module(full_module_name)
-                # Iterate over the attributes in the module and look for Command subclasses
-                for attribute_name in dir(module):
-                    attribute = getattr(module, attribute_name)
-                    # Check if the attribute is a Command subclass
-                    # (excluding the base Command class)
-                    if isinstance(attribute, type) and issubclass(attribute, Command) and attribute is not Command:
-                        # Register the command using the module name (or directory name) as the command name
-                        command_name = module_name.split('.')[-1].lower()
-                        self.command_handler.register_command(command_name, attribute())
-                logging.info(f"Loaded module: {full_module_name}")
-            except ModuleNotFoundError as e:
-                logging.error(f"Error loading module {full_module_name}: {e}")
+    def register_commands(self):
+        """
+        Register the `MenuCommand` manually and load the dynamic plugins, then register
+        the `StatsCommand`, which also needs the command handler.
+        """
+        # Manually register the MenuCommand with command_handler
+        self.command_handler.register_command("menu", MenuCommand(self.command_handler))
+        # Load dynamic plugins (excluding MenuCommand and StatsCommand)
+        self.load_plugins()
+        self.command_handler.register_command("stats", StatsCommand(self.command_handler))
 
     def run(self):
         """
@@ -107,20 +171,184 @@ class App:
         input commands. The REPL will continue to run until 
         the user enters the 'exit' command.
 
-        - Registers the `MenuCommand` manually.
-        - Loads dynamic plugins using the `load_plugins` method.
-        - Continuously accepts and executes user input as commands.
+        - Registers the `MenuCommand` and dynamic plugins.
+        - Restores the calculation history from its log, if one is configured.
+        - Continuously accepts and executes user input as commands. Each line is split
+          into the command name and its arguments (e.g. 'calculator add 2 3').
         """
-        # Manually register the MenuCommand with command_handler
-        self.command_handler.register_command("menu", MenuCommand(self.command_handler))
-        # Load dynamic plugins (excluding MenuCommand)
-        self.load_plugins()
+        self.register_commands()
+        self.restore_history()
 
         logging.info("Type 'exit' to exit.")
         while True:
             try:
                 user_input = input(">>> ").strip()
-                logging.debug(f"User input: {user_input}")
+                logging.debug("User input: %s", user_input)
                 self.command_handler.execute_command(user_input)
             except Exception as e:
-                logging.error(f"Error executing command: {e}")
+                logging.error("Error executing command: %s", e)
+
+    def run_script(self, lines, output):
+        """
+        Execute commands read from a script without prompting.
+
+        Every non-blank line that does not start with '#' is consumed in order, either
+        as a command name or as the answer to a command that asks for more input (for
+        example the operation and numbers of the 'calculator' command). Everything the
+        commands print goes to `output`, which is flushed once at the end. The script
+        stops at its last line or at the 'exit' command.
+
+        Args:
+            lines (Iterable[str]): The script lines, e.g. an open file.
+            output (TextIO): Stream the command output and the summary are written to.
+
+        Returns:
+            tuple: The number of commands that succeeded and failed.
+        """
+        self.register_commands()
+        self.restore_history()
+
+        lines = (line.strip() for line in lines)
+        lines = (line for line in lines if line and not line.startswith('#'))
+        succeeded = failed = 0
+        with scripted_input(lines), redirect_stdout(output):
+            for command_name in lines:
+                try:
+                    command_succeeded = self.command_handler.execute_command(command_name)
+                except SystemExit:
+                    # The 'exit' command ends the script like the end of the file does
+                    succeeded += 1
+                    break
+                except Exception as e:
+                    logging.error("Error executing command: %s", e)
+                    command_succeeded = False
+                if command_succeeded:
+                    succeeded += 1
+                else:
+                    failed += 1
+            print(f"Script finished: {succeeded} succeeded, {failed} failed.")
+        output.flush()
+        # Make the script's calculations durable before returning
+        CalculationsHistory.detach_log()
+        logging.info("Script finished: %s succeeded, %s failed.", succeeded, failed)
+        return succeeded, failed
+
+    async def serve(self, host, port):
+        """
+        Serve the commands and the calculator over HTTP/JSON until cancelled.
+
+        Args:
+            host (str): The address to bind to.
+            port (int): The port to bind to.
+        """
+        # Imported here so that the REPL does not pay for it
+        from app.server import CalculatorServer  # pylint: disable=import-outside-toplevel
+        self.register_commands()
+        self.restore_history()
+        server = CalculatorServer(self.command_handler)
+        await server.start(host, port)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+
+    async def run_async(self):
+        """
+        Run the REPL on an event loop, so that commands can run concurrently.
+
+        Every command is started as a task through `execute_command_async`. Commands that
+        finish quickly print their output before the next prompt; slower ones keep running
+        in the background while new commands are accepted. A single reader owns the
+        terminal: while a background command is waiting in `read_input`, the next line
+        typed is handed to that command instead of being run as a command. The REPL stops
+        at the 'exit' command or at the end of input.
+
+        Lines are read in a daemon thread, so a read that is still blocked when the REPL
+        stops does not keep the process alive.
+        """
+        self.register_commands()
+        self.restore_history()
+        loop = asyncio.get_running_loop()
+        answers = queue.Queue()
+        waiting_lock = threading.Lock()
+        waiting = [0]  # Number of commands blocked in read_input
+        tasks = set()
+        input_requested = asyncio.Event()
+        exit_requested = asyncio.Event()
+
+        def deliver(future, line, error):
+            if not future.done():
+                if error is None:
+                    future.set_result(line)
+                else:
+                    future.set_exception(error)
+
+        async def read_line(prompt):
+            future = loop.create_future()
+
+            def read():
+                line = error = None
+                try:
+                    line = input(prompt)
+                except BaseException as e:  # pylint: disable=broad-exception-caught
+                    error = e
+                try:
+                    loop.call_soon_threadsafe(deliver, future, line, error)
+                except RuntimeError:
+                    pass  # The REPL has stopped and its loop is closed
+
+            threading.Thread(target=read, name='repl-input', daemon=True).start()
+            return await future
+
+        async def run_command(user_input):
+            try:
+                return await self.command_handler.execute_command_async(user_input)
+            except SystemExit:
+                exit_requested.set()
+                return True
+
+        def read_from_repl(prompt):
+            print(prompt, end='', flush=True)
+            with waiting_lock:
+                waiting[0] += 1
+            loop.call_soon_threadsafe(input_requested.set)
+            return answers.get()
+
+        async def settle():
+            # Give commands a moment to finish or to ask for input before prompting
+            requested = asyncio.ensure_future(input_requested.wait())
+            await asyncio.wait(tasks | {requested}, timeout=COMMAND_START_GRACE,
+                               return_when=asyncio.FIRST_COMPLETED)
+            requested.cancel()
+            input_requested.clear()
+
+        def finish_task(task):
+            tasks.discard(task)
+            if not task.cancelled() and isinstance(task.exception(), Exception):
+                logging.error("Error executing command: %s", task.exception())
+
+        logging.info("Type 'exit' to exit.")
+        with redirected_input(read_from_repl):
+            while not exit_requested.is_set():
+                with waiting_lock:
+                    prompt = "" if waiting[0] > 0 else ">>> "
+                try:
+                    user_input = (await read_line(prompt)).strip()
+                except EOFError:
+                    break
+                with waiting_lock:
+                    answering = waiting[0] > 0
+                    if answering:
+                        # A running command asked for this line
+                        waiting[0] -= 1
+                        answers.put(user_input)
+                if answering:
+                    await settle()
+                    continue
+                logging.debug("User input: %s", user_input)
+                task = asyncio.create_task(run_command(user_input))
+                tasks.add(task)
+                task.add_done_callback(finish_task)
+                await settle()
+            if tasks:
+                await asyncio.wait(set(tasks))
@@ -1,10 +1,25 @@
 """
 The Calculator module provides static methods for performing arithmetic operations
-by leveraging the Calculation and Operations classes.
+by leveraging the Calculation and Operations classes, vectorized batch
+operations by leveraging the Batch module, multi-process batches by leveraging
+the Parallel module, infix expressions by leveraging the Expressions module, and
+streaming sums, products and means by leveraging the Reductions module.
+
+The two-operand methods take an optional numeric backend (see the Backends module):
+the operands are converted to its number type and the operation runs through it.
+Without one, the operands are used as they are.
 """
 
+from typing import TYPE_CHECKING, Callable
+from .backends import Number, get_backend
 from .calculations import Calculation
+from .expressions import evaluate_expression
 from .operations import add, subtract, multiply, divide
+from .reductions import ReductionResult, reduce_numbers
+
+if TYPE_CHECKING:
+    from .batch import BatchResult
+    from .parallel import ParallelBatchResult
 
 
 class Calculator:
@@ -13,50 +28,204 @@ class Calculator:
     """
 
     @staticmethod
-    def add(number_one: float, number_two: float) -> float:
+    def add(number_one: Number, number_two: Number, backend=None) -> Number:
         """
         Perform addition of two numbers.
 
         :param number_one: The first number.
         :param number_two: The second number.
+        :param backend: Optional NumericBackend or backend name to compute with.
         :return: The result of the addition.
         """
-        calculation = Calculation(number_one, number_two, add)
-        return calculation.get_result()
+        return Calculator.calculate(add, number_one, number_two, backend)
 
     @staticmethod
-    def subtract(number_one: float, number_two: float) -> float:
+    def subtract(number_one: Number, number_two: Number, backend=None) -> Number:
         """
         Perform subtraction of two numbers.
 
         :param number_one: The first number.
         :param number_two: The second number.
+        :param backend: Optional NumericBackend or backend name to compute with.
         :return: The result of the subtraction.
         """
-        calculation = Calculation(number_one, number_two, subtract)
-        return calculation.get_result()
+        return Calculator.calculate(subtract, number_one, number_two, backend)
 
     @staticmethod
-    def multiply(number_one: float, number_two: float) -> float:
+    def multiply(number_one: Number, number_two: Number, backend=None) -> Number:
         """
         Perform multiplication of two numbers.
 
         :param number_one: The first number.
         :param number_two: The second number.
+        :param backend: Optional NumericBackend or backend name to compute with.
         :return: The result of the multiplication.
         """
-        calculation = Calculation(number_one, number_two, multiply)
-        return calculation.get_result()
+        return Calculator.calculate(multiply, number_one, number_two, backend)
 
     @staticmethod
-    def divide(number_one: float, number_two: float) -> float:
+    def divide(number_one: Number, number_two: Number, backend=None) -> Number:
         """
         Perform division of two numbers.
 
         :param number_one: The first number.
         :param number_two: The second number.
+        :param backend: Optional NumericBackend or backend name to compute with.
         :return: The result of the division.
         :raises ZeroDivisionError: If the second number is zero.
         """
-        calculation = Calculation(number_one, number_two, divide)
+        return Calculator.calculate(divide, number_one, number_two, backend)
+
+    @staticmethod
+    def calculate(operation_func: Callable[[Number, Number], Number], number_one: Number,
+                  number_two: Number, backend=None) -> Number:
+        """
+        Perform an operation of the Operations module on two numbers.
+
+        :param operation_func: The function of the arithmetic operation.
+        :param number_one: The first number.
+        :param number_two: The second number.
+        :param backend: Optional NumericBackend or backend name to compute with.
+        :return: The result of the operation.
+        :raises ValueError: If the backend is unknown or cannot represent an operand.
+        """
+        if backend is not None:
+            backend = get_backend(backend)
+            number_one, number_two = backend.convert(number_one), backend.convert(number_two)
+        calculation = Calculation(number_one, number_two, operation_func, backend=backend)
         return calculation.get_result()
+
+    @staticmethod
+    def sum(values, backend=None) -> ReductionResult:
+        """
+        Add up a stream of numbers, consuming it lazily in constant memory.
+
+        Float sums are compensated and Decimal sums are exact until the final rounding.
+
+        :param values: Any iterable of numbers or numeric strings.
+        :param backend: Optional NumericBackend or backend name (default: the one of the
+                        first value's type, widened from int if the stream needs it).
+        :return: A ReductionResult with the sum, the count and the elapsed time.
+        """
+        return reduce_numbers('sum', values, backend)
+
+    @staticmethod
+    def product(values, backend=None) -> ReductionResult:
+        """
+        Multiply a stream of numbers, consuming it lazily in constant memory.
+
+        :param values: Any iterable of numbers or numeric strings.
+        :param backend: Optional NumericBackend or backend name (default: the one of the
+                        first value's type, widened from int if the stream needs it).
+        :return: A ReductionResult with the product, the count and the elapsed time.
+        """
+        return reduce_numbers('product', values, backend)
+
+    @staticmethod
+    def mean(values, backend=None) -> ReductionResult:
+        """
+        Average a stream of numbers, consuming it lazily in constant memory.
+
+        :param values: Any iterable of numbers or numeric strings.
+        :param backend: Optional NumericBackend or backend name (default: the one of the
+                        first value's type, widened from int if the stream needs it).
+        :return: A ReductionResult with the mean, the count and the elapsed time.
+        :raises ValueError: If the stream is empty.
+        """
+        return reduce_numbers('mean', values, backend)
+
+    @staticmethod
+    def batch(operation_name: str, numbers_one, numbers_two) -> 'BatchResult':
+        """
+        Apply an operation to whole arrays of numbers in a single vectorized call.
+
+        NumPy is imported on first use, so importing the calculator stays cheap.
+
+        :param operation_name: One of 'add', 'subtract', 'multiply' or 'divide'.
+        :param numbers_one: Array-like or buffer of first operands.
+        :param numbers_two: Array-like or buffer of second operands.
+        :return: A BatchResult holding the values and a per-element error mask.
+        :raises ValueError: If the operation name is not valid.
+        """
+        from .batch import batch  # pylint: disable=import-outside-toplevel
+        return batch(operation_name, numbers_one, numbers_two)
+
+    @staticmethod
+    def add_many(numbers_one, numbers_two) -> 'BatchResult':
+        """
+        Perform element-wise addition of two arrays.
+
+        :param numbers_one: The first operands.
+        :param numbers_two: The second operands.
+        :return: A BatchResult with the sums.
+        """
+        return Calculator.batch('add', numbers_one, numbers_two)
+
+    @staticmethod
+    def subtract_many(numbers_one, numbers_two) -> 'BatchResult':
+        """
+        Perform element-wise subtraction of two arrays.
+
+        :param numbers_one: The first operands.
+        :param numbers_two: The second operands.
+        :return: A BatchResult with the differences.
+        """
+        return Calculator.batch('subtract', numbers_one, numbers_two)
+
+    @staticmethod
+    def multiply_many(numbers_one, numbers_two) -> 'BatchResult':
+        """
+        Perform element-wise multiplication of two arrays.
+
+        :param numbers_one: The first operands.
+        :param numbers_two: The second operands.
+        :return: A BatchResult with the products.
+        """
+        return Calculator.batch('multiply', numbers_one, numbers_two)
+
+    @staticmethod
+    def divide_many(numbers_one, numbers_two) -> 'BatchResult':
+        """
+        Perform element-wise division of two arrays.
+
+        Zero divisors do not raise; they are flagged in the result's error mask.
+
+        :param numbers_one: The first operands.
+        :param numbers_two: The second operands.
+        :return: A BatchResult with the quotients.
+        """
+        return Calculator.batch('divide', numbers_one, numbers_two)
+
+    @staticmethod
+    def parallel_batch(operation_name: str, numbers_one, numbers_two,
+                       max_workers: int = None, chunk_size: int = None) -> 'ParallelBatchResult':
+        """
+        Apply an operation to large sequences of numbers on a pool of worker processes.
+
+        Use this for CPU-bound work such as high-precision Decimal batches. The pool
+        is kept warm between calls.
+
+        :param operation_name: One of 'add', 'subtract', 'multiply' or 'divide'.
+        :param numbers_one: Sequence of first operands.
+        :param numbers_two: Sequence of second operands, of the same length.
+        :param max_workers: Number of worker processes (defaults to CALCULATOR_WORKERS).
+        :param chunk_size: Number of pairs per task (defaults to CALCULATOR_CHUNK_SIZE).
+        :return: A ParallelBatchResult with values and per-element errors in input order.
+        :raises ValueError: If the operation is unknown or the lengths differ.
+        """
+        from .parallel import parallel_batch  # pylint: disable=import-outside-toplevel
+        return parallel_batch(operation_name, numbers_one, numbers_two,
+                              max_workers=max_workers, chunk_size=chunk_size)
+
+    @staticmethod
+    def evaluate(expression: str, variables: dict = None):
+        """
+        Evaluate an infix expression such as '(1.5 + 2) * 3 / 7'.
+
+        :param expression: The expression text.
+        :param variables: Values for the names used in the expression.
+        :return: The result of the expression.
+        :raises ExpressionError: If the expression is not valid.
+        :raises ZeroDivisionError: If the expression divides by zero.
+        """
+        return evaluate_expression(expression, variables)
@@ -0,0 +1,369 @@
+"""
+The Backends module provides the numeric backends calculations can be computed with.
+
+A backend decides which type numbers are parsed and converted to, and in which
+context the operations of the Operations module run on them. The operations
+themselves are generic, so the same functions serve every backend:
+
+- 'int': Python integers. Sums, differences and products are exact and fast; a
+  quotient is an int when the division is exact and a Fraction otherwise.
+  Non-integer input is rejected.
+- 'float': Binary floating point, the fastest choice for approximate work.
+- 'decimal': Decimal, computed in a context with a configurable precision and
+  rounding mode. This is the default.
+- 'fraction': Exact rational numbers.
+
+Backends are chosen per call (`Calculator.add(a, b, backend='fraction')`), per
+session (`Session.backend`, see `app.sessions.current_backend`) or for the whole
+process, from the environment:
+
+- `NUMERIC_BACKEND`: The default backend (default 'decimal').
+- `DECIMAL_PRECISION`: Significant digits of the decimal backend (default 28).
+- `DECIMAL_ROUNDING`: Rounding mode of the decimal backend, e.g. ROUND_HALF_UP
+  (default ROUND_HALF_EVEN).
+"""
+
+from abc import ABC, abstractmethod
+import decimal
+from functools import lru_cache
+from decimal import Context, Decimal, InvalidOperation, localcontext
+from fractions import Fraction
+import os
+from typing import Callable, Union
+from .operations import add, divide, multiply, subtract
+
+Number = Union[int, float, Decimal, Fraction]
+
+DEFAULT_BACKEND = 'decimal'
+DEFAULT_PRECISION = 28
+DEFAULT_ROUNDING = decimal.ROUND_HALF_EVEN
+ROUNDING_MODES = (
+    decimal.ROUND_CEILING, decimal.ROUND_DOWN, decimal.ROUND_FLOOR, decimal.ROUND_HALF_DOWN,
+    decimal.ROUND_HALF_EVEN, decimal.ROUND_HALF_UP, decimal.ROUND_UP, decimal.ROUND_05UP,
+)
+
+# Set by set_default_backend; takes precedence over the environment
+_default_override = None
+
+
+class NumericBackend(ABC):
+    """
+    This class is the interface of the numeric backends.
+
+    :ivar name: The name the backend is selected by.
+    :ivar number_type: The type of the numbers it parses and converts to.
+    """
+
+    name = ''
+    number_type = object
+
+    @abstractmethod
+    def parse(self, text: str) -> Number:
+        """
+        Parse a number typed by a user.
+
+        :param text: The number as text.
+        :return: The number.
+        :raises ValueError: If the text is not a number this backend accepts.
+        """
+
+    @abstractmethod
+    def convert(self, value) -> Number:
+        """
+        Convert a number of any type, or a numeric string, to this backend's type.
+
+        :param value: The number.
+        :return: The converted number.
+        :raises ValueError: If the value cannot be represented by this backend.
+        """
+
+    def compute(self, operation_func: Callable[[Number, Number], Number],
+                number_one: Number, number_two: Number) -> Number:
+        """
+        Perform an operation on two numbers of this backend.
+
+        :param operation_func: The function of the arithmetic operation.
+        :param number_one: The first number.
+        :param number_two: The second number.
+        :return: The result of the operation.
+        """
+        return operation_func(number_one, number_two)
+
+    @property
+    def spec(self) -> str:
+        """
+        Return the text that identifies the backend and its options (see `backend_from_spec`).
+
+        :return: The spec, e.g. 'fraction'.
+        """
+        return self.name
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class IntegerBackend(NumericBackend):
+    """
+    Exact integer arithmetic; inexact quotients become Fractions.
+    """
+
+    name = 'int'
+    number_type = int
+
+    def parse(self, text: str) -> int:
+        return int(text)
+
+    def convert(self, value) -> int:
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, Fraction)):
+            raise ValueError(f"{value!r} is not a number")
+        if isinstance(value, int):
+            return value
+        if value != value or value in (float('inf'), float('-inf')) or value != int(value):
+            raise ValueError(f"{value} is not an integer")
+        return int(value)
+
+    def compute(self, operation_func, number_one, number_two):
+        if operation_func is divide and type(number_one) is int and type(number_two) is int:
+            if number_two == 0:
+                return divide(number_one, number_two)
+            quotient, remainder = divmod(number_one, number_two)
+            return quotient if not remainder else Fraction(number_one, number_two)
+        return operation_func(number_one, number_two)
+
+
+class FloatBackend(NumericBackend):
+    """
+    Binary floating point arithmetic.
+    """
+
+    name = 'float'
+    number_type = float
+
+    def parse(self, text: str) -> float:
+        return float(text)
+
+    def convert(self, value) -> float:
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, Fraction)):
+            raise ValueError(f"{value!r} is not a number")
+        return float(value)
+
+
+class DecimalBackend(NumericBackend):
+    """
+    Decimal arithmetic in a context with a given precision and rounding mode.
+
+    :ivar context: The decimal context the operations run in.
+    """
+
+    name = 'decimal'
+    number_type = Decimal
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, rounding: str = DEFAULT_ROUNDING):
+        """
+        Initialize the backend.
+
+        :param precision: The number of significant digits of results.
+        :param rounding: The rounding mode, one of the decimal module's ROUND_* constants.
+        :raises ValueError: If the precision or the rounding mode is not valid.
+        """
+        if precision < 1:
+            raise ValueError("The decimal precision must be at least 1.")
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"Unknown rounding mode '{rounding}'. "
+                             f"Use one of {', '.join(ROUNDING_MODES)}.")
+        self.context = Context(prec=precision, rounding=rounding)
+        # The context's own methods are much cheaper than switching to the context
+        self._context_methods = {
+            add: self.context.add,
+            subtract: self.context.subtract,
+            multiply: self.context.multiply,
+        }
+
+    @property
+    def precision(self) -> int:
+        """
+        Return the number of significant digits of results.
+
+        :return: The precision.
+        """
+        return self.context.prec
+
+    @property
+    def rounding(self) -> str:
+        """
+        Return the rounding mode.
+
+        :return: One of the decimal module's ROUND_* constants.
+        """
+        return self.context.rounding
+
+    def parse(self, text: str) -> Decimal:
+        # Operands stay exact; results are rounded to the context
+        try:
+            return Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"'{text}' is not a number") from None
+
+    def convert(self, value) -> Decimal:
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, Fraction)):
+            raise ValueError(f"{value!r} is not a number")
+        if isinstance(value, Fraction):
+            return self.context.divide(Decimal(value.numerator), Decimal(value.denominator))
+        # Floats by their shortest repr, so 0.1 becomes Decimal('0.1')
+        return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+    def compute(self, operation_func, number_one, number_two):
+        context_method = self._context_methods.get(operation_func)
+        if context_method is not None:
+            return context_method(number_one, number_two)
+        if operation_func is divide and number_two != 0:
+            return self.context.divide(number_one, number_two)
+        with localcontext(self.context):
+            return operation_func(number_one, number_two)
+
+    @property
+    def spec(self) -> str:
+        return f"decimal:{self.precision}:{self.rounding}"
+
+    def __repr__(self) -> str:
+        return f"DecimalBackend(precision={self.precision}, rounding={self.rounding!r})"
+
+    def __str__(self) -> str:
+        return f"decimal (precision={self.precision}, rounding={self.rounding})"
+
+
+class FractionBackend(NumericBackend):
+    """
+    Exact rational arithmetic.
+    """
+
+    name = 'fraction'
+    number_type = Fraction
+
+    def parse(self, text: str) -> Fraction:
+        try:
+            return Fraction(text)
+        except ZeroDivisionError:
+            raise ValueError(f"'{text}' has a zero denominator") from None
+
+    def convert(self, value) -> Fraction:
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, Fraction)):
+            raise ValueError(f"{value!r} is not a number")
+        # Floats by their shortest repr, so 0.1 becomes 1/10
+        return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+
+
+BACKENDS = {
+    'int': IntegerBackend,
+    'float': FloatBackend,
+    'decimal': DecimalBackend,
+    'fraction': FractionBackend,
+}
+
+
+def create_backend(name: str, **options) -> NumericBackend:
+    """
+    Create a backend by name.
+
+    :param name: One of 'int', 'float', 'decimal' or 'fraction'.
+    :param options: Options of the backend, e.g. precision and rounding for 'decimal'.
+    :return: The backend.
+    :raises ValueError: If the name or an option is not valid.
+    """
+    backend_class = BACKENDS.get(name.strip().lower())
+    if backend_class is None:
+        raise ValueError(f"Unknown numeric backend '{name}'. "
+                         f"Use one of {', '.join(BACKENDS)}.")
+    try:
+        return backend_class(**options)
+    except TypeError:
+        raise ValueError(f"The '{backend_class.name}' backend takes no options "
+                         f"{', '.join(options)}.") from None
+
+
+@lru_cache(maxsize=32)
+def backend_from_spec(spec: str) -> NumericBackend:
+    """
+    Return the backend identified by a spec such as 'int' or 'decimal:50:ROUND_HALF_UP'.
+
+    Backends are shared between calls with the same spec, so they must not be changed.
+
+    :param spec: The spec, as returned by `NumericBackend.spec`.
+    :return: The backend.
+    :raises ValueError: If the spec is not valid.
+    """
+    name, *options = spec.split(':')
+    if name == 'decimal' and len(options) == 2:
+        return DecimalBackend(int(options[0]), options[1])
+    if options:
+        raise ValueError(f"Invalid numeric backend spec '{spec}'.")
+    return create_backend(name)
+
+
+def backend_from_env() -> NumericBackend:
+    """
+    Create the backend configured by NUMERIC_BACKEND, DECIMAL_PRECISION and
+    DECIMAL_ROUNDING.
+
+    :return: The backend.
+    :raises ValueError: If a setting is not valid.
+    """
+    return get_backend(os.getenv('NUMERIC_BACKEND', DEFAULT_BACKEND))
+
+
+def default_backend() -> NumericBackend:
+    """
+    Return the process-wide backend: the one set by `set_default_backend`, or else the
+    one configured in the environment.
+
+    :return: The backend.
+    """
+    if _default_override is not None:
+        return _default_override
+    return backend_from_env()
+
+
+def set_default_backend(backend):
+    """
+    Set the process-wide backend.
+
+    :param backend: A NumericBackend, a backend name, or None to use the environment again.
+    :raises ValueError: If the name is not valid.
+    """
+    global _default_override  # pylint: disable=global-statement
+    _default_override = None if backend is None else get_backend(backend)
+
+
+def get_backend(backend=None) -> NumericBackend:
+    """
+    Resolve a backend given as an instance, a name or None.
+
+    :param backend: A NumericBackend, a backend name, or None for the default backend.
+    :return: The backend.
+    :raises ValueError: If the name is not valid.
+    """
+    if isinstance(backend, NumericBackend):
+        return backend
+    if backend is None:
+        return default_backend()
+    if backend.strip().lower() == 'decimal':
+        # By name, the decimal backend uses the configured context
+        return _decimal_from_env()
+    return create_backend(backend)
+
+
+def _decimal_from_env() -> DecimalBackend:
+    """Create the decimal backend with the context configured in the environment."""
+    return DecimalBackend(int(os.getenv('DECIMAL_PRECISION', str(DEFAULT_PRECISION))),
+                          os.getenv('DECIMAL_ROUNDING', DEFAULT_ROUNDING).strip().upper())
@@ -0,0 +1,153 @@
+"""
+The Batch module provides vectorized versions of the arithmetic operations.
+
+Instead of building one Calculation per pair of numbers, a batch runs a single
+NumPy kernel over whole arrays (or any object exposing the buffer protocol).
+Zero divisors and integer overflow do not abort the batch; they are reported in
+a per-element mask. Object arrays (for example arrays of Decimal) fall back to the exact scalar
+functions in the Operations module.
+"""
+
+from decimal import Decimal
+import numpy as np
+from .operations import OPERATIONS
+
+
+KERNELS = {
+    'add': np.add,
+    'subtract': np.subtract,
+    'multiply': np.multiply,
+    'divide': np.divide,
+}
+
+
+class BatchResult:
+    """
+    This class stores the outcome of a batch operation.
+
+    :ivar values: Array of results. Failed elements hold NaN (float arrays),
+                  0 (integer arrays) or None (object arrays).
+    :ivar errors: Boolean array, True where the element could not be computed.
+    """
+
+    def __init__(self, values: np.ndarray, errors: np.ndarray):
+        self.values = values
+        self.errors = errors
+
+    @property
+    def error_count(self) -> int:
+        """
+        Return the number of elements that could not be computed.
+
+        :return: The number of failed elements.
+        """
+        return int(np.count_nonzero(self.errors))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _decimal_batch(operation_name: str, numbers_one: np.ndarray,
+                   numbers_two: np.ndarray) -> BatchResult:
+    """
+    Apply the scalar operation element by element on object arrays.
+
+    This keeps Decimal (and other exact types) exact, at the price of a
+    Python-level loop.
+    """
+    operation_func = OPERATIONS[operation_name]
+    values = np.empty(numbers_one.shape, dtype=object)
+    errors = np.zeros(numbers_one.shape, dtype=bool)
+    for index, (number_one, number_two) in enumerate(
+            zip(numbers_one.flat, numbers_two.flat)):
+        try:
+            values.flat[index] = operation_func(number_one, number_two)
+        except (ArithmeticError, TypeError):
+            values.flat[index] = None
+            errors.flat[index] = True
+    return BatchResult(values, errors)
+
+
+def _integer_overflow(operation_name: str, numbers_one: np.ndarray, numbers_two: np.ndarray,
+                      values: np.ndarray) -> np.ndarray:
+    """
+    Find the elements of an integer kernel's result that wrapped around.
+
+    :param operation_name: One of 'add', 'subtract' or 'multiply'.
+    :param numbers_one: First operands.
+    :param numbers_two: Second operands.
+    :param values: The (possibly wrapped) results of the kernel.
+    :return: Boolean array, True where the exact result does not fit the result type.
+    """
+    numbers_one = numbers_one.astype(values.dtype)
+    numbers_two = numbers_two.astype(values.dtype)
+    signed = values.dtype.kind == 'i'
+    if operation_name == 'add':
+        if signed:
+            return ((numbers_one ^ values) & (numbers_two ^ values)) < 0
+        return values < numbers_one
+    if operation_name == 'subtract':
+        if signed:
+            return ((numbers_one ^ numbers_two) & (numbers_one ^ values)) < 0
+        return numbers_one < numbers_two
+    # Multiplication wrapped unless dividing the result gives back the first operand
+    nonzero = numbers_two != 0
+    with np.errstate(all='ignore'):
+        quotient = np.floor_divide(values, numbers_two, where=nonzero,
+                                   out=np.zeros_like(values))
+    overflow = nonzero & ((quotient != numbers_one) | (values != quotient * numbers_two))
+    if signed:
+        # min * -1 wraps to min, which the division check cannot see
+        minimum = np.iinfo(values.dtype).min
+        overflow |= ((numbers_one == minimum) & (numbers_two == -1)) | \
+                    ((numbers_two == minimum) & (numbers_one == -1))
+    return overflow
+
+
+def batch(operation_name: str, numbers_one, numbers_two) -> BatchResult:
+    """
+    Apply an arithmetic operation to every pair of elements in two arrays.
+
+    :param operation_name: One of 'add', 'subtract', 'multiply' or 'divide'.
+    :param numbers_one: Array-like or buffer of first operands.
+    :param numbers_two: Array-like or buffer of second operands (broadcastable).
+                        Scalars are treated as one-element arrays.
+    :return: A BatchResult with the values and the per-element error mask.
+    :raises ValueError: If the operation name is unknown or shapes do not broadcast.
+    """
+    if operation_name not in KERNELS:
+        raise ValueError(f"'{operation_name}' is not a valid operation.")
+
+    # Scalars become one-element arrays, so results can be masked and measured
+    numbers_one, numbers_two = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(numbers_one)), np.atleast_1d(np.asarray(numbers_two)))
+
+    if numbers_one.dtype == object or numbers_two.dtype == object:
+        return _decimal_batch(operation_name, numbers_one, numbers_two)
+
+    if operation_name == 'divide':
+        errors = numbers_two == 0
+        result_type = np.result_type(numbers_one, numbers_two, np.float64)
+        values = np.full(numbers_one.shape, np.nan, dtype=result_type)
+        np.divide(numbers_one, numbers_two, out=values, where=~errors)
+        return BatchResult(values, errors)
+
+    values = KERNELS[operation_name](numbers_one, numbers_two)
+    if values.dtype.kind in 'iu':
+        errors = _integer_overflow(operation_name, numbers_one, numbers_two, values)
+        values[errors] = 0
+        return BatchResult(values, errors)
+    return BatchResult(values, np.zeros(values.shape, dtype=bool))
+
+
+def to_decimal_array(numbers) -> np.ndarray:
+    """
+    Convert an iterable of numbers or numeric strings to an object array of Decimal.
+
+    :param numbers: Iterable of values accepted by the Decimal constructor.
+    :return: A one-dimensional object array of Decimal instances.
+    """
+    values = [Decimal(str(number)) for number in numbers]
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
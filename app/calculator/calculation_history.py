@@ -1,48 +1,75 @@
 """
-The CalculationsHistory class manages the history of arithmetic calculations.
+The CalculationsHistory class is the process-wide calculation history.
+
+It is a facade over one SessionHistory, `CalculationsHistory.default`, which the
+interactive REPL, scripts and every other caller outside a session share. Any
+method or attribute of SessionHistory can be used on the class itself, e.g.
+`CalculationsHistory.add_calculation(calculation)` or `CalculationsHistory.log`,
+and is looked up on the default history when it is used, so `configure` can replace
+that history at any time.
+
+The default history's capacity is read from the HISTORY_MAX_ENTRIES environment
+variable, and what happens to entries that fall out of it is decided by the eviction
+policy named in HISTORY_EVICTION_POLICY ('drop_oldest' or 'spill'; see the History
+Eviction module). It has no byte quota.
+
+Everything else, including the history log, the shared history, the indexed queries
+and undo, redo and checkpoints, is described in the Session History module.
 """
 
-from typing import List
-from .calculations import Calculation
+import os
+import threading
+from .history_eviction import (  # pylint: disable=unused-import
+    DEFAULT_SPILL_FILE, EVICTION_POLICIES, DropOldestPolicy, EvictionPolicy,
+    SpillToDiskPolicy)
+from .session_history import SessionHistory
 
+DEFAULT_MAX_ENTRIES = 10000
 
-class CalculationsHistory:
-    """
-    This class manages a history of Calculation instances.
-    """
 
-    history: List[Calculation] = []
+def _max_entries_from_env() -> int:
+    """Return the history capacity configured in HISTORY_MAX_ENTRIES."""
+    return int(os.getenv("HISTORY_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
 
-    @classmethod
-    def add_calculation(cls, calculation: Calculation):
-        """
-        Add a new calculation to the history.
 
-        :param calculation: A Calculation instance.
-        """
-        cls.history.append(calculation)
+def _eviction_policy_from_env() -> EvictionPolicy:
+    """Return a new instance of the eviction policy named in HISTORY_EVICTION_POLICY."""
+    return EVICTION_POLICIES[os.getenv("HISTORY_EVICTION_POLICY", "drop_oldest")]()
 
-    @classmethod
-    def get_last_calculation(cls) -> Calculation:
-        """
-        Retrieve the most recent calculation from the history.
 
-        :return: The last Calculation instance.
-        """
-        return cls.history[-1] if cls.history else None
+class _DefaultHistoryFacade(type):
+    """Looks up the attributes a class does not define on its default history."""
 
-    @classmethod
-    def clear_history(cls):
-        """
-        Clear all calculations from the history.
-        """
-        cls.history.clear()
+    def __getattr__(cls, name):
+        return getattr(cls.default, name)
+
+
+class CalculationsHistory(metaclass=_DefaultHistoryFacade):
+    """
+    The process-wide history of Calculation instances.
+
+    :cvar default: The SessionHistory that the class methods and attributes use.
+    """
+
+    default: SessionHistory = SessionHistory(_max_entries_from_env(),
+                                             eviction_policy=_eviction_policy_from_env())
+    _lock = threading.Lock()
 
     @classmethod
-    def get_history(cls) -> List[Calculation]:
+    def configure(cls, max_entries: int = None, eviction_policy: EvictionPolicy = None):
         """
-        Retrieve the full history of calculations.
+        Replace the history with an empty one of the given capacity.
+
+        The attached history log and shared history, if any, stay attached.
 
-        :return: List of Calculation instances.
+        :param max_entries: The maximum number of calculations kept
+                            (defaults to HISTORY_MAX_ENTRIES).
+        :param eviction_policy: The policy for evicted calculations
+                                (defaults to HISTORY_EVICTION_POLICY).
         """
-        return cls.history
+        with cls._lock:
+            history = SessionHistory(max_entries or _max_entries_from_env(),
+                                     eviction_policy=eviction_policy
+                                     or _eviction_policy_from_env())
+            history.log, history.shared = cls.default.log, cls.default.shared
+            cls.default = history
@@ -1,9 +1,19 @@
 """
 The Calculations module provides the Calculation class that encapsulates
 the logic for performing and storing arithmetic operations.
+
+A Calculation computes its result once, on first access, and stores it. Calculations
+created through a CalculationBatch are deferred: the whole batch is evaluated the
+first time any of its results is read. A Calculation given a numeric backend (see the
+Backends module) performs its operation through that backend, e.g. in its decimal
+context; without one, the operation is applied to the operands as they are.
 """
 
-from typing import Callable
+from typing import Callable, List
+from .backends import Number, NumericBackend
+
+# Marker for a result that has not been computed yet
+_PENDING = object()
 
 
 class Calculation:
@@ -12,26 +22,127 @@ class Calculation:
     performing the operation.
     """
 
-    def __init__(self, number_one: float, number_two: float,
-                 operation_func: Callable[[float, float], float]):
+    __slots__ = ('number_one', 'number_two', 'operation_func', 'backend',
+                 '_result', '_error', '_batch')
+
+    def __init__(self, number_one: Number, number_two: Number,
+                 operation_func: Callable[[Number, Number], Number],
+                 batch: 'CalculationBatch' = None, backend: NumericBackend = None):
         """
         Initialize the Calculation with two numbers and an operation function.
 
         :param number_one: The first number.
         :param number_two: The second number.
         :param operation_func: The function to perform the arithmetic operation.
+        :param batch: Optional batch that evaluates this calculation together with
+                      its other pending calculations.
+        :param backend: Optional numeric backend that performs the operation.
         """
         self.number_one = number_one
         self.number_two = number_two
         self.operation_func = operation_func
+        self.backend = backend
+        self._result = _PENDING
+        self._error = None
+        self._batch = batch
+
+    @classmethod
+    def evaluated(cls, number_one: Number, number_two: Number,
+                  operation_func: Callable[[Number, Number], Number],
+                  result: Number = None, error: ArithmeticError = None,
+                  backend: NumericBackend = None) -> 'Calculation':
+        """
+        Create a Calculation whose outcome is already known, without performing it.
+
+        :param number_one: The first number.
+        :param number_two: The second number.
+        :param operation_func: The function of the arithmetic operation.
+        :param result: The result of the operation.
+        :param error: The exception the operation raised, instead of a result.
+        :param backend: The numeric backend that performed the operation, if any.
+        :return: The evaluated Calculation.
+        """
+        calculation = cls(number_one, number_two, operation_func, backend=backend)
+        calculation._result = result
+        calculation._error = error
+        return calculation
+
+    def evaluate(self):
+        """
+        Perform the operation if it has not been performed yet, storing its outcome.
+
+        An exception raised by the operation is stored as well, and raised again
+        by every call to `get_result`.
+        """
+        if self._result is not _PENDING or self._error is not None:
+            return
+        try:
+            if self.backend is None:
+                self._result = self.operation_func(self.number_one, self.number_two)
+            else:
+                self._result = self.backend.compute(self.operation_func,
+                                                    self.number_one, self.number_two)
+        except ArithmeticError as e:
+            self._error = e
+        self._batch = None
+
+    def is_evaluated(self) -> bool:
+        """
+        Check whether the operation has already been performed.
+
+        :return: True if the result (or error) is stored.
+        """
+        return self._result is not _PENDING or self._error is not None
 
-    def get_result(self) -> float:
+    def get_result(self) -> Number:
         """
-        Execute the arithmetic operation and return the result.
+        Return the result of the arithmetic operation, computing it on first access.
 
         :return: The result of the operation.
         """
-        return self.operation_func(self.number_one, self.number_two)
+        if not self.is_evaluated():
+            if self._batch is not None:
+                self._batch.evaluate()
+            else:
+                self.evaluate()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class CalculationBatch:
+    """
+    This class collects deferred calculations and evaluates them all at once
+    when the first of their results is read.
+    """
+
+    def __init__(self):
+        self._pending: List[Calculation] = []
+
+    def add(self, number_one: Number, number_two: Number,
+            operation_func: Callable[[Number, Number], Number],
+            backend: NumericBackend = None) -> Calculation:
+        """
+        Create a deferred calculation belonging to this batch.
+
+        :param number_one: The first number.
+        :param number_two: The second number.
+        :param operation_func: The function to perform the arithmetic operation.
+        :param backend: Optional numeric backend that performs the operation.
+        :return: The pending Calculation.
+        """
+        calculation = Calculation(number_one, number_two, operation_func, batch=self,
+                                  backend=backend)
+        self._pending.append(calculation)
+        return calculation
+
+    def evaluate(self):
+        """
+        Evaluate every pending calculation in the batch.
+        """
+        pending, self._pending = self._pending, []
+        for calculation in pending:
+            calculation.evaluate()
 
-# The commented-out CalculationsHistory class below is ignored by pylint.
-# Remove the pointless string statement and the unused List import to fix warnings.
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,485 @@
+"""
+The Columnar Buffer module stores a bounded history of calculations as columns.
+
+A Calculation object with Decimal operands and result takes about 400 bytes. The
+ColumnarBuffer instead keeps every field of a calculation in a typed array:
+
+- the operation as a one-byte opcode;
+- for each operand and the result, a one-byte kind, the value as a float64 (for
+  analytics), and the exact value as a 128-bit fixed-point coefficient with a
+  one-byte decimal exponent (value = coefficient * 10 ** exponent).
+
+Ints and Decimals with up to 38 significant digits and floats are stored in the
+columns. Anything else (huge numbers, NaN and infinities, other number types,
+the exception of a failed calculation) is kept as an object on the side, and so is
+the numeric backend of a calculation that has one. Calculation objects are only
+created when an entry is read.
+
+The live entries always occupy one contiguous run of the columns. New entries are
+written after the run, and when the columns are used up the run is copied to the
+front of new columns, so `as_arrays()` can hand NumPy views of the entries without
+copying them, and entries under a view are never overwritten. An append after an
+undo would write to the undone entry's slot; if a view covers that slot, the run is
+copied to new columns first.
+"""
+
+from array import array
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal
+import sys
+from typing import Callable, Dict, Tuple
+from .calculations import Calculation
+from .operations import OPERATIONS
+
+# Operation functions by opcode, and opcodes by operation function
+OPCODES: Tuple[Callable, ...] = tuple(OPERATIONS.values())
+OPCODE_BY_FUNCTION: Dict[Callable, int] = {
+    function: code for code, function in enumerate(OPCODES)}
+# Opcode of an operation that is not in OPERATIONS; the function is kept as an object
+OBJECT_OPCODE = 255
+
+# Kinds of stored numbers
+KIND_DECIMAL = 0
+KIND_INT = 1
+KIND_FLOAT = 2
+KIND_OBJECT = 3
+KIND_ERROR = 4
+
+FIELDS = ('a', 'b', 'result')
+# Keys of the values an entry may keep as objects, besides its fields
+OBJECT_KEYS = ('operation', 'backend') + FIELDS
+
+# Column typecodes: the opcode, then kind, float value, coefficient (low and high
+# 64 bits) and exponent of every field
+COLUMNS: Dict[str, str] = {'opcode': 'B'}
+for _field in FIELDS:
+    COLUMNS.update({f'{_field}_kind': 'B', _field: 'd', f'{_field}_low': 'Q',
+                    f'{_field}_high': 'q', f'{_field}_exp': 'b'})
+
+# Bytes taken by one entry in the columns
+ENTRY_BYTES = sum(array(typecode).itemsize for typecode in COLUMNS.values())
+
+_LOW_MASK = (1 << 64) - 1
+_COEFFICIENT_LIMIT = 1 << 127
+_MAX_DIGITS = 38
+# Context in which scaling a Decimal is always exact
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+_MIN_CAPACITY = 16
+# The columns hold up to capacity + capacity // _SLACK_DIVISOR entries, so the live
+# entries are moved to the front once every capacity // _SLACK_DIVISOR appends
+_SLACK_DIVISOR = 8
+
+
+def to_float(value) -> float:
+    """
+    Convert a number to the float stored in its float column.
+
+    The conversion keeps the order of numbers: if a < b, then to_float(a) <= to_float(b).
+
+    :param value: The number.
+    :return: The nearest float, infinity for numbers beyond the float range, or NaN
+             for values that are not ordered.
+    """
+    try:
+        return float(value)
+    except OverflowError:
+        return float('inf') if value > 0 else float('-inf')
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def encode_number(value) -> tuple:
+    """
+    Split a number into the values of its columns.
+
+    :param value: The number.
+    :return: (kind, float value, coefficient, exponent). The coefficient and
+             exponent are 0 unless the kind is KIND_DECIMAL or KIND_INT.
+    """
+    value_type = type(value)
+    if value_type is float:
+        return KIND_FLOAT, value, 0, 0
+    if value_type is int and -_COEFFICIENT_LIMIT < value < _COEFFICIENT_LIMIT:
+        return KIND_INT, to_float(value), value, 0
+    if value_type is Decimal and value.is_finite():
+        sign, digits, exponent = value.as_tuple()
+        # -0 cannot be told apart from 0 by its coefficient
+        if -128 <= exponent <= 127 and len(digits) <= _MAX_DIGITS and (value or not sign):
+            return KIND_DECIMAL, float(value), int(value.scaleb(-exponent, _EXACT)), exponent
+    return KIND_OBJECT, to_float(value), 0, 0
+
+
+def stored_size(calculation: Calculation) -> int:
+    """
+    Estimate the memory a calculation takes in a ColumnarBuffer.
+
+    :param calculation: The Calculation.
+    :return: ENTRY_BYTES plus the size of the values kept as objects.
+    """
+    size = ENTRY_BYTES
+    if calculation.operation_func not in OPCODE_BY_FUNCTION:
+        size += sys.getsizeof(calculation.operation_func)
+    try:
+        numbers = (calculation.number_one, calculation.number_two, calculation.get_result())
+    except ArithmeticError as e:
+        numbers = (calculation.number_one, calculation.number_two)
+        size += sys.getsizeof(e)
+    for number in numbers:
+        if encode_number(number)[0] == KIND_OBJECT:
+            size += sys.getsizeof(number)
+    return size
+
+
+class ColumnarBuffer:
+    """
+    A fixed-capacity, column-oriented sequence of the most recent calculations.
+
+    It is used like a RingBuffer of Calculation instances: appending to a full buffer
+    drops the oldest calculation, and reading an entry returns a new, evaluated
+    Calculation. Every appended calculation gets a sequence number, which stays valid
+    until the calculation is dropped.
+
+    `undo` hides the newest calculation and `redo` shows it again, in O(1): hidden
+    calculations stay in the columns, after the live ones, until the next append
+    drops them. The contents of the buffer after any number of appends and undos are
+    therefore fully described by `next_seq`, which is what checkpoints record.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize an empty buffer. Columns grow as calculations are added.
+
+        :param capacity: The maximum number of calculations kept.
+        :raises ValueError: If the capacity is smaller than 1.
+        """
+        if capacity < 1:
+            raise ValueError("Columnar buffer capacity must be at least 1.")
+        self.capacity = capacity
+        self._next_seq = 0
+        self._reset()
+
+    def _reset(self):
+        """Drop every entry and the columns holding them."""
+        self._columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self._bind_columns()
+        self._allocated = 0
+        self._start = 0
+        self._size = 0
+        self._hidden = 0
+        # End of the slots covered by views handed out since the columns were created
+        self._viewed_end = 0
+        self._objects: Dict[tuple, object] = {}
+
+    def _bind_columns(self):
+        """Group the columns of every field, in FIELDS order, for appending."""
+        self._field_columns = [tuple(self._columns[f'{field}{suffix}']
+                                     for suffix in ('_kind', '', '_low', '_high', '_exp'))
+                               for field in FIELDS]
+
+    def _relocate(self, allocated: int):
+        """
+        Move the live (and hidden) entries to the front of new columns with
+        `allocated` slots.
+
+        New columns are created rather than resized, so views from `as_arrays` keep
+        pointing at valid memory.
+        """
+        stored = self._size + self._hidden
+        for name, column in self._columns.items():
+            relocated = column[self._start:self._start + stored]
+            relocated.frombytes(bytes((allocated - stored) * column.itemsize))
+            self._columns[name] = relocated
+        self._bind_columns()
+        self._allocated = allocated
+        self._start = 0
+        self._viewed_end = 0
+
+    @property
+    def first_seq(self) -> int:
+        """
+        Return the sequence number of the oldest calculation.
+
+        :return: The sequence number (equal to `next_seq` when the buffer is empty).
+        """
+        return self._next_seq - self._size
+
+    @property
+    def next_seq(self) -> int:
+        """
+        Return the sequence number the next appended calculation will get.
+
+        :return: The sequence number.
+        """
+        return self._next_seq
+
+    @property
+    def redo_count(self) -> int:
+        """
+        Return the number of hidden calculations `redo` can show again.
+
+        :return: The number of hidden calculations.
+        """
+        return self._hidden
+
+    def is_full(self) -> bool:
+        """
+        Check whether the next append will drop the oldest calculation.
+
+        :return: True if the buffer holds `capacity` calculations.
+        """
+        return self._size == self.capacity
+
+    def append(self, calculation: Calculation) -> int:
+        """
+        Add a calculation, dropping the oldest one if the buffer is full and the
+        hidden ones, which can no longer be redone.
+
+        The calculation is evaluated if it has not been yet.
+
+        :param calculation: The Calculation to add.
+        :return: The sequence number of the calculation.
+        """
+        if self._hidden:
+            self._drop_hidden()
+        if self._size == self.capacity:
+            self.popleft()
+        if self._start + self._size < self._viewed_end:
+            # The slot held an undone entry that a view still shows
+            self._relocate(self._allocated)
+        if self._start + self._size == self._allocated:
+            limit = self.capacity + self.capacity // _SLACK_DIVISOR
+            if self._size < self._allocated // 2 or self._allocated >= limit:
+                # Room at the front: slide the live entries back to it
+                self._relocate(self._allocated)
+            else:
+                self._relocate(min(max(self._allocated * 2, _MIN_CAPACITY), limit))
+        seq = self._next_seq
+        slot = self._start + self._size
+
+        opcode = OPCODE_BY_FUNCTION.get(calculation.operation_func, OBJECT_OPCODE)
+        self._columns['opcode'][slot] = opcode
+        if opcode == OBJECT_OPCODE:
+            self._objects[seq, 'operation'] = calculation.operation_func
+        if calculation.backend is not None:
+            self._objects[seq, 'backend'] = calculation.backend
+        try:
+            result = calculation.get_result()
+        except ArithmeticError as e:
+            numbers = (calculation.number_one, calculation.number_two)
+            self._columns['result_kind'][slot] = KIND_ERROR
+            self._columns['result'][slot] = float('nan')
+            self._objects[seq, 'result'] = e
+        else:
+            numbers = (calculation.number_one, calculation.number_two, result)
+        for field, number, (kinds, values, lows, highs, exponents) in zip(
+                FIELDS, numbers, self._field_columns):
+            kind, value, coefficient, exponent = encode_number(number)
+            kinds[slot] = kind
+            values[slot] = value
+            lows[slot] = coefficient & _LOW_MASK
+            highs[slot] = coefficient >> 64
+            exponents[slot] = exponent
+            if kind == KIND_OBJECT:
+                self._objects[seq, field] = number
+
+        self._size += 1
+        self._next_seq += 1
+        return seq
+
+    def popleft(self):
+        """
+        Drop the oldest calculation.
+
+        :raises IndexError: If the buffer is empty.
+        """
+        if not self._size:
+            raise IndexError("pop from an empty columnar buffer")
+        seq = self.first_seq
+        if self._objects:
+            for key in OBJECT_KEYS:
+                self._objects.pop((seq, key), None)
+        self._start += 1
+        self._size -= 1
+
+    def undo(self) -> int:
+        """
+        Hide the newest calculation, keeping it for `redo`.
+
+        :return: The sequence number of the hidden calculation.
+        :raises IndexError: If the buffer is empty.
+        """
+        if not self._size:
+            raise IndexError("undo on an empty columnar buffer")
+        self._size -= 1
+        self._hidden += 1
+        self._next_seq -= 1
+        return self._next_seq
+
+    def redo(self) -> int:
+        """
+        Show the most recently hidden calculation again.
+
+        :return: The sequence number of the calculation.
+        :raises IndexError: If no calculation is hidden.
+        """
+        if not self._hidden:
+            raise IndexError("nothing to redo in the columnar buffer")
+        self._size += 1
+        self._hidden -= 1
+        self._next_seq += 1
+        return self._next_seq - 1
+
+    def _drop_hidden(self):
+        """Forget the hidden calculations."""
+        if self._objects:
+            for seq in range(self._next_seq, self._next_seq + self._hidden):
+                for key in OBJECT_KEYS:
+                    self._objects.pop((seq, key), None)
+        self._hidden = 0
+
+    def clear(self):
+        """
+        Remove all calculations from the buffer, hidden ones included.
+        """
+        self._reset()
+
+    def _slot(self, seq: int) -> int:
+        """Return the column slot of a sequence number."""
+        if not self.first_seq <= seq < self._next_seq:
+            raise IndexError(f"calculation {seq} is not in the buffer")
+        return self._start + seq - self.first_seq
+
+    def _number(self, seq: int, slot: int, field: str):
+        """Decode one field of an entry."""
+        columns = self._columns
+        kind = columns[f'{field}_kind'][slot]
+        if kind == KIND_FLOAT:
+            return columns[field][slot]
+        if kind in (KIND_OBJECT, KIND_ERROR):
+            return self._objects[seq, field]
+        coefficient = (columns[f'{field}_high'][slot] << 64) | columns[f'{field}_low'][slot]
+        if kind == KIND_INT:
+            return coefficient
+        return Decimal(f"{coefficient}E{columns[f'{field}_exp'][slot]}")
+
+    def operation_name(self, seq: int) -> str:
+        """
+        Return the operation name of a calculation.
+
+        :param seq: The sequence number.
+        :return: The operation name, e.g. 'divide'.
+        """
+        opcode = self._columns['opcode'][self._slot(seq)]
+        if opcode == OBJECT_OPCODE:
+            return self._objects[seq, 'operation'].__name__
+        return OPCODES[opcode].__name__
+
+    def result_float(self, seq: int) -> float:
+        """
+        Return the float column value of a calculation's result.
+
+        :param seq: The sequence number.
+        :return: The result as a float, or NaN if the calculation failed or its
+                 result is not ordered.
+        """
+        return self._columns['result'][self._slot(seq)]
+
+    def get(self, seq: int) -> Calculation:
+        """
+        Return the calculation with the given sequence number.
+
+        :param seq: The sequence number.
+        :return: A new, evaluated Calculation.
+        :raises IndexError: If the calculation is no longer (or not yet) in the buffer.
+        """
+        slot = self._slot(seq)
+        opcode = self._columns['opcode'][slot]
+        operation_func = (self._objects[seq, 'operation'] if opcode == OBJECT_OPCODE
+                          else OPCODES[opcode])
+        number_one = self._number(seq, slot, 'a')
+        number_two = self._number(seq, slot, 'b')
+        backend = self._objects.get((seq, 'backend')) if self._objects else None
+        if self._columns['result_kind'][slot] == KIND_ERROR:
+            return Calculation.evaluated(number_one, number_two, operation_func,
+                                         error=self._objects[seq, 'result'], backend=backend)
+        return Calculation.evaluated(number_one, number_two, operation_func,
+                                     result=self._number(seq, slot, 'result'),
+                                     backend=backend)
+
+    def read(self, start_seq: int, stop_seq: int, limit: int) -> Tuple[list, int]:
+        """
+        Return up to `limit` calculations with sequence numbers in [start_seq, stop_seq).
+
+        Calculations that were already dropped are skipped.
+
+        :param start_seq: The first sequence number to read.
+        :param stop_seq: The sequence number to stop before.
+        :param limit: The maximum number of calculations returned.
+        :return: The calculations, oldest first, and the sequence number to read next.
+        """
+        start = max(start_seq, self.first_seq)
+        stop = min(stop_seq, self._next_seq, start + limit)
+        return [self.get(seq) for seq in range(start, stop)], max(stop, start)
+
+    def entry_size(self, index: int) -> int:
+        """
+        Estimate the memory taken by one entry.
+
+        :param index: The position of the entry, oldest first (negative counts from
+                      the newest).
+        :return: ENTRY_BYTES plus the size of the values kept as objects.
+        """
+        seq = self._seq(index)
+        size = ENTRY_BYTES
+        if self._objects:
+            for key in ('operation',) + FIELDS:
+                if (seq, key) in self._objects:
+                    size += sys.getsizeof(self._objects[seq, key])
+        return size
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Return the memory allocated for the columns, in bytes.
+
+        :return: The size of the columns (not counting values kept as objects).
+        """
+        return sum(len(column) * column.itemsize for column in self._columns.values())
+
+    def as_arrays(self) -> Dict[str, 'numpy.ndarray']:
+        """
+        Return NumPy views of the columns, oldest entry first, without copying them.
+
+        The views are not affected by later changes to the buffer. Besides the
+        columns in COLUMNS ('opcode', and 'a', 'b', 'result' with their '_kind',
+        '_low', '_high' and '_exp' columns), the result holds 'seq', the sequence
+        number of every entry. The float columns ('a', 'b', 'result') hold NaN
+        where a value has no float (failed calculations, for instance).
+
+        :return: A dictionary of one-dimensional arrays of equal length.
+        """
+        # Imported here because NumPy is only needed for analytics
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        end = self._start + self._size
+        self._viewed_end = max(self._viewed_end, end)
+        arrays = {name: np.frombuffer(column, dtype=column.typecode)[self._start:end]
+                  for name, column in self._columns.items()}
+        arrays['seq'] = np.arange(self.first_seq, self._next_seq, dtype=np.int64)
+        return arrays
+
+    def _seq(self, index: int) -> int:
+        """Return the sequence number of the entry at a position."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("columnar buffer index out of range")
+        return self.first_seq + index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Calculation:
+        return self.get(self._seq(index))
+
+    def __iter__(self):
+        for seq in range(self.first_seq, self._next_seq):
+            yield self.get(seq)
@@ -0,0 +1,373 @@
+"""
+The Expressions module parses and evaluates infix arithmetic expressions.
+
+An expression such as '(1.5 + 2) * 3 / 7' is tokenized, parsed into an abstract
+syntax tree and compiled into nested closures built on the functions of the
+Operations module. Numbers are parsed as Decimal, and names refer to variables
+supplied when the expression is evaluated; their values are converted to Decimal
+too, so literals and variables can be mixed freely.
+
+Compiled expressions are kept in a bounded LRU cache keyed by source text, so a
+formula that is evaluated again skips tokenizing and parsing entirely. Cache hit
+and miss counters are available from `expression_cache_info`.
+
+Grammar:
+    expression := term (('+' | '-') term)*
+    term       := factor (('*' | '/') factor)*
+    factor     := ('+' | '-') factor | NUMBER | NAME | '(' expression ')'
+"""
+
+from abc import ABC, abstractmethod
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from functools import lru_cache
+import re
+from typing import Callable, Dict, FrozenSet, List, Tuple
+from .operations import add, subtract, multiply, divide
+
+EXPRESSION_CACHE_SIZE = 1024
+# Deepest nesting of parentheses and signs; deeper syntax trees would exhaust the stack
+MAX_NESTING = 100
+
+BINARY_OPERATORS = {
+    '+': add,
+    '-': subtract,
+    '*': multiply,
+    '/': divide,
+}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<symbol>[-+*/()])
+      | (?P<invalid>\S)
+    )""", re.VERBOSE)
+
+Evaluator = Callable[[Dict[str, object]], object]
+
+
+class ExpressionError(ValueError):
+    """
+    Raised when an expression cannot be parsed or refers to an unknown variable.
+    """
+
+
+def to_decimal(name: str, value) -> Decimal:
+    """
+    Convert a variable's value to Decimal.
+
+    Floats go through their shortest repr, so 0.1 becomes Decimal('0.1'), and
+    Fractions are divided out in the current decimal context.
+
+    :param name: The variable name, for the error message.
+    :param value: An int, float, Decimal, Fraction or numeric string.
+    :return: The Decimal value.
+    :raises ExpressionError: If the value is not a number.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, Fraction):
+        return Decimal(value.numerator) / value.denominator
+    try:
+        return Decimal(value if isinstance(value, (int, str)) else str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        raise ExpressionError(f"Variable '{name}' is not a number: {value!r}.") from None
+
+
+class Node(ABC):
+    """
+    Base class for the nodes of an expression's syntax tree.
+    """
+
+    @abstractmethod
+    def compile(self) -> Evaluator:
+        """
+        Compile the node into a function of the variables mapping.
+
+        :return: The evaluator function.
+        """
+
+    def names(self) -> FrozenSet[str]:
+        """
+        Return the variable names the node refers to.
+
+        :return: A frozenset of names.
+        """
+        return frozenset()
+
+
+class Number(Node):
+    """A literal number."""
+
+    def __init__(self, value: Decimal):
+        self.value = value
+
+    def compile(self) -> Evaluator:
+        value = self.value
+        return lambda variables: value
+
+    def __repr__(self):
+        return f"Number({self.value})"
+
+
+class Name(Node):
+    """A reference to a variable."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def compile(self) -> Evaluator:
+        name = self.name
+
+        def evaluate(variables):
+            try:
+                value = variables[name]
+            except KeyError:
+                raise ExpressionError(f"Unknown variable '{name}'.") from None
+            return to_decimal(name, value)
+        return evaluate
+
+    def names(self) -> FrozenSet[str]:
+        return frozenset((self.name,))
+
+    def __repr__(self):
+        return f"Name({self.name})"
+
+
+class Negate(Node):
+    """Unary minus applied to an operand."""
+
+    def __init__(self, operand: Node):
+        self.operand = operand
+
+    def compile(self) -> Evaluator:
+        operand = self.operand.compile()
+        return lambda variables: -operand(variables)
+
+    def names(self) -> FrozenSet[str]:
+        return self.operand.names()
+
+    def __repr__(self):
+        return f"Negate({self.operand!r})"
+
+
+class BinaryOperation(Node):
+    """An arithmetic operation on two operands."""
+
+    def __init__(self, operation_func: Callable, left: Node, right: Node):
+        self.operation_func = operation_func
+        self.left = left
+        self.right = right
+
+    def compile(self) -> Evaluator:
+        operation_func = self.operation_func
+        left, right = self.left.compile(), self.right.compile()
+        return lambda variables: operation_func(left(variables), right(variables))
+
+    def names(self) -> FrozenSet[str]:
+        return self.left.names() | self.right.names()
+
+    def __repr__(self):
+        return f"{self.operation_func.__name__}({self.left!r}, {self.right!r})"
+
+
+class OperationChain(Node):
+    """
+    Operations of the same precedence applied left to right, such as '1 - 2 + 3'.
+
+    A long chain is one node evaluated in a loop rather than a deep tree of
+    BinaryOperations, so its length is not limited by the stack.
+    """
+
+    def __init__(self, first: Node, rest: List[Tuple[Callable, Node]]):
+        self.first = first
+        self.rest = rest
+
+    def compile(self) -> Evaluator:
+        first = self.first.compile()
+        rest = [(operation_func, operand.compile()) for operation_func, operand in self.rest]
+
+        def evaluate(variables):
+            value = first(variables)
+            for operation_func, operand in rest:
+                value = operation_func(value, operand(variables))
+            return value
+        return evaluate
+
+    def names(self) -> FrozenSet[str]:
+        return self.first.names().union(*(operand.names() for _, operand in self.rest))
+
+    def __repr__(self):
+        operations = ''.join(f", {operation_func.__name__}({operand!r})"
+                             for operation_func, operand in self.rest)
+        return f"chain({self.first!r}{operations})"
+
+
+def tokenize(source: str) -> List[Tuple[str, str]]:
+    """
+    Split an expression into (kind, text) tokens.
+
+    :param source: The expression text.
+    :return: The list of tokens, where kind is 'number', 'name' or 'symbol'.
+    :raises ExpressionError: If the text contains an unexpected character.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(source.rstrip()):
+        kind = match.lastgroup
+        if kind == 'invalid':
+            raise ExpressionError(f"Unexpected character '{match.group(kind)}'.")
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser over a list of tokens."""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> str:
+        """Return the text of the next token, or '' at the end."""
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else ''
+
+    def take(self) -> Tuple[str, str]:
+        """Consume and return the next token."""
+        if self.position >= len(self.tokens):
+            raise ExpressionError("Unexpected end of expression.")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        """Parse the whole token list."""
+        if not self.tokens:
+            raise ExpressionError("Empty expression.")
+        node = self.expression()
+        if self.position < len(self.tokens):
+            raise ExpressionError(f"Unexpected '{self.peek()}'.")
+        return node
+
+    def chain(self, operand: Callable[[], Node], symbols: Tuple[str, str]) -> Node:
+        """Parse operands joined by operators of the same precedence."""
+        first, rest = operand(), []
+        while self.peek() in symbols:
+            operation_func = BINARY_OPERATORS[self.take()[1]]
+            rest.append((operation_func, operand()))
+        if not rest:
+            return first
+        if len(rest) == 1:
+            return BinaryOperation(rest[0][0], first, rest[0][1])
+        return OperationChain(first, rest)
+
+    def expression(self) -> Node:
+        """Parse a sum or difference of terms."""
+        return self.chain(self.term, ('+', '-'))
+
+    def term(self) -> Node:
+        """Parse a product or quotient of factors."""
+        return self.chain(self.factor, ('*', '/'))
+
+    def factor(self) -> Node:
+        """Parse a signed number, a name or a parenthesized expression."""
+        if self.depth >= MAX_NESTING:
+            raise ExpressionError(f"Expression is nested more than {MAX_NESTING} levels deep.")
+        self.depth += 1
+        try:
+            return self._factor()
+        finally:
+            self.depth -= 1
+
+    def _factor(self) -> Node:
+        """Parse a factor one nesting level down."""
+        kind, text = self.take()
+        if kind == 'number':
+            return Number(Decimal(text))
+        if kind == 'name':
+            return Name(text)
+        if text == '-':
+            return Negate(self.factor())
+        if text == '+':
+            return self.factor()
+        if text == '(':
+            node = self.expression()
+            if self.take()[1] != ')':
+                raise ExpressionError("Expected ')'.")
+            return node
+        raise ExpressionError(f"Unexpected '{text}'.")
+
+
+def parse_expression(source: str) -> Node:
+    """
+    Parse an expression into its syntax tree.
+
+    :param source: The expression text.
+    :return: The root Node.
+    :raises ExpressionError: If the expression is not valid.
+    """
+    return _Parser(tokenize(source)).parse()
+
+
+class CompiledExpression:
+    """
+    A parsed and compiled expression that can be evaluated repeatedly.
+    """
+
+    __slots__ = ('source', 'tree', 'names', '_evaluator')
+
+    def __init__(self, source: str):
+        """
+        Parse and compile an expression.
+
+        :param source: The expression text.
+        :raises ExpressionError: If the expression is not valid.
+        """
+        self.source = source
+        self.tree = parse_expression(source)
+        self.names = self.tree.names()
+        self._evaluator = self.tree.compile()
+
+    def evaluate(self, variables: Dict[str, object] = None):
+        """
+        Evaluate the expression.
+
+        :param variables: Values for the names used in the expression.
+        :return: The result.
+        :raises ExpressionError: If a variable is missing or not a number.
+        :raises ZeroDivisionError: If the expression divides by zero.
+        """
+        return self._evaluator(variables or {})
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(source: str) -> CompiledExpression:
+    """
+    Compile an expression, reusing the cached result for text seen before.
+
+    :param source: The expression text.
+    :return: The CompiledExpression.
+    :raises ExpressionError: If the expression is not valid.
+    """
+    return CompiledExpression(source)
+
+
+def evaluate_expression(source: str, variables: Dict[str, object] = None):
+    """
+    Compile (or fetch from the cache) and evaluate an expression.
+
+    :param source: The expression text.
+    :param variables: Values for the names used in the expression.
+    :return: The result.
+    """
+    return compile_expression(source.strip()).evaluate(variables)
+
+
+def expression_cache_info():
+    """
+    Report the compiled-expression cache statistics.
+
+    :return: A named tuple with hits, misses, maxsize and currsize.
+    """
+    return compile_expression.cache_info()
@@ -0,0 +1,93 @@
+"""
+The History Eviction module decides what happens to calculations that fall out of a
+bounded history.
+
+A history hands its oldest calculation to its EvictionPolicy just before removing
+it. DropOldestPolicy forgets it; SpillToDiskPolicy appends it to a CSV file.
+EVICTION_POLICIES maps the names accepted by HISTORY_EVICTION_POLICY to the classes.
+"""
+
+from abc import ABC, abstractmethod
+import atexit
+import csv
+import os
+from .calculations import Calculation
+
+DEFAULT_SPILL_FILE = os.path.join('logs', 'history_spill.csv')
+
+
+class EvictionPolicy(ABC):
+    """
+    Decides what happens to a calculation that is evicted from the history.
+    """
+
+    @abstractmethod
+    def evict(self, calculation: Calculation):
+        """
+        Handle a calculation that no longer fits in the history.
+
+        :param calculation: The oldest Calculation, about to be overwritten.
+        """
+
+
+class DropOldestPolicy(EvictionPolicy):
+    """
+    Discard evicted calculations.
+    """
+
+    def evict(self, calculation: Calculation):
+        """
+        Discard the calculation.
+
+        :param calculation: The evicted Calculation.
+        """
+
+
+class SpillToDiskPolicy(EvictionPolicy):
+    """
+    Append evicted calculations to a CSV file so they are not lost.
+
+    Each row holds the first number, the operation name, the second number and
+    the result. The file is opened on the first eviction and flushed on exit.
+    """
+
+    def __init__(self, path: str = DEFAULT_SPILL_FILE):
+        """
+        Initialize the policy.
+
+        :param path: The CSV file evicted calculations are appended to.
+        """
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def evict(self, calculation: Calculation):
+        """
+        Write the calculation to the spill file.
+
+        :param calculation: The evicted Calculation.
+        """
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            atexit.register(self.close)
+        self._writer.writerow([calculation.number_one, calculation.operation_func.__name__,
+                               calculation.number_two, calculation.get_result()])
+
+    def close(self):
+        """
+        Flush and close the spill file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+EVICTION_POLICIES = {
+    'drop_oldest': DropOldestPolicy,
+    'spill': SpillToDiskPolicy,
+}
@@ -0,0 +1,261 @@
+"""
+The History Index module keeps secondary indexes over a calculation history.
+
+A HistoryIndex refers to the calculations of a ColumnarBuffer by their sequence
+numbers. It is updated as calculations are added and evicted, and answers queries
+without scanning or recomputing the history:
+
+- a posting list per operation, in insertion order;
+- a result index sorted by result, overall and per operation.
+
+The result indexes are sorted by the float value of the result, which the
+ColumnarBuffer keeps in a column, so keeping them sorted costs a binary search
+over floats and an array insertion or deletion (a memory move, O(n)) per added or
+evicted calculation, and the index holds no Calculation or Decimal objects.
+Converting to float keeps the order of results, but results that differ only beyond
+float precision share a float; queries compare those exactly. Range and top-k
+queries cost O(log n) plus the size of the answer. Calculations whose result is an
+error or NaN are kept in the posting lists but not in the result index.
+
+Undo and redo are O(1): an undone calculation leaves its posting list, but stays in
+the result indexes, where queries skip it (its sequence number is not below the
+buffer's `next_seq`) until it is redone. Undone calculations are only deleted from
+the result indexes when the next calculation is added and they can no longer be
+redone, which costs what adding them did.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from .calculations import Calculation
+from .columnar_buffer import ColumnarBuffer, to_float
+
+
+class _PostingList:
+    """Sequence numbers in insertion order, removed from the front or the back."""
+
+    __slots__ = ('seqs', 'head')
+
+    def __init__(self):
+        self.seqs = array('q')
+        self.head = 0
+
+    def popleft(self):
+        """Remove the oldest sequence number."""
+        self.head += 1
+        # Drop the removed numbers once they are half of the array
+        if self.head * 2 >= len(self.seqs):
+            del self.seqs[:self.head]
+            self.head = 0
+
+    def pop(self):
+        """Remove the newest sequence number."""
+        self.seqs.pop()
+        if len(self.seqs) == self.head:
+            del self.seqs[:]
+            self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.head
+
+
+class _ResultIndex:
+    """Sequence numbers sorted by the float value of their result, then by age."""
+
+    __slots__ = ('values', 'seqs')
+
+    def __init__(self):
+        self.values = array('d')
+        self.seqs = array('q')
+
+    def insert(self, value: float, seq: int):
+        """Add the newest calculation, after the older ones with the same value."""
+        position = bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.seqs.insert(position, seq)
+
+    def remove(self, value: float, seq: int):
+        """Remove a calculation."""
+        position = bisect_left(self.values, value)
+        while self.seqs[position] != seq:
+            position += 1
+        del self.values[position]
+        del self.seqs[position]
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+
+class HistoryIndex:
+    """
+    Posting lists and sorted result indexes for the calculations of a ColumnarBuffer.
+
+    Calculations are expected to be evicted oldest first, as the histories do, or
+    undone newest first, and must still be in the buffer when they are added to,
+    discarded from, undone in or redone in the index.
+    """
+
+    def __init__(self, store: ColumnarBuffer):
+        """
+        Initialize an empty index.
+
+        :param store: The buffer holding the indexed calculations.
+        """
+        self._store = store
+        self._by_operation: Dict[str, _PostingList] = {}
+        self._by_result = _ResultIndex()
+        self._by_operation_result: Dict[str, _ResultIndex] = {}
+        # (operation name, result float, sequence number) of the undone calculations
+        # still in the result indexes, the most recently undone last
+        self._undone: List[Tuple[str, float, int]] = []
+
+    def add(self, seq: int):
+        """
+        Index a calculation that was just added to the history.
+
+        The undone calculations, which can no longer be redone, are removed first.
+
+        :param seq: The sequence number of the calculation.
+        """
+        while self._undone:
+            operation_name, value, undone_seq = self._undone.pop()
+            self._by_result.remove(value, undone_seq)
+            self._by_operation_result[operation_name].remove(value, undone_seq)
+        operation_name = self._store.operation_name(seq)
+        postings = self._by_operation.get(operation_name)
+        if postings is None:
+            postings = self._by_operation[operation_name] = _PostingList()
+        postings.seqs.append(seq)
+        value = self._store.result_float(seq)
+        if value == value:  # pylint: disable=comparison-with-itself
+            self._by_result.insert(value, seq)
+            operation_index = self._by_operation_result.get(operation_name)
+            if operation_index is None:
+                operation_index = self._by_operation_result[operation_name] = _ResultIndex()
+            operation_index.insert(value, seq)
+
+    def discard(self, seq: int):
+        """
+        Remove the oldest calculation, which is about to be evicted from the history.
+
+        :param seq: The sequence number of the calculation.
+        """
+        operation_name = self._store.operation_name(seq)
+        self._by_operation[operation_name].popleft()
+        value = self._store.result_float(seq)
+        if value == value:  # pylint: disable=comparison-with-itself
+            self._by_result.remove(value, seq)
+            self._by_operation_result[operation_name].remove(value, seq)
+
+    def undo(self, seq: int):
+        """
+        Hide the newest calculation, which is about to be undone.
+
+        :param seq: The sequence number of the calculation.
+        """
+        operation_name = self._store.operation_name(seq)
+        self._by_operation[operation_name].pop()
+        value = self._store.result_float(seq)
+        if value == value:  # pylint: disable=comparison-with-itself
+            self._undone.append((operation_name, value, seq))
+
+    def redo(self, seq: int):
+        """
+        Show a calculation that was just redone again.
+
+        :param seq: The sequence number of the calculation.
+        """
+        operation_name = self._store.operation_name(seq)
+        self._by_operation[operation_name].seqs.append(seq)
+        if self._undone and self._undone[-1][2] == seq:
+            self._undone.pop()
+
+    def clear(self):
+        """
+        Remove every calculation from the index.
+        """
+        self._by_operation.clear()
+        self._by_result = _ResultIndex()
+        self._by_operation_result.clear()
+        self._undone.clear()
+
+    def _calculations(self, seqs) -> List[Calculation]:
+        """Return the calculations with the given sequence numbers."""
+        return [self._store.get(seq) for seq in seqs]
+
+    def by_operation(self, operation_name: str) -> List[Calculation]:
+        """
+        Return the calculations of one operation, oldest first.
+
+        :param operation_name: The operation name, e.g. 'divide'.
+        :return: A list of Calculation instances.
+        """
+        postings = self._by_operation.get(operation_name)
+        if postings is None:
+            return []
+        return self._calculations(postings.seqs[postings.head:])
+
+    def _result_index(self, operation_name: Optional[str]) -> _ResultIndex:
+        if operation_name is None:
+            return self._by_result
+        return self._by_operation_result.get(operation_name, _ResultIndex())
+
+    def by_result(self, low=None, high=None,
+                  operation_name: str = None) -> List[Calculation]:
+        """
+        Return the calculations whose result lies in [low, high], by ascending result.
+
+        :param low: The smallest result, or None for no lower bound.
+        :param high: The largest result, or None for no upper bound.
+        :param operation_name: Only return calculations of this operation.
+        :return: A list of Calculation instances.
+        """
+        index = self._result_index(operation_name)
+        start = 0 if low is None else bisect_left(index.values, to_float(low))
+        end = len(index) if high is None else bisect_right(index.values, to_float(high))
+        visible = self._store.next_seq
+        seqs = [seq for seq in index.seqs[start:end] if seq < visible]
+        calculations = [calculation for calculation in self._calculations(seqs)
+                        if (low is None or calculation.get_result() >= low)
+                        and (high is None or calculation.get_result() <= high)]
+        # Only results that share a float can be out of order
+        calculations.sort(key=Calculation.get_result)
+        return calculations
+
+    def top_k(self, k: int, operation_name: str = None, largest: bool = True,
+              low=None, high=None) -> List[Calculation]:
+        """
+        Return the k calculations with the largest (or smallest) results.
+
+        :param k: The number of calculations.
+        :param operation_name: Only consider calculations of this operation.
+        :param largest: True for the largest results, False for the smallest.
+        :param low: Only consider results of at least this value, or None.
+        :param high: Only consider results of at most this value, or None.
+        :return: A list of Calculation instances, the most extreme first.
+        """
+        index = self._result_index(operation_name)
+        if k <= 0:
+            return []
+        values, visible = index.values, self._store.next_seq
+        start = 0 if low is None else bisect_left(values, to_float(low))
+        end = len(index) if high is None else bisect_right(values, to_float(high))
+        positions = range(end - 1, start - 1, -1) if largest else range(start, end)
+        calculations, kth_value = [], None
+        for position in positions:
+            # Include every result that shares a float with the k-th one
+            if len(calculations) >= k and values[position] != kth_value:
+                break
+            seq = index.seqs[position]
+            if seq >= visible:
+                continue
+            calculation = self._store.get(seq)
+            if ((low is None or calculation.get_result() >= low)
+                    and (high is None or calculation.get_result() <= high)):
+                calculations.append(calculation)
+                kth_value = values[position]
+        calculations.sort(key=Calculation.get_result, reverse=largest)
+        return calculations[:k]
+
+    def __len__(self) -> int:
+        return sum(len(postings) for postings in self._by_operation.values())
@@ -0,0 +1,356 @@
+"""
+The History IO module exports a calculation history to CSV or NDJSON files and
+imports it back.
+
+Both directions stream: the history is read in chunks of `chunk_size` calculations
+(see `iter_chunks` on the histories), rows are produced by generators and the file
+is read line by line, so memory stays constant however many calculations are moved.
+
+CSV files have the header `operation,a,b,result,a_type,b_type,backend`, where the
+types are the operand tags of the history log ('d' Decimal, 'i' int, 'f' float, 'q'
+Fraction). NDJSON files hold one object per line, `{"operation": ..., "a": ..., "b":
+..., "result": ..., "backend": ...}`, with Decimal operands as strings, Fraction
+operands as strings of the form 'numerator/denominator' and int and float operands
+as JSON numbers. The backend is the spec of the numeric backend the calculation was
+computed with (e.g. 'decimal:50:ROUND_HALF_UP', see the Backends module), or empty
+(CSV) or null (NDJSON) for none; imported calculations are computed again from their
+operands with that backend. The result is informative. It is empty (CSV) or null
+(NDJSON) for calculations that failed. Files written before the backend was exported
+(without the column or field) are still imported, without backends.
+
+An import records its progress in `<path>.progress` after every chunk. If it is
+interrupted (or stops at a malformed row), importing the same file again resumes
+after the last imported chunk. The progress file is removed once the import
+completes.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+import csv
+import hashlib
+import json
+import os
+import time
+from typing import Iterable, Iterator, List, Tuple
+from .backends import backend_from_spec
+from .calculations import Calculation
+from .history_log import OPERAND_PARSERS, OPERAND_TYPES
+from .operations import OPERATIONS
+
+DEFAULT_CHUNK_SIZE = 10000
+CSV_HEADER = ['operation', 'a', 'b', 'result', 'a_type', 'b_type', 'backend']
+# The header of exports without backends, which can still be imported
+LEGACY_CSV_HEADER = CSV_HEADER[:-1]
+FORMATS_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+# Bytes at each end of the imported part of a file that identify it when resuming
+FINGERPRINT_SIZE = 4096
+
+
+class TransferReport:
+    """
+    This class describes a finished export or import.
+
+    :ivar rows: The number of calculations written or imported.
+    :ivar skipped: The number of calculations that could not be exported.
+    :ivar size: The number of bytes written or read.
+    :ivar seconds: The elapsed time.
+    :ivar resumed_rows: The number of rows imported by earlier, interrupted imports.
+    """
+
+    def __init__(self, rows: int, skipped: int, size: int, seconds: float,
+                 resumed_rows: int = 0):
+        self.rows = rows
+        self.skipped = skipped
+        self.size = size
+        self.seconds = seconds
+        self.resumed_rows = resumed_rows
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Return the throughput in rows per second.
+
+        :return: Rows per second.
+        """
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """
+        Return the throughput in megabytes per second.
+
+        :return: Megabytes (10**6 bytes) per second.
+        """
+        return self.size / 1e6 / self.seconds if self.seconds > 0 else float('inf')
+
+
+def detect_format(path: str, file_format: str = None) -> str:
+    """
+    Return the file format to use for a path.
+
+    :param path: The file path.
+    :param file_format: 'csv' or 'ndjson', or None to choose from the extension.
+    :return: The format.
+    :raises ValueError: If the format is unknown or cannot be told from the extension.
+    """
+    if file_format is None:
+        file_format = FORMATS_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise ValueError(f"Cannot tell the format of '{path}' from its extension; "
+                             "use format=csv or format=ndjson.")
+    if file_format not in FORMATS_BY_EXTENSION.values():
+        raise ValueError(f"Unknown format '{file_format}'. Use csv or ndjson.")
+    return file_format
+
+
+def _exportable(calculation: Calculation) -> bool:
+    """Check whether a calculation can be imported again once exported."""
+    operation_func = calculation.operation_func
+    return (OPERATIONS.get(operation_func.__name__) is operation_func
+            and type(calculation.number_one) in OPERAND_TYPES
+            and type(calculation.number_two) in OPERAND_TYPES)
+
+
+def _result_text(calculation: Calculation):
+    """Return the result as text, or None if the calculation failed."""
+    try:
+        return str(calculation.get_result())
+    except ArithmeticError:
+        return None
+
+
+def _backend_spec(calculation: Calculation):
+    """Return the spec of the calculation's backend, or None if it has none."""
+    return None if calculation.backend is None else calculation.backend.spec
+
+
+def _csv_rows(calculations: Iterable[Calculation]) -> Iterator[list]:
+    """Yield the CSV row of every calculation."""
+    for calculation in calculations:
+        number_one, number_two = calculation.number_one, calculation.number_two
+        result = _result_text(calculation)
+        yield [calculation.operation_func.__name__, number_one, number_two,
+               '' if result is None else result,
+               OPERAND_TYPES[type(number_one)], OPERAND_TYPES[type(number_two)],
+               _backend_spec(calculation) or '']
+
+
+def _json_operand(number):
+    """Return an operand as a JSON value: Decimals and Fractions as strings, others as numbers."""
+    if isinstance(number, Fraction):
+        return f"{number.numerator}/{number.denominator}"
+    return str(number) if isinstance(number, Decimal) else number
+
+
+def _ndjson_lines(calculations: Iterable[Calculation]) -> Iterator[str]:
+    """Yield the NDJSON line of every calculation."""
+    for calculation in calculations:
+        yield json.dumps({
+            'operation': calculation.operation_func.__name__,
+            'a': _json_operand(calculation.number_one),
+            'b': _json_operand(calculation.number_two),
+            'result': _result_text(calculation),
+            'backend': _backend_spec(calculation),
+        }) + '\n'
+
+
+def export_history(history, path: str, file_format: str = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> TransferReport:
+    """
+    Write the calculations of a history to a file, streaming them in chunks.
+
+    Calculations that could not be imported again (with an operation that is not in
+    OPERATIONS or operands that are not Decimal, int, float or Fraction) are skipped.
+
+    :param history: A SessionHistory, such as CalculationsHistory.default.
+    :param path: The file to write (replaced if it exists).
+    :param file_format: 'csv' or 'ndjson', or None to choose from the extension.
+    :param chunk_size: The number of calculations read from the history at a time.
+    :return: The TransferReport.
+    """
+    file_format = detect_format(path, file_format)
+    started = time.perf_counter()
+    rows = skipped = 0
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as export_file:
+        writer = csv.writer(export_file) if file_format == 'csv' else None
+        if writer is not None:
+            writer.writerow(CSV_HEADER)
+        for chunk in history.iter_chunks(chunk_size):
+            exportable = [calculation for calculation in chunk if _exportable(calculation)]
+            skipped += len(chunk) - len(exportable)
+            rows += len(exportable)
+            if writer is not None:
+                writer.writerows(_csv_rows(exportable))
+            else:
+                export_file.writelines(_ndjson_lines(exportable))
+        size = export_file.tell()
+    return TransferReport(rows, skipped, size, time.perf_counter() - started)
+
+
+def _parse_json_operand(value, name: str):
+    """Convert an NDJSON operand back to a number."""
+    if isinstance(value, str):
+        return Fraction(value) if '/' in value else Decimal(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{name}' must be a number or a numeric string")
+    return value
+
+
+def _parse_backend(spec):
+    """Convert an exported backend spec back to a backend; empty or None is none."""
+    if spec is None or spec == '':
+        return None
+    if not isinstance(spec, str):
+        raise ValueError("'backend' must be a backend spec or null")
+    return backend_from_spec(spec)
+
+
+def _parse_row(file_format: str, line: str, columns: List[str]) -> Calculation:
+    """
+    Parse one line of an export into a Calculation, with the backend it names.
+
+    :raises ValueError: If the line is malformed.
+    """
+    if file_format == 'csv':
+        row = next(csv.reader([line]))
+        if len(row) != len(columns):
+            raise ValueError(f"expected {len(columns)} fields, got {len(row)}")
+        values = dict(zip(columns, row))
+        try:
+            number_one = OPERAND_PARSERS[values['a_type']](values['a'])
+            number_two = OPERAND_PARSERS[values['b_type']](values['b'])
+        except KeyError as e:
+            raise ValueError(f"unknown operand type {e}") from None
+    else:
+        values = json.loads(line)
+        if not isinstance(values, dict):
+            raise ValueError("expected a JSON object")
+        number_one = _parse_json_operand(values.get('a'), 'a')
+        number_two = _parse_json_operand(values.get('b'), 'b')
+    operation_func = OPERATIONS.get(values.get('operation'))
+    if operation_func is None:
+        raise ValueError(f"'{values.get('operation')}' is not a valid operation")
+    return Calculation(number_one, number_two, operation_func,
+                       backend=_parse_backend(values.get('backend')))
+
+
+def _fingerprint(path: str, offset: int) -> str:
+    """
+    Return a hash of the first `offset` bytes of a file (of their first and last
+    FINGERPRINT_SIZE bytes). The rest of the file may change between an interrupted
+    import and its resumption, for example when a malformed row is fixed.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        digest.update(file.read(min(offset, FINGERPRINT_SIZE)))
+        file.seek(max(offset - FINGERPRINT_SIZE, 0))
+        digest.update(file.read(min(offset, FINGERPRINT_SIZE)))
+    return digest.hexdigest()
+
+
+def progress_path(path: str) -> str:
+    """
+    Return the path of the progress file of an import.
+
+    :param path: The imported file.
+    :return: The progress file path.
+    """
+    return f"{path}.progress"
+
+
+def _load_progress(path: str) -> dict:
+    """Return the saved progress of an import of this file, if any."""
+    try:
+        with open(progress_path(path), encoding='utf-8') as progress_file:
+            progress = json.load(progress_file)
+        offset = progress['offset']
+        if offset <= os.path.getsize(path) and (
+                progress['fingerprint'] == _fingerprint(path, offset)):
+            return progress
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    return None
+
+
+def _save_progress(path: str, progress: dict):
+    """Atomically replace the progress file of an import."""
+    temporary_path = f"{progress_path(path)}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as progress_file:
+        json.dump(progress, progress_file)
+    os.replace(temporary_path, progress_path(path))
+
+
+def _lines(import_file, offset: int) -> Iterator[Tuple[int, str]]:
+    """Yield (offset after the line, line) for every line from `offset` on."""
+    import_file.seek(offset)
+    for raw_line in import_file:
+        offset += len(raw_line)
+        yield offset, raw_line.decode('utf-8')
+
+
+def import_history(history, path: str, file_format: str = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> TransferReport:
+    """
+    Add the calculations of an exported file to a history, streaming them in chunks.
+
+    Each chunk is added to the history as a whole, then the progress is saved, so an
+    interrupted import can be resumed by importing the same file again.
+
+    :param history: A SessionHistory, such as CalculationsHistory.default.
+    :param path: The file to read.
+    :param file_format: 'csv' or 'ndjson', or None to choose from the extension.
+    :param chunk_size: The number of calculations added to the history at a time.
+    :return: The TransferReport. Its `rows` count only this import.
+    :raises ValueError: If a row is malformed. The chunks before it stay imported.
+    """
+    file_format = detect_format(path, file_format)
+    started = time.perf_counter()
+    progress = _load_progress(path) or {'offset': 0, 'line': 0, 'rows': 0}
+    resumed_rows = progress['rows']
+    start_offset = progress['offset']
+
+    with open(path, 'rb') as import_file:
+        columns = None
+        if file_format == 'csv':
+            header = import_file.readline()
+            columns = next(csv.reader([header.decode('utf-8')]), [])
+            if sorted(columns) not in (sorted(CSV_HEADER), sorted(LEGACY_CSV_HEADER)):
+                raise ValueError(f"{path}: expected the CSV header {','.join(CSV_HEADER)}")
+            if progress['offset'] == 0:
+                progress['offset'], progress['line'] = len(header), 1
+        chunk: List[Calculation] = []
+        line_number = progress['line']
+        offset = progress['offset']
+        for offset, line in _lines(import_file, progress['offset']):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                chunk.append(_parse_row(file_format, line, columns))
+            except (ValueError, ArithmeticError) as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            if len(chunk) == chunk_size:
+                _add_chunk(history, chunk, path, progress, offset, line_number)
+                chunk = []
+        _add_chunk(history, chunk, path, progress, offset, line_number)
+        size = offset - start_offset
+    os.remove(progress_path(path))
+    return TransferReport(progress['rows'] - resumed_rows, 0, size,
+                          time.perf_counter() - started, resumed_rows)
+
+
+def _add_chunk(history, chunk: List[Calculation], path: str, progress: dict,
+               offset: int, line_number: int):
+    """Add a chunk of imported calculations to the history and save the progress."""
+    for calculation in chunk:
+        history.add_calculation(calculation)
+    progress.update(offset=offset, line=line_number, rows=progress['rows'] + len(chunk),
+                    fingerprint=_fingerprint(path, offset))
+    _save_progress(path, progress)
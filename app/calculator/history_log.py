@@ -0,0 +1,240 @@
+"""
+The History Log module persists calculation history in an append-only file.
+
+Every record is a 4-byte little-endian length followed by a UTF-8 payload of the
+form '<operation> <operand> <operand>', where each operand is prefixed with a type
+tag ('d' Decimal, 'i' int, 'f' float, 'q' Fraction). Calculations computed with a
+numeric backend add its spec (e.g. 'decimal:50:ROUND_HALF_UP', see the Backends
+module) as a fourth field, so they are computed the same way when restored. A
+record whose payload is 'undo' removes the newest calculation before it; redoing a
+calculation appends it again.
+
+Records are buffered and written with group commit: one write and one fsync for
+every `group_size` records, or once `sync_interval` seconds have passed since the
+last sync, whichever comes first.
+
+On startup the file is memory-mapped and scanned by length prefix, so only the
+records that are actually restored get decoded. A torn record at the end of the
+file (from a crash in the middle of a write) is discarded.
+"""
+
+import atexit
+from collections import deque
+from decimal import Decimal
+from fractions import Fraction
+import mmap
+import os
+import struct
+import time
+from typing import Iterable, List
+from .backends import backend_from_spec
+from .calculations import Calculation
+from .operations import OPERATIONS
+
+DEFAULT_LOG_FILE = os.path.join('logs', 'history.wal')
+
+RECORD_HEADER = struct.Struct('<I')
+UNDO_PAYLOAD = b'undo'
+UNDO_RECORD = RECORD_HEADER.pack(len(UNDO_PAYLOAD)) + UNDO_PAYLOAD
+
+OPERAND_TYPES = {
+    Decimal: 'd',
+    int: 'i',
+    float: 'f',
+    Fraction: 'q',
+}
+
+OPERAND_PARSERS = {
+    'd': Decimal,
+    'i': int,
+    'f': float,
+    'q': Fraction,
+}
+
+
+def encode_calculation(calculation: Calculation) -> bytes:
+    """
+    Encode a calculation as a length-prefixed record.
+
+    :param calculation: The Calculation to encode.
+    :return: The record bytes.
+    :raises ValueError: If an operand type or the operation cannot be stored.
+    """
+    operation_name = calculation.operation_func.__name__
+    if OPERATIONS.get(operation_name) is not calculation.operation_func:
+        raise ValueError(f"Operation '{operation_name}' cannot be stored in the history log.")
+    operands = []
+    for number in (calculation.number_one, calculation.number_two):
+        tag = OPERAND_TYPES.get(type(number))
+        if tag is None:
+            raise ValueError(f"Operand type '{type(number).__name__}' cannot be stored.")
+        operands.append(f"{tag}{number!r}" if tag == 'f' else f"{tag}{number}")
+    if calculation.backend is not None:
+        operands.append(calculation.backend.spec)
+    payload = ' '.join((operation_name, *operands)).encode('utf-8')
+    return RECORD_HEADER.pack(len(payload)) + payload
+
+
+def decode_calculation(payload: bytes) -> Calculation:
+    """
+    Decode a record payload (without its length prefix) into a Calculation.
+
+    :param payload: The record payload.
+    :return: The Calculation.
+    """
+    operation_name, number_one, number_two, *backend = payload.decode('utf-8').split(' ')
+    return Calculation(OPERAND_PARSERS[number_one[0]](number_one[1:]),
+                       OPERAND_PARSERS[number_two[0]](number_two[1:]),
+                       OPERATIONS[operation_name],
+                       backend=backend_from_spec(backend[0]) if backend else None)
+
+
+class HistoryLog:
+    """
+    An append-only, group-committed log of calculations.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOG_FILE, group_size: int = 64,
+                 sync_interval: float = 1.0):
+        """
+        Initialize the log. The file is created on the first write.
+
+        :param path: The log file.
+        :param group_size: Number of buffered records that triggers a sync.
+        :param sync_interval: Seconds after which buffered records are synced anyway.
+        """
+        self.path = path
+        self.group_size = group_size
+        self.sync_interval = sync_interval
+        self.record_count = 0
+        self._pending: List[bytes] = []
+        self._last_sync = time.monotonic()
+        self._file = None
+        self._close_at_exit = False
+
+    def _open(self):
+        """Open the log file for appending, creating its directory if needed."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'ab')
+
+    def append(self, calculation: Calculation):
+        """
+        Buffer a calculation, syncing the buffered group if it is due.
+
+        :param calculation: The Calculation to persist.
+        """
+        self._append_record(encode_calculation(calculation))
+
+    def append_undo(self):
+        """
+        Buffer a record that removes the newest calculation, syncing if it is due.
+        """
+        self._append_record(UNDO_RECORD)
+
+    def _append_record(self, record: bytes):
+        """Buffer a record and sync the buffered group if it is due."""
+        self._pending.append(record)
+        self.record_count += 1
+        if not self._close_at_exit:
+            # Buffered records must reach the file even if no sync is due before exit
+            atexit.register(self.close)
+            self._close_at_exit = True
+        if (len(self._pending) >= self.group_size
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        """
+        Write all buffered records and fsync the file.
+        """
+        if self._pending:
+            if self._file is None:
+                self._open()
+            self._file.write(b''.join(self._pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.clear()
+        self._last_sync = time.monotonic()
+
+    def load(self, limit: int = None) -> List[Calculation]:
+        """
+        Read calculations back from the log.
+
+        Undo records are replayed while the file is scanned: each one removes the
+        newest calculation left, as undoing does in a history of `limit` entries.
+
+        :param limit: If given, only the last `limit` calculations are decoded.
+        :return: The calculations, oldest first.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self.record_count = 0
+            return []
+
+        with open(self.path, 'rb') as log_file, \
+                mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            size = len(view)
+            offsets = deque(maxlen=limit)
+            count = offset = 0
+            while offset + RECORD_HEADER.size <= size:
+                (length,) = RECORD_HEADER.unpack_from(view, offset)
+                end = offset + RECORD_HEADER.size + length
+                if end > size:
+                    break
+                if length == len(UNDO_PAYLOAD) and view[end - length:end] == UNDO_PAYLOAD:
+                    if offsets:
+                        offsets.pop()
+                else:
+                    offsets.append(offset)
+                count += 1
+                offset = end
+            calculations = []
+            for start in offsets:
+                (length,) = RECORD_HEADER.unpack_from(view, start)
+                start += RECORD_HEADER.size
+                calculations.append(decode_calculation(view[start:start + length]))
+
+        if offset < size:
+            # Drop a torn record left behind by an interrupted write
+            os.truncate(self.path, offset)
+        self.record_count = count
+        return calculations
+
+    def compact(self, calculations: Iterable[Calculation]):
+        """
+        Atomically replace the log with the given calculations.
+
+        :param calculations: The calculations to keep, oldest first.
+        """
+        self._pending.clear()
+        self.close()
+        temporary_path = f"{self.path}.compact"
+        count = 0
+        with open(temporary_path, 'wb') as compacted:
+            for calculation in calculations:
+                compacted.write(encode_calculation(calculation))
+                count += 1
+            compacted.flush()
+            os.fsync(compacted.fileno())
+        os.replace(temporary_path, self.path)
+        self.record_count = count
+
+    def clear(self):
+        """
+        Remove every record from the log.
+        """
+        self.compact(())
+
+    def close(self):
+        """
+        Sync buffered records and close the file.
+        """
+        if self._file is not None or self._pending:
+            self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._close_at_exit:
+            atexit.unregister(self.close)
+            self._close_at_exit = False
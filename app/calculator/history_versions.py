@@ -0,0 +1,85 @@
+"""
+The History Versions module names versions of a calculation history.
+
+A history only ever changes at its newest end: calculations are appended, undone
+and redone, and the oldest are evicted. Every version of it is therefore a prefix of
+the calculations its ColumnarBuffer stores, and is identified by a single number,
+the buffer's `next_seq` at that version. All versions share the stored calculations
+(nothing is copied to keep one), undo and redo move between neighbouring versions
+in O(1), and a checkpoint is just a name for a sequence number.
+
+Appending after an undo starts a new branch: the undone calculations are dropped,
+and so are the checkpoints that can only be reached through them. Calculations
+evicted from the history are gone from every version; restoring a checkpoint taken
+before they were evicted restores what is left of it.
+"""
+
+from typing import Dict
+from .columnar_buffer import ColumnarBuffer
+
+
+class HistoryCheckpoints:
+    """
+    Named versions of the history held in a ColumnarBuffer.
+    """
+
+    def __init__(self, store: ColumnarBuffer):
+        """
+        Initialize without checkpoints.
+
+        :param store: The buffer holding the history.
+        """
+        self._store = store
+        self._versions: Dict[str, int] = {}
+
+    def take(self, name: str):
+        """
+        Name the current version of the history, replacing a checkpoint of that name.
+
+        :param name: The checkpoint name.
+        """
+        self._versions[name] = self._store.next_seq
+
+    def steps_to(self, name: str) -> int:
+        """
+        Return how far a checkpoint is from the current version.
+
+        :param name: The checkpoint name.
+        :return: The number of redos (if positive) or undos (if negative) that
+                 restore the checkpoint.
+        :raises ValueError: If there is no checkpoint of that name.
+        """
+        try:
+            version = self._versions[name]
+        except KeyError:
+            raise ValueError(f"No checkpoint named '{name}'.") from None
+        return max(version, self._store.first_seq) - self._store.next_seq
+
+    def discard_redo(self):
+        """
+        Drop the checkpoints that only the undone calculations lead to.
+
+        Call it before appending to the history, which drops those calculations.
+        """
+        if self._store.redo_count:
+            current = self._store.next_seq
+            self._versions = {name: version for name, version in self._versions.items()
+                              if version <= current}
+
+    def sizes(self) -> Dict[str, int]:
+        """
+        Return the checkpoints with the number of calculations each one restores.
+
+        :return: A dictionary of sizes by checkpoint name.
+        """
+        first_seq = self._store.first_seq
+        return {name: max(version - first_seq, 0) for name, version in self._versions.items()}
+
+    def clear(self):
+        """
+        Remove every checkpoint.
+        """
+        self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._versions)
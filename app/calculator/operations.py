@@ -48,3 +48,12 @@ def divide(number_one: float, number_two: float) -> float:
     if number_two == 0:
         raise ZeroDivisionError("Cannot divide by zero.")
     return number_one / number_two
+
+
+# Operation functions by name, as typed by users and stored in history logs
+OPERATIONS = {
+    'add': add,
+    'subtract': subtract,
+    'multiply': multiply,
+    'divide': divide,
+}
@@ -0,0 +1,198 @@
+"""
+The Parallel module spreads large calculation batches over a pool of processes.
+
+The operands are split into chunks which are evaluated with the exact scalar
+functions of the Operations module in worker processes, so CPU-bound work such
+as high-precision Decimal division scales with the number of cores. The pool is
+created on first use and kept warm for later calls. Results come back in input
+order, and a failure is reported for the element (or, if a whole chunk fails,
+for each element of that chunk) instead of aborting the batch. A pool whose worker
+died is replaced by a new one.
+
+The worker count and chunk size default to the CALCULATOR_WORKERS and
+CALCULATOR_CHUNK_SIZE environment variables.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import decimal
+import os
+import threading
+from typing import List, Optional, Sequence
+from .operations import OPERATIONS
+
+DEFAULT_CHUNK_SIZE = 10000
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+class ParallelBatchResult:
+    """
+    This class stores the outcome of a parallel batch, in input order.
+
+    :ivar values: The results, with None for elements that failed.
+    :ivar errors: The exception raised for each element, or None if it succeeded.
+    """
+
+    def __init__(self, values: List, errors: List[Optional[Exception]]):
+        self.values = values
+        self.errors = errors
+
+    @property
+    def error_count(self) -> int:
+        """
+        Return the number of elements that could not be computed.
+
+        :return: The number of failed elements.
+        """
+        return sum(error is not None for error in self.errors)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _compute_chunk(operation_name: str, numbers_one: Sequence, numbers_two: Sequence,
+                   context: decimal.Context):
+    """
+    Evaluate one chunk in a worker process.
+
+    :return: The list of values and the list of per-element errors.
+    """
+    operation_func = OPERATIONS[operation_name]
+    values, errors = [], []
+    with decimal.localcontext(context):
+        for number_one, number_two in zip(numbers_one, numbers_two):
+            try:
+                values.append(operation_func(number_one, number_two))
+                errors.append(None)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                values.append(None)
+                errors.append(e)
+    return values, errors
+
+
+def _noop():
+    """Task used to start the worker processes ahead of time."""
+
+
+def _default_workers() -> Optional[int]:
+    """Return the worker count configured in CALCULATOR_WORKERS, if any."""
+    workers = os.getenv("CALCULATOR_WORKERS")
+    return int(workers) if workers else None
+
+
+def get_executor(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Return the shared process pool, creating it (or resizing it) if needed.
+
+    :param max_workers: Number of worker processes (defaults to CALCULATOR_WORKERS,
+                        then to the number of CPUs).
+    :return: The ProcessPoolExecutor.
+    """
+    global _executor, _executor_workers  # pylint: disable=global-statement
+    max_workers = max_workers or _default_workers() or os.cpu_count() or 1
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            _shutdown_executor()
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+            _executor_workers = max_workers
+        return _executor
+
+
+def warm_up(max_workers: int = None):
+    """
+    Start all worker processes now, so that the first batch does not pay for it.
+
+    :param max_workers: Number of worker processes.
+    """
+    max_workers = max_workers or _default_workers() or os.cpu_count() or 1
+    executor = get_executor(max_workers)
+    for future in [executor.submit(_noop) for _ in range(max_workers)]:
+        future.result()
+
+
+def _shutdown_executor():
+    """Stop the shared process pool; the caller holds _executor_lock."""
+    global _executor, _executor_workers  # pylint: disable=global-statement
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+        _executor_workers = None
+
+
+def shutdown_executor():
+    """
+    Stop the shared process pool, if it is running.
+    """
+    with _executor_lock:
+        _shutdown_executor()
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Forget a broken pool, so that the next call starts a new one."""
+    global _executor, _executor_workers  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+            _executor_workers = None
+    executor.shutdown(wait=False)
+
+
+def _submit_chunks(executor: ProcessPoolExecutor, operation_name: str, numbers_one: Sequence,
+                   numbers_two: Sequence, bounds: List[tuple]) -> list:
+    """Submit one task per chunk, with the caller's Decimal context."""
+    context = decimal.getcontext().copy()
+    return [executor.submit(_compute_chunk, operation_name, numbers_one[start:end],
+                            numbers_two[start:end], context)
+            for start, end in bounds]
+
+
+def parallel_batch(operation_name: str, numbers_one: Sequence, numbers_two: Sequence,
+                   max_workers: int = None, chunk_size: int = None) -> ParallelBatchResult:
+    """
+    Apply an operation to every pair of numbers, using a pool of worker processes.
+
+    The current Decimal context (precision, rounding) is used in the workers too.
+
+    :param operation_name: One of 'add', 'subtract', 'multiply' or 'divide'.
+    :param numbers_one: Sequence of first operands.
+    :param numbers_two: Sequence of second operands, of the same length.
+    :param max_workers: Number of worker processes (defaults to CALCULATOR_WORKERS).
+    :param chunk_size: Number of pairs per task (defaults to CALCULATOR_CHUNK_SIZE).
+    :return: A ParallelBatchResult with values and per-element errors in input order.
+    :raises ValueError: If the operation is unknown or the lengths differ.
+    """
+    if operation_name not in OPERATIONS:
+        raise ValueError(f"'{operation_name}' is not a valid operation.")
+    if len(numbers_one) != len(numbers_two):
+        raise ValueError("Both operand sequences must have the same length.")
+    chunk_size = chunk_size or int(os.getenv("CALCULATOR_CHUNK_SIZE", str(DEFAULT_CHUNK_SIZE)))
+
+    bounds = [(start, min(start + chunk_size, len(numbers_one)))
+              for start in range(0, len(numbers_one), chunk_size)]
+    executor = get_executor(max_workers)
+    try:
+        futures = _submit_chunks(executor, operation_name, numbers_one, numbers_two, bounds)
+    except BrokenProcessPool:
+        # A worker died during an earlier batch: start over with a new pool
+        _discard_executor(executor)
+        executor = get_executor(max_workers)
+        futures = _submit_chunks(executor, operation_name, numbers_one, numbers_two, bounds)
+
+    values, errors = [], []
+    broken = False
+    for (start, end), future in zip(bounds, futures):
+        try:
+            chunk_values, chunk_errors = future.result()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # The whole chunk failed (crashed worker, unpicklable operands): blame
+            # each element
+            broken = broken or isinstance(e, BrokenProcessPool)
+            chunk_values, chunk_errors = [None] * (end - start), [e] * (end - start)
+        values.extend(chunk_values)
+        errors.extend(chunk_errors)
+    if broken:
+        _discard_executor(executor)
+    return ParallelBatchResult(values, errors)
@@ -0,0 +1,209 @@
+"""
+The Reductions module folds streams of numbers into their sum, product or mean.
+
+A reduction consumes any iterable (a list, a generator, the lines of a file) lazily,
+CHUNK_SIZE values at a time, so its memory stays constant however long the stream
+is. Values are converted to the number type of a numeric backend (see the Backends
+module) when they are not of that type already; numeric strings are parsed.
+
+A stream reduced without a backend uses the one of its first value's type. A stream
+of ints widens, like Python arithmetic, to the backend of the first float, Decimal or
+Fraction in it: `Calculator.sum([1, 2.5])` is 3.5. The exact result of the values
+before it is converted to the wider type once, and reduction continues in that type.
+
+- float sums are compensated: every chunk is summed with `math.fsum`, together with
+  the running sum and the rounding error it carries, and the new rounding error is
+  computed in the same way. The sum of the whole stream is therefore rounded
+  (almost always) as if by one `math.fsum` call over all of it, and the error does
+  not grow with the length of the stream.
+- Decimal sums are exact: they are accumulated with unlimited precision and rounded
+  to the backend's context once, at the end. Decimal products are rounded to the
+  context at every step, since their exact digits would grow without bound.
+- int and Fraction sums and products are exact.
+
+The mean divides the exact (or compensated) sum by the count, so it is rounded once.
+"""
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, localcontext
+from fractions import Fraction
+from itertools import chain, islice
+import math
+import time
+from typing import Iterable, Iterator, List, Tuple
+from .backends import DecimalBackend, Number, NumericBackend, default_backend, get_backend
+from .operations import divide
+
+# A power of two, so scaling float values by 1 / CHUNK_SIZE is exact
+CHUNK_SIZE = 4096
+REDUCTIONS = ('sum', 'product', 'mean')
+
+# The backend of a stream without one, by the type of its first value
+_BACKENDS_BY_TYPE = {
+    int: 'int',
+    float: 'float',
+    Decimal: 'decimal',
+    Fraction: 'fraction',
+}
+# The backends a stream of ints without a backend widens to, by the type of a value
+_WIDER_BACKENDS = {
+    float: 'float',
+    Decimal: 'decimal',
+    Fraction: 'fraction',
+}
+# Context in which adding Decimals is always exact
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+# Marker for the end of a stream
+_END = object()
+
+
+class ReductionResult:
+    """
+    This class stores the outcome of a reduction.
+
+    :ivar value: The sum, product or mean.
+    :ivar count: The number of values reduced.
+    :ivar seconds: The elapsed time.
+    """
+
+    def __init__(self, value: Number, count: int, seconds: float):
+        self.value = value
+        self.count = count
+        self.seconds = seconds
+
+    @property
+    def values_per_second(self) -> float:
+        """
+        Return the throughput in values per second.
+
+        :return: Values per second.
+        """
+        return self.count / self.seconds if self.seconds > 0 else float('inf')
+
+
+Chunks = Iterator[Tuple[NumericBackend, List[Number]]]
+
+
+def _numbers(values: Iterable, backend) -> Tuple[NumericBackend, Chunks]:
+    """
+    Resolve the backend of a stream and convert its values lazily.
+
+    Without a backend, the one of the first value's type is used (the default backend
+    for strings and empty streams), and a stream of ints may widen (see
+    `_WIDER_BACKENDS`).
+
+    :return: The backend, and an iterator over lists of up to CHUNK_SIZE converted
+             values, each with the backend they were converted to.
+    """
+    iterator = iter(values)
+    widens = False
+    if backend is None:
+        first = next(iterator, _END)
+        name = _BACKENDS_BY_TYPE.get(type(first))
+        backend = default_backend() if name is None else get_backend(name)
+        widens = name == 'int'
+        if first is not _END:
+            iterator = chain((first,), iterator)
+    else:
+        backend = get_backend(backend)
+    return backend, _chunks(iterator, backend, widens)
+
+
+def _chunks(iterator: Iterator, backend: NumericBackend, widens: bool) -> Chunks:
+    """Yield the values in lists of up to CHUNK_SIZE, converted to the backend."""
+    while True:
+        chunk = list(islice(iterator, CHUNK_SIZE))
+        if not chunk:
+            return
+        if widens:
+            for value in chunk:
+                name = _WIDER_BACKENDS.get(type(value))
+                if name is not None:
+                    backend, widens = get_backend(name), False
+                    break
+        number_type, convert = backend.number_type, backend.convert
+        yield backend, [value if type(value) is number_type else convert(value)
+                        for value in chunk]
+
+
+def _float_sum(chunk: List[float]) -> float:
+    """
+    Return the sum of a chunk of floats, rounded once.
+
+    Unlike `math.fsum`, this follows float arithmetic where fsum raises: an overflowing
+    sum is infinite, and infinities of both signs add up to NaN.
+    """
+    try:
+        return math.fsum(chunk)
+    except OverflowError:
+        # An intermediate sum overflowed; scaled down, no sum of the chunk can
+        return math.fsum([value / CHUNK_SIZE for value in chunk]) * CHUNK_SIZE
+    except ValueError:
+        return math.nan
+
+
+def _sum(chunks: Chunks, backend: NumericBackend) -> Tuple[Number, int, NumericBackend]:
+    """Return the unrounded sum of the numbers, their count and the backend of the sum."""
+    count, total, error = 0, backend.convert(0), 0.0
+    with localcontext(_EXACT):
+        for chunk_backend, chunk in chunks:
+            if chunk_backend is not backend:
+                # Widened from int: the exact sum so far is converted once
+                backend, total = chunk_backend, chunk_backend.convert(total)
+            count += len(chunk)
+            if backend.number_type is float:
+                chunk += (total, error)
+                total = _float_sum(chunk)
+                # What rounding the sum lost, carried into the next chunk
+                chunk.append(-total)
+                error = _float_sum(chunk) if math.isfinite(total) else 0.0
+            else:
+                total = sum(chunk, total)
+    return total, count, backend
+
+
+def _product(chunks: Chunks, backend: NumericBackend) -> Tuple[Number, int, NumericBackend]:
+    """Return the product of the numbers, their count and the backend of the product."""
+    count, total = 0, backend.convert(1)
+    for chunk_backend, chunk in chunks:
+        if chunk_backend is not backend:
+            backend, total = chunk_backend, chunk_backend.convert(total)
+        count += len(chunk)
+        with localcontext(backend.context if isinstance(backend, DecimalBackend) else _EXACT):
+            total = math.prod(chunk, start=total)
+    return total, count, backend
+
+
+def _rounded(backend: NumericBackend, value: Number) -> Number:
+    """Round an exact Decimal to the backend's context."""
+    return backend.context.plus(value) if isinstance(backend, DecimalBackend) else value
+
+
+def reduce_numbers(reduction_name: str, values: Iterable, backend=None) -> ReductionResult:
+    """
+    Reduce a stream of numbers to their sum, product or mean.
+
+    :param reduction_name: One of 'sum', 'product' or 'mean'.
+    :param values: Any iterable of numbers or numeric strings, consumed lazily.
+    :param backend: A NumericBackend or backend name (default: the one of the first
+                    value's type, widened from int if the stream needs it).
+    :return: The ReductionResult.
+    :raises ValueError: If the reduction or the backend is unknown, a value is not a
+                        number of the backend, or the mean of no values is asked for.
+    """
+    if reduction_name not in REDUCTIONS:
+        raise ValueError(f"Unknown reduction '{reduction_name}'. "
+                         f"Use one of {', '.join(REDUCTIONS)}.")
+    started = time.perf_counter()
+    backend, chunks = _numbers(values, backend)
+
+    if reduction_name == 'product':
+        value, count, backend = _product(chunks, backend)
+    else:
+        total, count, backend = _sum(chunks, backend)
+        if reduction_name == 'sum':
+            value = _rounded(backend, total)
+        elif count == 0:
+            raise ValueError("Cannot take the mean of no values.")
+        else:
+            value = backend.compute(divide, total, backend.convert(count))
+    return ReductionResult(value, count, time.perf_counter() - started)
@@ -0,0 +1,71 @@
+"""
+The Ring Buffer module provides a fixed-size, list-backed circular buffer.
+
+Appending to a full buffer overwrites the oldest item, so memory stays bounded
+no matter how many items are added over the lifetime of the process.
+"""
+
+
+class RingBuffer:
+    """
+    A fixed-capacity sequence that keeps the most recent items.
+
+    Appending, reading the newest or oldest item and indexing are all O(1).
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize an empty buffer.
+
+        :param capacity: The maximum number of items kept.
+        :raises ValueError: If the capacity is smaller than 1.
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1.")
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def is_full(self) -> bool:
+        """
+        Check whether the next append will overwrite the oldest item.
+
+        :return: True if the buffer holds `capacity` items.
+        """
+        return self._size == self.capacity
+
+    def append(self, item):
+        """
+        Add an item, overwriting the oldest one if the buffer is full.
+
+        :param item: The item to add.
+        """
+        end = (self._start + self._size) % self.capacity
+        self._items[end] = item
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._size += 1
+
+    def clear(self):
+        """
+        Remove all items from the buffer.
+        """
+        self._items = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % self.capacity]
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._items[(self._start + index) % self.capacity]
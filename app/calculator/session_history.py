@@ -0,0 +1,379 @@
+"""
+The Session History module provides bounded calculation histories.
+
+A SessionHistory is an ordinary instance, so every user or connection can have its
+own; the process-wide CalculationsHistory is a facade over one of them. Each one is
+bounded by an entry quota and, optionally, a byte quota; the oldest calculations are
+handed to the eviction policy until both quotas are met again. Calculations are
+stored in a column-oriented ColumnarBuffer (see `as_arrays()` for NumPy views of
+them), so the byte quota counts their columnar size.
+
+When a HistoryLog is attached, every calculation is also appended to it, so the
+history survives restarts. The log is compacted down to the in-memory history
+once it holds COMPACTION_FACTOR times the history capacity.
+
+A HistoryIndex is kept up to date with the history, so calculations can be
+queried by operation, by result range and by top-k result without a scan.
+
+`undo` and `redo` step back and forth through the history, and named checkpoints
+can be taken and restored at any time (see the History Versions module). Undos are
+logged too; calculations that were undone when the log was last compacted cannot be
+redone after a restart.
+
+When a SharedHistory is attached, every calculation is also published to it, so the
+other processes that map the same file see it (see the Shared History module). The
+shared history is append-only: undos are not published.
+
+All methods are thread-safe: they hold a single re-entrant lock while they read or
+change the history, so commands running on several threads can share it.
+"""
+
+import threading
+from typing import Dict, Iterator, List
+from .calculations import Calculation
+from .columnar_buffer import ColumnarBuffer, stored_size
+from .history_eviction import DropOldestPolicy, EvictionPolicy
+from .history_index import HistoryIndex
+from .history_log import HistoryLog
+from .history_versions import HistoryCheckpoints
+from .shared_history import SharedHistory
+
+COMPACTION_FACTOR = 2
+
+
+def calculation_size(calculation: Calculation) -> int:
+    """
+    Estimate the memory a calculation takes in a session history.
+
+    :param calculation: The Calculation.
+    :return: The estimated size in bytes.
+    """
+    return stored_size(calculation)
+
+
+class SessionHistory:
+    """
+    A thread-safe, quota-bounded history of Calculation instances.
+
+    :ivar max_entries: The maximum number of calculations kept.
+    :ivar max_bytes: The maximum estimated memory of the kept calculations, or None.
+    :ivar evicted_count: The number of calculations evicted so far.
+    :ivar bytes_used: The estimated memory of the kept calculations.
+    :ivar log: The attached HistoryLog, or None.
+    :ivar shared: The attached SharedHistory, or None.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = None,
+                 eviction_policy: EvictionPolicy = None):
+        """
+        Initialize an empty history.
+
+        :param max_entries: The maximum number of calculations kept.
+        :param max_bytes: The maximum estimated memory in bytes (None for no limit).
+        :param eviction_policy: The policy for evicted calculations (default: drop them).
+        :raises ValueError: If a quota is smaller than 1.
+        """
+        if max_entries < 1 or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("History quotas must be at least 1.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy or DropOldestPolicy()
+        self.evicted_count = 0
+        self.bytes_used = 0
+        self.log: HistoryLog = None
+        self.shared: SharedHistory = None
+        self._calculations = ColumnarBuffer(max_entries)
+        self._index = HistoryIndex(self._calculations)
+        self._checkpoints = HistoryCheckpoints(self._calculations)
+        self._lock = threading.RLock()
+
+    def _evict_oldest(self):
+        """Hand the oldest calculation to the eviction policy and remove it."""
+        self.eviction_policy.evict(self._calculations[0])
+        self._index.discard(self._calculations.first_seq)
+        self.bytes_used -= self._calculations.entry_size(0)
+        self._calculations.popleft()
+        self.evicted_count += 1
+
+    def add_calculation(self, calculation: Calculation):
+        """
+        Add a calculation, evicting the oldest ones while a quota is exceeded.
+
+        The newest calculation is always kept, even if it alone exceeds the byte quota.
+        Undone calculations can no longer be redone afterwards.
+
+        :param calculation: A Calculation instance.
+        """
+        with self._lock:
+            self._checkpoints.discard_redo()
+            if self._calculations.is_full():
+                self._evict_oldest()
+            self._index.add(self._calculations.append(calculation))
+            self.bytes_used += self._calculations.entry_size(-1)
+            while (len(self._calculations) > 1 and self.max_bytes is not None
+                   and self.bytes_used > self.max_bytes):
+                self._evict_oldest()
+            if self.log is not None:
+                self.log.append(calculation)
+                self._compact_log_if_due()
+            if self.shared is not None:
+                try:
+                    self.shared.add_calculation(calculation)
+                except OSError:
+                    # No free segment: the calculation is only kept locally
+                    self.shared.skipped_count += 1
+
+    def _compact_log_if_due(self):
+        """Compact the attached log once it has grown too large."""
+        if self.log.record_count >= COMPACTION_FACTOR * self.max_entries:
+            self.log.compact(self._calculations)
+
+    def undo(self) -> Calculation:
+        """
+        Remove the newest calculation, keeping it for `redo`.
+
+        :return: The undone Calculation, or None if the history is empty.
+        """
+        with self._lock:
+            if not self._calculations:
+                return None
+            calculation = self._calculations[-1]
+            self._index.undo(self._calculations.next_seq - 1)
+            self.bytes_used -= self._calculations.entry_size(-1)
+            self._calculations.undo()
+            if self.log is not None:
+                self.log.append_undo()
+                self._compact_log_if_due()
+            return calculation
+
+    def redo(self) -> Calculation:
+        """
+        Add the most recently undone calculation back to the history.
+
+        The byte quota is not enforced again: the calculation was within it when it
+        was first added.
+
+        :return: The redone Calculation, or None if there is nothing to redo.
+        """
+        with self._lock:
+            if not self._calculations.redo_count:
+                return None
+            self._index.redo(self._calculations.redo())
+            self.bytes_used += self._calculations.entry_size(-1)
+            calculation = self._calculations[-1]
+            if self.log is not None:
+                self.log.append(calculation)
+                self._compact_log_if_due()
+            return calculation
+
+    def checkpoint(self, name: str):
+        """
+        Name the current version of the history, so it can be restored later.
+
+        :param name: The checkpoint name; an older checkpoint of that name is replaced.
+        """
+        with self._lock:
+            self._checkpoints.take(name)
+
+    def restore_checkpoint(self, name: str) -> int:
+        """
+        Undo or redo calculations until the history is back at a checkpoint.
+
+        :param name: The checkpoint name.
+        :return: The number of calculations redone (if positive) or undone (if negative).
+        :raises ValueError: If there is no checkpoint of that name.
+        """
+        with self._lock:
+            steps = self._checkpoints.steps_to(name)
+            for _ in range(-steps):
+                self.undo()
+            for _ in range(steps):
+                self.redo()
+            return steps
+
+    def list_checkpoints(self) -> Dict[str, int]:
+        """
+        Return the checkpoints with the number of calculations each one restores.
+
+        :return: A dictionary of sizes by checkpoint name.
+        """
+        with self._lock:
+            return self._checkpoints.sizes()
+
+    def attach_log(self, log: HistoryLog):
+        """
+        Restore the history from a log and persist every new calculation to it.
+
+        The restored calculations replace the current history. Only as many as fit
+        in the history are decoded, and the log is compacted if it has grown too large.
+
+        :param log: The HistoryLog to restore from and write to.
+        """
+        with self._lock:
+            self._clear()
+            for calculation in log.load(limit=self.max_entries):
+                self._index.add(self._calculations.append(calculation))
+                self.bytes_used += self._calculations.entry_size(-1)
+            self.log = log
+            self._compact_log_if_due()
+
+    def detach_log(self):
+        """
+        Sync and close the attached log, and stop writing to it.
+        """
+        with self._lock:
+            if self.log is not None:
+                self.log.close()
+                self.log = None
+
+    def attach_shared(self, shared: SharedHistory):
+        """
+        Publish every new calculation to a history shared with other processes.
+
+        Calculations that cannot be published, for example because every segment of
+        the shared file has a writer, are still added to this history; they are
+        counted in the shared history's `skipped_count`.
+
+        :param shared: The SharedHistory to publish to.
+        """
+        with self._lock:
+            self.shared = shared
+
+    def detach_shared(self):
+        """
+        Stop publishing to the shared history, and release its segment.
+        """
+        with self._lock:
+            if self.shared is not None:
+                self.shared.close()
+                self.shared = None
+
+    def snapshot(self) -> List[Calculation]:
+        """
+        Copy the history, oldest first, consistently with concurrent additions.
+
+        :return: A list of Calculation instances.
+        """
+        with self._lock:
+            return list(self._calculations)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[Calculation]]:
+        """
+        Yield the history in chunks, oldest first, holding the lock for one chunk at a time.
+
+        Calculations added after the iteration started are not included, and those
+        evicted before their chunk is read are skipped, so memory stays bounded by
+        the chunk size however large the history is.
+
+        :param chunk_size: The maximum number of calculations per chunk.
+        :return: An iterator over lists of Calculation instances.
+        """
+        with self._lock:
+            seq, stop = self._calculations.first_seq, self._calculations.next_seq
+        while True:
+            with self._lock:
+                chunk, seq = self._calculations.read(seq, stop, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def get_history(self) -> List[Calculation]:
+        """
+        Retrieve the full history of calculations, oldest first.
+
+        :return: A list of Calculation instances.
+        """
+        return self.snapshot()
+
+    def get_last_calculation(self) -> Calculation:
+        """
+        Retrieve the most recent calculation.
+
+        :return: The last Calculation instance, or None if the history is empty.
+        """
+        with self._lock:
+            return self._calculations[-1] if self._calculations else None
+
+    def _clear(self):
+        """Remove all calculations and checkpoints."""
+        self._calculations.clear()
+        self._index.clear()
+        self._checkpoints.clear()
+        self.bytes_used = 0
+
+    def clear_history(self):
+        """
+        Remove all calculations from the history and the attached log, and reset the
+        eviction counter and the checkpoints.
+        """
+        with self._lock:
+            self._clear()
+            self.evicted_count = 0
+            if self.log is not None:
+                self.log.clear()
+
+    def find_by_operation(self, operation_name: str) -> List[Calculation]:
+        """
+        Return the calculations of one operation, oldest first.
+
+        :param operation_name: The operation name, e.g. 'divide'.
+        :return: A list of Calculation instances.
+        """
+        with self._lock:
+            return self._index.by_operation(operation_name)
+
+    def find_by_result(self, low=None, high=None,
+                       operation_name: str = None) -> List[Calculation]:
+        """
+        Return the calculations whose result lies in [low, high], by ascending result.
+
+        :param low: The smallest result, or None for no lower bound.
+        :param high: The largest result, or None for no upper bound.
+        :param operation_name: Only return calculations of this operation.
+        :return: A list of Calculation instances.
+        """
+        with self._lock:
+            return self._index.by_result(low, high, operation_name)
+
+    def top_k(self, k: int, operation_name: str = None, largest: bool = True,
+              low=None, high=None) -> List[Calculation]:
+        """
+        Return the k calculations with the largest (or smallest) results.
+
+        :param k: The number of calculations.
+        :param operation_name: Only consider calculations of this operation.
+        :param largest: True for the largest results, False for the smallest.
+        :param low: Only consider results of at least this value, or None.
+        :param high: Only consider results of at most this value, or None.
+        :return: A list of Calculation instances, the most extreme first.
+        """
+        with self._lock:
+            return self._index.top_k(k, operation_name, largest, low, high)
+
+    def as_arrays(self):
+        """
+        Return NumPy views of the history columns, oldest first, without copying them.
+
+        :return: A dictionary of arrays (see `ColumnarBuffer.as_arrays`).
+        """
+        with self._lock:
+            return self._calculations.as_arrays()
+
+    def get_eviction_stats(self) -> Dict[str, int]:
+        """
+        Report how full the history is and how many calculations were evicted.
+
+        :return: A dictionary with 'capacity', 'size', 'evicted', 'bytes' and
+                 'max_bytes' values.
+        """
+        with self._lock:
+            return {
+                'capacity': self.max_entries,
+                'size': len(self._calculations),
+                'evicted': self.evicted_count,
+                'bytes': self.bytes_used,
+                'max_bytes': self.max_bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._calculations)
@@ -0,0 +1,338 @@
+"""
+The Shared History module lets several processes on one host share a calculation
+history through a memory-mapped file.
+
+The file holds a header and a fixed number of segments. A process that adds
+calculations claims one segment for as long as it runs, and is the only writer of
+that segment; every process can read all of them. Reading is lock-free: it costs a
+few memory accesses per calculation, not a system call or a message to the writer.
+
+Every segment is a ring of fixed-size slots, each holding one calculation encoded
+as a history log record (see the History Log module). A writer publishes a
+calculation as a sequence lock:
+
+1. it sets the slot's sequence word to 2n + 1 (odd: being written), where n is the
+   number of calculations the segment held before;
+2. it writes the timestamp and the record;
+3. it sets the sequence word to 2n + 2 (even: complete);
+4. it sets the segment's committed count to n + 1.
+
+A reader takes the committed count, then reads each slot it has not seen yet
+between two reads of its sequence word. If the word is not 2n + 2 both times, the
+writer has moved on to a newer calculation in that slot (the ring wrapped while the
+reader was behind), and the slot is skipped. Sequence words and counts are aligned
+8-byte words, which the processors this runs on store and load whole, in program
+order.
+
+Segments are claimed with an advisory lock on their byte range of the file, which
+the operating system releases when the process exits, so a crashed writer's segment
+can be claimed again. The locks need `fcntl`, so writing requires a POSIX system;
+reading does not.
+
+The calculations of all segments are merged by timestamp. A calculation whose record
+does not fit in a slot is not shared.
+"""
+
+from heapq import merge
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+from .calculations import Calculation
+from .history_log import RECORD_HEADER, decode_calculation, encode_calculation
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not a POSIX system
+    fcntl = None
+
+DEFAULT_SHARED_FILE = os.path.join('logs', 'history.shm')
+DEFAULT_SEGMENTS = 8
+DEFAULT_SEGMENT_CAPACITY = 10000
+DEFAULT_SLOT_SIZE = 128
+
+MAGIC = b'CALCSHM1'
+# Magic, segment count, slots per segment, slot size
+FILE_HEADER = struct.Struct('<8sIII')
+FILE_HEADER_SIZE = 64
+# Committed count, writer pid, count when the segment was last cleared
+SEGMENT_HEADER = struct.Struct('<QQQ')
+SEGMENT_HEADER_SIZE = 64
+# Sequence word, timestamp in nanoseconds
+SLOT_HEADER = struct.Struct('<QQ')
+WORD = struct.Struct('<Q')
+
+# Segments claimed by this process, by file; POSIX locks do not exclude the same process
+_claimed: Dict[str, set] = {}
+_claimed_lock = threading.Lock()
+
+
+class SharedHistory:
+    """
+    A calculation history shared by the processes that map the same file.
+
+    :ivar path: The shared file.
+    :ivar segments: The number of segments, i.e. of processes that can write at once.
+    :ivar capacity: The number of calculations each segment keeps.
+    :ivar slot_size: The bytes per calculation, which bound the size of its record.
+    :ivar skipped_count: Calculations this process could not share or read.
+    """
+
+    def __init__(self, path: str = DEFAULT_SHARED_FILE, segments: int = DEFAULT_SEGMENTS,
+                 capacity: int = DEFAULT_SEGMENT_CAPACITY, slot_size: int = DEFAULT_SLOT_SIZE):
+        """
+        Map the shared file, creating it with the given layout if it does not exist.
+
+        The layout of an existing file takes precedence over the arguments.
+
+        :param path: The shared file.
+        :param segments: The number of segments of a new file.
+        :param capacity: The calculations per segment of a new file.
+        :param slot_size: The bytes per calculation of a new file (a multiple of 8).
+        :raises ValueError: If the layout is invalid or the file is not a shared history.
+        """
+        if segments < 1 or capacity < 1 or slot_size < 32 or slot_size % 8:
+            raise ValueError("Invalid shared history layout.")
+        self.path = path
+        self.skipped_count = 0
+        self._segment = None
+        self._cursors: List[int] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            self._initialize(segments, capacity, slot_size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._cursors = [0] * self.segments
+
+    def _initialize(self, segments: int, capacity: int, slot_size: int):
+        """Write the header of a new file, or read that of an existing one, and map it."""
+        if fcntl is not None:
+            # Two processes creating the file at once must not both write a header
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, FILE_HEADER_SIZE, 0)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                size = (FILE_HEADER_SIZE
+                        + segments * (SEGMENT_HEADER_SIZE + capacity * slot_size))
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, FILE_HEADER.pack(MAGIC, segments, capacity, slot_size), 0)
+            header = os.pread(self._fd, FILE_HEADER.size, 0)
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, FILE_HEADER_SIZE, 0)
+        magic, self.segments, self.capacity, self.slot_size = FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"'{self.path}' is not a shared history file.")
+        self._segment_size = SEGMENT_HEADER_SIZE + self.capacity * self.slot_size
+        self._max_payload = self.slot_size - SLOT_HEADER.size - RECORD_HEADER.size
+        self._view = mmap.mmap(self._fd, 0)
+
+    def _segment_offset(self, segment: int) -> int:
+        """Return the offset of a segment's header."""
+        return FILE_HEADER_SIZE + segment * self._segment_size
+
+    def _claim(self):
+        """Claim a segment that no other process writes to."""
+        if fcntl is None:
+            raise OSError("Writing to a shared history requires fcntl (a POSIX system).")
+        key = os.path.realpath(self.path)
+        with _claimed_lock:
+            claimed = _claimed.setdefault(key, set())
+            for segment in range(self.segments):
+                if segment in claimed:
+                    continue
+                try:
+                    fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB,
+                                self._segment_size, self._segment_offset(segment))
+                except OSError:
+                    continue
+                claimed.add(segment)
+                self._segment = segment
+                WORD.pack_into(self._view, self._segment_offset(segment) + WORD.size,
+                               os.getpid())
+                return
+        raise OSError(f"All {self.segments} segments of '{self.path}' have a writer.")
+
+    def claim(self) -> bool:
+        """
+        Claim a segment now rather than on the first calculation added.
+
+        :return: True if this process has a segment, False if none is free.
+        """
+        with self._lock:
+            if self._segment is None:
+                try:
+                    self._claim()
+                except OSError:
+                    return False
+            return True
+
+    def add_calculation(self, calculation: Calculation) -> bool:
+        """
+        Publish a calculation to this process's segment, claiming one on first use.
+
+        :param calculation: The Calculation to share.
+        :return: True if it was shared, False if its record does not fit in a slot or
+                 cannot be encoded.
+        :raises OSError: If no segment is free.
+        """
+        try:
+            record = encode_calculation(calculation)
+        except ValueError:
+            self.skipped_count += 1
+            return False
+        if len(record) > self.slot_size - SLOT_HEADER.size:
+            self.skipped_count += 1
+            return False
+        with self._lock:
+            if self._segment is None:
+                self._claim()
+            base = self._segment_offset(self._segment)
+            (count,) = WORD.unpack_from(self._view, base)
+            slot = base + SEGMENT_HEADER_SIZE + (count % self.capacity) * self.slot_size
+            view = self._view
+            WORD.pack_into(view, slot, 2 * count + 1)
+            start = slot + SLOT_HEADER.size
+            view[start:start + len(record)] = record
+            WORD.pack_into(view, slot + WORD.size, time.time_ns())
+            WORD.pack_into(view, slot, 2 * count + 2)
+            WORD.pack_into(view, base, count + 1)
+        return True
+
+    def _read_segment(self, segment: int, start: int) -> Tuple[List[tuple], int]:
+        """
+        Read the calculations of a segment from number `start` on.
+
+        :return: (timestamp, segment, number, record) tuples, oldest first, and the
+                 number of the next calculation.
+        """
+        view, base = self._view, self._segment_offset(segment)
+        count, _, cleared = SEGMENT_HEADER.unpack_from(view, base)
+        entries = []
+        for number in range(max(start, cleared, count - self.capacity), count):
+            slot = base + SEGMENT_HEADER_SIZE + (number % self.capacity) * self.slot_size
+            sequence, timestamp = SLOT_HEADER.unpack_from(view, slot)
+            (length,) = RECORD_HEADER.unpack_from(view, slot + SLOT_HEADER.size)
+            payload_start = slot + SLOT_HEADER.size + RECORD_HEADER.size
+            payload = view[payload_start:payload_start + min(length, self._max_payload)]
+            if sequence != 2 * number + 2 or WORD.unpack_from(view, slot)[0] != sequence:
+                # Overwritten by a newer calculation while it was being read
+                self.skipped_count += 1
+                continue
+            entries.append((timestamp, segment, number, payload))
+        return entries, count
+
+    def _decode(self, streams) -> List[Calculation]:
+        """Merge the entries of several segments by timestamp and decode them."""
+        calculations = []
+        for _, _, _, payload in merge(*streams):
+            try:
+                calculations.append(decode_calculation(payload))
+            except (KeyError, ValueError, ArithmeticError):
+                self.skipped_count += 1
+        return calculations
+
+    def snapshot(self) -> List[Calculation]:
+        """
+        Read the calculations of every segment, oldest first.
+
+        :return: A list of Calculation instances.
+        """
+        return self._decode(self._read_segment(segment, 0)[0]
+                            for segment in range(self.segments))
+
+    def read_new(self) -> List[Calculation]:
+        """
+        Read the calculations published since the previous call, oldest first.
+
+        :return: A list of Calculation instances.
+        """
+        streams = []
+        with self._lock:
+            for segment in range(self.segments):
+                entries, self._cursors[segment] = self._read_segment(
+                    segment, self._cursors[segment])
+                streams.append(entries)
+        return self._decode(streams)
+
+    def get_history(self) -> List[Calculation]:
+        """
+        Retrieve the shared history, oldest first.
+
+        :return: A list of Calculation instances.
+        """
+        return self.snapshot()
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[Calculation]]:
+        """
+        Yield the shared history in chunks, oldest first.
+
+        :param chunk_size: The maximum number of calculations per chunk.
+        :return: An iterator over lists of Calculation instances.
+        """
+        calculations = self.snapshot()
+        for start in range(0, len(calculations), chunk_size):
+            yield calculations[start:start + chunk_size]
+
+    def get_eviction_stats(self) -> Dict[str, int]:
+        """
+        Report the size of the shared history and how much of it was overwritten.
+
+        :return: A dictionary with 'capacity', 'size', 'evicted' and 'segment' (this
+                 process's segment, or -1) values.
+        """
+        size = evicted = 0
+        for segment in range(self.segments):
+            count, _, cleared = SEGMENT_HEADER.unpack_from(
+                self._view, self._segment_offset(segment))
+            size += min(count - cleared, self.capacity)
+            evicted += max(count - cleared - self.capacity, 0)
+        return {
+            'capacity': self.segments * self.capacity,
+            'size': size,
+            'evicted': evicted,
+            'segment': -1 if self._segment is None else self._segment,
+        }
+
+    def clear_history(self):
+        """
+        Remove the calculations of this process's segment.
+
+        Readers skip the calculations that were committed before; sequence numbers
+        keep growing, so readers part-way through the segment are not confused.
+        """
+        with self._lock:
+            if self._segment is not None:
+                base = self._segment_offset(self._segment)
+                (count,) = WORD.unpack_from(self._view, base)
+                WORD.pack_into(self._view, base + 2 * WORD.size, count)
+
+    def close(self):
+        """
+        Release this process's segment and unmap the file.
+
+        POSIX releases all of a process's locks on a file when any descriptor of it is
+        closed, so a process should map a shared file only once.
+        """
+        with self._lock:
+            if self._view is None:
+                return
+            if self._segment is not None:
+                base = self._segment_offset(self._segment)
+                WORD.pack_into(self._view, base + WORD.size, 0)
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._segment_size, base)
+                with _claimed_lock:
+                    _claimed[os.path.realpath(self.path)].discard(self._segment)
+                self._segment = None
+            self._view.close()
+            self._view = None
+            os.close(self._fd)
+
+    def __len__(self) -> int:
+        return self.get_eviction_stats()['size']
@@ -0,0 +1,259 @@
+"""
+The Variables module keeps named, reactive calculations.
+
+A VariableGraph maps names to expressions (see the Expressions module), such as
+'x = 5' or 'y = x * 3'. Each variable keeps its current value, and the graph keeps
+the edges between variables and the expressions that refer to them. When a variable
+is defined again, only the variables that depend on it are recomputed, in
+topological order, and the recomputation stops at every variable whose value did
+not change. Changing one input of a long chain of variables therefore costs one
+evaluation per variable that actually changes, not a recomputation of the graph.
+
+Topological order is kept with heights: every variable is higher than the variables
+its expression refers to, so recomputing pending variables lowest first (from a
+heap) evaluates each one at most once, after all of its inputs.
+
+The name 'ans' refers to the last result computed (see `ans`). It is read when a
+variable is defined, not tracked: a variable defined as 'ans * 2' keeps that value
+of 'ans' when it is recomputed later.
+
+A variable whose expression fails, for example by dividing by zero, has no value
+and keeps the error; the variables that depend on it have no value either, until it
+is fixed.
+"""
+
+from decimal import Decimal
+import heapq
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set
+from .expressions import CompiledExpression, ExpressionError, compile_expression, to_decimal
+
+ANS = 'ans'
+
+
+class Variable:
+    """
+    A named expression and its current value.
+
+    :ivar name: The variable name.
+    :ivar expression: The CompiledExpression the value is computed from.
+    :ivar constants: Values of the names the expression reads once, such as 'ans'.
+    :ivar value: The current value, or None if it could not be computed.
+    :ivar error: Why the value could not be computed, or None.
+    :ivar dependencies: The names of the variables the expression refers to.
+    :ivar height: More than the heights of the variables the expression refers to.
+    :ivar dependents: The names of the variables whose expressions refer to this one.
+    """
+
+    __slots__ = ('name', 'expression', 'constants', 'value', 'error', 'dependencies',
+                 'height', 'dependents')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.expression: Optional[CompiledExpression] = None
+        self.constants: Dict[str, Decimal] = {}
+        self.value: Optional[Decimal] = None
+        self.error: Optional[str] = None
+        self.dependencies: FrozenSet[str] = frozenset()
+        self.height = 0
+        self.dependents: Set[str] = set()
+
+    def __repr__(self):
+        return f"{self.name} = {self.expression.source}"
+
+
+class VariableGraph:
+    """
+    A thread-safe set of reactive variables.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty graph.
+        """
+        self._ans: Optional[Decimal] = None
+        self._variables: Dict[str, Variable] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def ans(self) -> Optional[Decimal]:
+        """
+        Return the last result computed, which expressions can refer to as 'ans'.
+
+        :return: The result as a Decimal, or None before the first one.
+        """
+        return self._ans
+
+    @ans.setter
+    def ans(self, value):
+        """
+        Set the last result, for example that of a calculation.
+
+        :param value: An int, float, Decimal or Fraction, or None.
+        """
+        self._ans = None if value is None else to_decimal(ANS, value)
+
+    def define(self, name: str, source: str) -> List[Variable]:
+        """
+        Define or redefine a variable, and recompute the variables that depend on it.
+
+        :param name: The variable name.
+        :param source: The expression text.
+        :return: The variables that were recomputed, in the order they were.
+        :raises ExpressionError: If the name is reserved or not valid, the expression
+                                 is not valid, refers to an unknown variable or would
+                                 make the variable depend on itself.
+        """
+        if not name.isidentifier():
+            raise ExpressionError(f"'{name}' is not a valid variable name.")
+        if name == ANS:
+            raise ExpressionError(f"'{ANS}' is reserved for the last result.")
+        expression = compile_expression(source.strip())
+        with self._lock:
+            constants = {}
+            if ANS in expression.names:
+                if self.ans is None:
+                    raise ExpressionError(f"There is no result for '{ANS}' yet.")
+                constants[ANS] = self.ans
+            dependencies = expression.names.difference(constants)
+            unknown = sorted(dependencies - self._variables.keys())
+            if unknown:
+                raise ExpressionError(f"Unknown variable '{unknown[0]}'.")
+            if name in dependencies or (name in self._variables
+                                        and self._reaches(name, dependencies)):
+                raise ExpressionError(f"'{name}' cannot depend on itself.")
+
+            variable = self._variables.get(name)
+            if variable is None:
+                variable = self._variables[name] = Variable(name)
+            else:
+                for dependency in variable.dependencies:
+                    self._variables[dependency].dependents.discard(name)
+            variable.expression, variable.constants = expression, constants
+            variable.dependencies = dependencies
+            for dependency in dependencies:
+                self._variables[dependency].dependents.add(name)
+            self._raise_height(variable, 1 + max(
+                (self._variables[dependency].height for dependency in dependencies),
+                default=-1))
+            return self._recompute(variable)
+
+    def _reaches(self, name: str, targets) -> bool:
+        """Return whether any of the targets depends on the variable, directly or not."""
+        pending, seen = [name], {name}
+        while pending:
+            for dependent in self._variables[pending.pop()].dependents:
+                if dependent in targets:
+                    return True
+                if dependent not in seen:
+                    seen.add(dependent)
+                    pending.append(dependent)
+        return False
+
+    def _raise_height(self, variable: Variable, height: int):
+        """Raise a variable's height, and its dependents' heights above it."""
+        if height <= variable.height:
+            return
+        variable.height = height
+        pending = [variable]
+        while pending:
+            lower = pending.pop()
+            for name in lower.dependents:
+                dependent = self._variables[name]
+                if dependent.height <= lower.height:
+                    dependent.height = lower.height + 1
+                    pending.append(dependent)
+
+    def _evaluate(self, variable: Variable):
+        """Compute a variable's value from the current values of its dependencies."""
+        values = dict(variable.constants)
+        for name in variable.dependencies:
+            value = self._variables[name].value
+            if value is None:
+                variable.value, variable.error = None, f"'{name}' has no value."
+                return
+            values[name] = value
+        try:
+            variable.value, variable.error = variable.expression.evaluate(values), None
+        except (ArithmeticError, ValueError) as e:
+            variable.value, variable.error = None, str(e)
+
+    def _recompute(self, changed: Variable) -> List[Variable]:
+        """
+        Recompute a variable and, lowest first, the dependents of every variable whose
+        value changed.
+        """
+        recomputed = []
+        pending = [(changed.height, changed.name)]
+        queued = {changed.name}
+        while pending:
+            _, name = heapq.heappop(pending)
+            variable = self._variables[name]
+            previous = (str(variable.value), variable.error)
+            self._evaluate(variable)
+            recomputed.append(variable)
+            if (str(variable.value), variable.error) == previous:
+                continue
+            for dependent in variable.dependents:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(pending, (self._variables[dependent].height, dependent))
+        return recomputed
+
+    def evaluate(self, source: str) -> Decimal:
+        """
+        Evaluate an expression with the current values of the variables and 'ans', and
+        make its result the new 'ans'.
+
+        :param source: The expression text.
+        :return: The result.
+        :raises ExpressionError: If the expression is not valid or refers to a variable
+                                 without a value.
+        :raises ZeroDivisionError: If the expression divides by zero.
+        """
+        expression = compile_expression(source.strip())
+        with self._lock:
+            values = {}
+            for name in expression.names:
+                variable = self._variables.get(name)
+                if variable is not None:
+                    if variable.value is None:
+                        raise ExpressionError(f"'{name}' has no value: {variable.error}")
+                    values[name] = variable.value
+                elif name == ANS and self.ans is not None:
+                    values[name] = self.ans
+            self._ans = expression.evaluate(values)
+            return self._ans
+
+    def get(self, name: str) -> Optional[Variable]:
+        """
+        Return a variable.
+
+        :param name: The variable name.
+        :return: The Variable, or None if it is not defined.
+        """
+        with self._lock:
+            return self._variables.get(name)
+
+    def values(self) -> Dict[str, Optional[Decimal]]:
+        """
+        Return the current value of every variable, None for those without one.
+
+        :return: A dictionary of values by name, in the order the names were defined.
+        """
+        with self._lock:
+            return {name: variable.value for name, variable in self._variables.items()}
+
+    def clear(self):
+        """
+        Remove every variable and forget 'ans'.
+        """
+        with self._lock:
+            self._variables.clear()
+            self._ans = None
+
+    def __len__(self) -> int:
+        return len(self._variables)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._variables
@@ -9,12 +9,20 @@ and a `CommandHandler` class to manage the registration and execution of these c
   An abstract base class that requires concrete implementations to define an `execute` method. 
   It serves as a template for creating various commands in the application.
 
+- `AsyncCommand`:
+  An abstract base class for commands whose `execute` method is a coroutine.
+
+- `LazyCommand`:
+  A proxy that stands in for a plugin command and imports the real command class only
+  when it is first executed.
+
 - `CommandHandler`:
   A manager class that allows registering commands with a 
   name and an associated callable. It provides methods 
   to execute these commands by name, handling errors 
   appropriately when a command cannot be executed. This 
-  class also allows querying the available commands.
+  class also allows querying the available commands, and records per-command
+  latency and error statistics (see `app.commands.stats`).
 
 ### Usage Example:
 ```python
@@ -31,9 +39,161 @@ handler.register_command('print', PrintCommand())
 
 # Execute the command by name
 handler.execute_command('print', 'Hello, World!')
+
+An input line such as 'calculator add 2 3' is split into the command name and its
+arguments by `parse_command_line`; commands use the arguments they are given and only
+prompt for the ones that are missing. An assignment such as 'y = x * 3' runs the 'let'
+command with the whole line.
+
+Commands that need more input from the user should call `read_input` instead of the
+built-in `input`, so the same command works interactively and when a script is replayed
+through `scripted_input`.
+
+`CommandHandler.execute_command_async` runs commands from an event loop: `AsyncCommand`
+coroutines are awaited directly, and ordinary commands are offloaded to a thread pool so
+that a slow command never stalls the loop.
+
+Commands report errors by printing them and returning False. A command that does so
+because it caught an exception should call `report_failure(e)` first, so that the
+failure is recorded in the statistics under the exception type instead of 'Failed'.
 """
 
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import contextvars
+import functools
+import importlib
+import inspect
+import re
+import shlex
+import threading
+import time
+from app.commands.stats import CommandStats
+
+# Error type recorded when a command reports failure by returning False
+COMMAND_FAILED = 'Failed'
+
+# A line that assigns to a variable, such as 'y = x * 3' (but not 'x == 3')
+ASSIGNMENT_PATTERN = re.compile(r'[A-Za-z_]\w*\s*=(?!=)')
+
+# Function replacing the built-in `input` for commands, set while input is redirected
+_input_reader = None
+
+# Exception types reported by the running command with `report_failure`
+_reported_failures = contextvars.ContextVar('reported_failures', default=None)
+
+
+def report_failure(error):
+    """
+    Record why the running command is failing, for the command statistics.
+
+    Commands that catch an exception, print an error and return False call this so
+    that the failure is recorded under the exception type rather than as 'Failed'.
+    Outside a command run by `CommandHandler`, it does nothing.
+
+    Args:
+        error (BaseException): The exception the command caught.
+    """
+    failures = _reported_failures.get()
+    if failures is not None:
+        failures.append(type(error).__name__)
+
+
+def read_input(prompt=""):
+    """
+    Read one line of input for a command.
+
+    Interactively this shows the prompt and reads from the terminal. While a script is
+    replayed through `scripted_input`, the next script line is returned and no prompt
+    is shown. While input is otherwise redirected (see `redirected_input`), the line
+    comes from the active reader.
+
+    Args:
+        prompt (str): The prompt to display in interactive mode.
+
+    Returns:
+        str: The line that was read.
+
+    Raises:
+        EOFError: If the script has no more lines.
+    """
+    if _input_reader is None:
+        return input(prompt)
+    return _input_reader(prompt)
+
+
+async def read_input_async(prompt=""):
+    """
+    Read one line of input for an `AsyncCommand` without blocking the event loop.
+
+    Args:
+        prompt (str): The prompt to display in interactive mode.
+
+    Returns:
+        str: The line that was read.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, read_input, prompt)
+
+
+@contextmanager
+def redirected_input(reader):
+    """
+    Make `read_input` call the given reader instead of the built-in `input`.
+
+    Args:
+        reader (Callable[[str], str]): Function taking the prompt and returning a line.
+    """
+    global _input_reader  # pylint: disable=global-statement
+    previous, _input_reader = _input_reader, reader
+    try:
+        yield
+    finally:
+        _input_reader = previous
+
+
+@contextmanager
+def scripted_input(lines):
+    """
+    Replay the given lines as command input, without prompting.
+
+    Args:
+        lines (Iterator[str]): The lines to hand out, one per `read_input` call.
+    """
+    def next_line(_prompt):
+        try:
+            return next(lines)
+        except StopIteration as e:
+            raise EOFError("Script ended while a command was waiting for input.") from e
+
+    with redirected_input(next_line):
+        yield
+
+def parse_command_line(line):
+    """
+    Split an input line into a command name and its arguments.
+
+    Arguments are separated by whitespace, and quotes group words into one argument,
+    as in a shell: `calculator add 2 3` or `evaluate "(1 + 2) * 3"`. An assignment
+    such as `y = x * 3` is the 'let' command with the whole line as its argument.
+
+    Args:
+        line (str): The input line.
+
+    Returns:
+        tuple: The command name ('' for a blank line) and a tuple of arguments.
+    """
+    if ASSIGNMENT_PATTERN.match(line.strip()):
+        return 'let', (line.strip(),)
+    try:
+        tokens = shlex.split(line)
+    except ValueError:
+        # Unbalanced quotes: fall back to splitting on whitespace
+        tokens = line.split()
+    if not tokens:
+        return '', ()
+    return tokens[0], tuple(tokens[1:])
 
 class Command(ABC):
     """
@@ -61,6 +221,82 @@ class Command(ABC):
         #pass
 
 
+class AsyncCommand(Command):
+    """
+    Abstract base class for commands implemented as coroutines.
+
+    `CommandHandler.execute_command_async` awaits these directly on the event loop, so
+    they should never block; use `read_input_async` to ask for input. When run through
+    the synchronous `CommandHandler.execute_command`, the coroutine is run to completion
+    in a new event loop.
+    """
+    @abstractmethod
+    async def execute(self, *args):
+        """
+        Execute the command.
+
+        Args:
+            *args: Optional positional arguments.
+
+        Returns:
+            None, or False to report a failure.
+        """
+
+
+class LazyCommand(Command):
+    """
+    Proxy for a command whose module has not been imported yet.
+
+    The module is imported and the command class instantiated on the first call to
+    `execute`; later calls go straight to the real command.
+
+    Attributes:
+        module_name (str): Dotted name of the module defining the command.
+        class_name (str): Name of the `Command` subclass in that module.
+    """
+    def __init__(self, module_name, class_name):
+        self.module_name = module_name
+        self.class_name = class_name
+        self._command = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """
+        Import the module and instantiate the real command, once, even when several
+        threads execute the command for the first time together.
+
+        Returns:
+            Command: The real command instance.
+        """
+        if self._command is None:
+            with self._lock:
+                if self._command is None:
+                    module = importlib.import_module(self.module_name)
+                    self._command = getattr(module, self.class_name)()
+        return self._command
+
+    def is_loaded(self):
+        """
+        Check whether the real command has been imported.
+
+        Returns:
+            bool: True once the command has been resolved.
+        """
+        return self._command is not None
+
+    def execute(self, *args):
+        """
+        Execute the real command, importing it first if needed.
+
+        Args:
+            *args: Arguments passed on to the real command.
+
+        Returns:
+            The return value of the real command's 'execute' method.
+        """
+        return self.resolve().execute(*args)
+
+
 class CommandHandler:
     """
     CommandHandler class manages the registration and execution of commands.
@@ -78,8 +314,16 @@ class CommandHandler:
 
         Attributes:
             commands (dict): A dictionary mapping command names (str) to command callables.
+            max_workers (int): Size of the thread pool used by `execute_command_async`
+                for synchronous commands (None for the `ThreadPoolExecutor` default).
+            stats (CommandStats): Call counts, errors by type and latency histograms
+                of the executed commands.
         """
         self.commands = {}
+        self.max_workers = None
+        self.stats = CommandStats()
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def register_command(self, name, command_callable):
         """
@@ -97,36 +341,137 @@ class CommandHandler:
         """
         self.commands[name] = command_callable
 
+    def register_lazy_command(self, name, module_name, class_name):
+        """
+        Register a command that is imported only when it is first executed.
+
+        Args:
+            name (str): The name of the command to register.
+            module_name (str): Dotted name of the module defining the command.
+            class_name (str): Name of the `Command` subclass in that module.
+
+        Returns:
+            None
+        """
+        self.commands[name] = LazyCommand(module_name, class_name)
+
     def execute_command(self, name, *args):
         """
         Execute a registered command by name, passing any additional arguments.
 
         This method attempts to execute the command associated with the given name. If the 
         command is not found or does not have an 'execute' method, appropriate error messages 
-        will be printed.
+        will be printed. The latency and outcome of every execution of a registered command
+        are recorded in `stats`.
+
+        When no arguments are given, `name` may be a whole input line such as
+        'calculator add 2 3'; it is split with `parse_command_line`.
 
         Args:
-            name (str): The name of the command to execute.
+            name (str): The name of the command to execute, or a command line.
             *args: Additional arguments to pass to the command's 'execute' method.
 
         Returns:
-            None
+            bool: False if the command could not be run or reported a failure by
+            returning False, True otherwise.
         """
-        try:
-            command_callable = self.commands[name]
-            # Try to call the 'execute' method of the command
-            command_callable.execute(*args)
-        except KeyError:
+        if not args and not name.isidentifier():
+            name, args = parse_command_line(name)
+        command_callable = self.commands.get(name)
+        if command_callable is None:
             # Handle the case where the command is not found
             print(f"Command '{name}' not found. Type 'menu' to see available commands.")
+            return False
+
+        started = time.perf_counter_ns()
+        error = None
+        failures = []
+        token = _reported_failures.set(failures)
+        try:
+            # Try to call the 'execute' method of the command
+            result = command_callable.execute(*args)
+            if inspect.iscoroutine(result):
+                # An AsyncCommand run from synchronous code
+                result = asyncio.run(result)
+            if result is False:
+                error = failures[-1] if failures else COMMAND_FAILED
         except AttributeError:
             # Handle the case where the 'execute' method is missing or not callable
             print(f"The command '{name}' cannot be executed.")
+            error = 'AttributeError'
         except TypeError as e:
             # Handle incorrect number or type of arguments passed
             print(f"Command '{name}' failed due to a type error: {e}")
+            error = 'TypeError'
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _reported_failures.reset(token)
+            self.stats.record(name, time.perf_counter_ns() - started, error)
+        return error is None
 
+    def _get_executor(self):
+        """Return the thread pool for synchronous commands, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='command')
+            return self._executor
 
+    async def execute_command_async(self, name, *args):
+        """
+        Execute a registered command by name from a running event loop.
+
+        `AsyncCommand` coroutines are awaited directly. Synchronous commands run in the
+        handler's thread pool, so several long-running commands can overlap and the event
+        loop stays responsive. Errors are reported and recorded, and a whole command line
+        is split into name and arguments, as in `execute_command`.
+
+        Args:
+            name (str): The name of the command to execute, or a command line.
+            *args: Additional arguments to pass to the command's 'execute' method.
+
+        Returns:
+            bool: False if the command could not be run or reported a failure,
+            True otherwise.
+        """
+        if not args and not name.isidentifier():
+            name, args = parse_command_line(name)
+        command_callable = self.commands.get(name)
+        if command_callable is None:
+            print(f"Command '{name}' not found. Type 'menu' to see available commands.")
+            return False
+
+        started = time.perf_counter_ns()
+        error = None
+        failures = []
+        token = _reported_failures.set(failures)
+        try:
+            if isinstance(command_callable, LazyCommand):
+                command_callable = command_callable.resolve()
+            if inspect.iscoroutinefunction(command_callable.execute):
+                result = await command_callable.execute(*args)
+            else:
+                # Run in a copy of the caller's context, so e.g. the active session follows
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), functools.partial(
+                        contextvars.copy_context().run, command_callable.execute, *args))
+            if result is False:
+                error = failures[-1] if failures else COMMAND_FAILED
+        except AttributeError:
+            print(f"The command '{name}' cannot be executed.")
+            error = 'AttributeError'
+        except TypeError as e:
+            print(f"Command '{name}' failed due to a type error: {e}")
+            error = 'TypeError'
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _reported_failures.reset(token)
+            self.stats.record(name, time.perf_counter_ns() - started, error)
+        return error is None
 
     def get_registered_commands(self):
         """
@@ -0,0 +1,226 @@
+"""
+This module sets up non-blocking logging for the app.
+
+Log calls on the hot path only put the record on a bounded queue; a `QueueListener`
+thread formats the records and writes them to the log file and the console. Records
+are not formatted before they are queued, so messages should use %-style arguments
+(`logger.debug("Added %s", value)`) and arguments should not be mutated after logging.
+
+If the queue is full, the record is dropped instead of blocking the caller. High-volume
+messages below WARNING can also be rate limited per message template. Both kinds of
+drops are counted and available from `dropped_records`.
+
+Settings (environment variables):
+- `LOG_QUEUE_SIZE`: Capacity of the record queue (default 10000).
+- `LOG_RATE_LIMIT`: Records per second allowed for each message template below
+  WARNING (default 0, meaning no limit).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 10000
+# Seconds `stop_logging` waits for the listener to make room for its stop sentinel
+STOP_TIMEOUT = 5.0
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    A `QueueHandler` that never blocks and does not format records on the caller's thread.
+
+    Attributes:
+        dropped (int): Number of records dropped because the queue was full.
+    """
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        Leave formatting to the listener thread, except for exception information
+        that cannot be formatted later.
+        """
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        """
+        Put the record on the queue, dropping it if the queue is full.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """
+    A `QueueListener` that can be stopped while its queue is full.
+
+    `QueueListener.stop` puts its stop sentinel with `put_nowait`, which raises
+    `queue.Full` when the hot path has filled the queue. This listener waits up to
+    STOP_TIMEOUT seconds for its thread to make room, and if the thread has not,
+    discards the queued records to make it.
+
+    Attributes:
+        discarded (int): Number of queued records discarded to stop the listener.
+    """
+
+    def __init__(self, record_queue, *handlers, respect_handler_level=False):
+        super().__init__(record_queue, *handlers,
+                         respect_handler_level=respect_handler_level)
+        self.discarded = 0
+
+    def enqueue_sentinel(self):
+        """
+        Put the stop sentinel on the queue once there is room for it.
+        """
+        try:
+            self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+            return
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self.queue.put_nowait(self._sentinel)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.discarded += 1
+                except queue.Empty:
+                    pass
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most `rate` records per second for each message template.
+
+    Records at WARNING or above are never dropped.
+
+    Attributes:
+        rate (float): Records allowed per second for each message template.
+        dropped (int): Number of records rejected so far.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        """
+        Decide whether the record is logged, using a token bucket per message template.
+        """
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self.dropped += 1
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            return True
+
+
+def configure_logging(level, log_file, queue_size=None, rate_limit=None):
+    """
+    Route the root logger through a bounded queue to a file and the console.
+
+    Does nothing if the root logger already has handlers, like `logging.basicConfig`.
+
+    Args:
+        level (int): The root logger level.
+        log_file (str): The file to log to.
+        queue_size (int): Capacity of the record queue (defaults to LOG_QUEUE_SIZE).
+        rate_limit (float): Records per second for each message template below WARNING
+            (defaults to LOG_RATE_LIMIT; 0 disables rate limiting).
+
+    Returns:
+        bool: True if logging was configured.
+    """
+    global _listener  # pylint: disable=global-statement
+    root = logging.getLogger()
+    if root.handlers:
+        return False
+    if queue_size is None:
+        queue_size = int(os.getenv("LOG_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE)))
+    if rate_limit is None:
+        rate_limit = float(os.getenv("LOG_RATE_LIMIT", "0"))
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [
+        logging.FileHandler(log_file),  # Log to file
+        logging.StreamHandler()         # Log to console
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    if rate_limit > 0:
+        queue_handler.addFilter(RateLimitFilter(rate_limit))
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = DrainingQueueListener(queue_handler.queue, *handlers,
+                                      respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return True
+
+
+def dropped_records():
+    """
+    Report how many log records were dropped.
+
+    Returns:
+        dict: Counts under 'queue_full' and 'rate_limited'.
+    """
+    counts = {'queue_full': 0, 'rate_limited': 0}
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            counts['queue_full'] += handler.dropped
+            for log_filter in handler.filters:
+                if isinstance(log_filter, RateLimitFilter):
+                    counts['rate_limited'] += log_filter.dropped
+    return counts
+
+
+def stop_logging():
+    """
+    Write out the queued records, stop the listener thread and log the drop counts.
+
+    The drop counts are written to the listener's handlers directly: the queue may
+    be full, and nothing reads it once the listener has stopped.
+    """
+    global _listener  # pylint: disable=global-statement
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    counts = dropped_records()
+    counts['queue_full'] += listener.discarded
+    if any(counts.values()):
+        record = logging.getLogger(__name__).makeRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Dropped log records: %s queue full, %s rate limited.",
+            (counts['queue_full'], counts['rate_limited']), None)
+        for handler in listener.handlers:
+            handler.handle(record)
@@ -0,0 +1,138 @@
+"""
+This module maintains a cached manifest of the commands provided by the plugins.
+
+Discovering plugins means importing every plugin module and scanning it for `Command`
+subclasses. The manifest records the outcome (command name, module and class name) in
+a JSON file, together with a fingerprint of the plugin sources (path, size and mtime of
+every `.py` file). As long as the fingerprint matches, the app registers lazy proxies
+from the manifest without importing any plugin; a plugin module is imported only when
+its command is first executed.
+"""
+
+import importlib
+import json
+import logging
+import os
+import pkgutil
+from app.commands import Command
+
+DEFAULT_MANIFEST_FILE = os.path.join('logs', 'plugin_manifest.json')
+MANIFEST_VERSION = 1
+
+
+def plugin_fingerprint(package_dir):
+    """
+    Compute a fingerprint of the plugin sources.
+
+    Args:
+        package_dir (str): The plugins directory.
+
+    Returns:
+        list: Sorted [relative path, size, mtime_ns] entries for every `.py` file.
+    """
+    fingerprint = []
+    for directory, _, file_names in os.walk(package_dir):
+        for file_name in file_names:
+            if file_name.endswith('.py'):
+                path = os.path.join(directory, file_name)
+                stat = os.stat(path)
+                fingerprint.append([os.path.relpath(path, package_dir),
+                                    stat.st_size, stat.st_mtime_ns])
+    fingerprint.sort()
+    return fingerprint
+
+
+def discover_plugins(package_dir, plugins_package, skip=('menu', 'stats')):
+    """
+    Import every plugin module and collect the `Command` subclasses it defines.
+
+    Args:
+        package_dir (str): The plugins directory.
+        plugins_package (str): The dotted package name of the plugins directory.
+        skip (tuple): Plugin names that are registered manually and must be skipped.
+
+    Returns:
+        list: [command name, module name, class name] entries in discovery order.
+    """
+    commands = []
+    for _, module_name, is_pkg in pkgutil.walk_packages([package_dir]):
+        if not is_pkg and not module_name.startswith(plugins_package):
+            continue
+        command_name = module_name.split('.')[-1].lower()
+        if command_name in skip:
+            continue
+        full_module_name = f'{plugins_package}.{module_name.split(".")[-1]}'
+        try:
+            module = importlib.import_module(full_module_name)
+        except ModuleNotFoundError as e:
+            logging.error("Error loading module %s: %s", full_module_name, e)
+            continue
+        for attribute_name in dir(module):
+            attribute = getattr(module, attribute_name)
+            if isinstance(attribute, type) and issubclass(attribute, Command) \
+                    and attribute is not Command:
+                commands.append([command_name, full_module_name, attribute_name])
+        logging.info("Discovered module: %s", full_module_name)
+    return commands
+
+
+class PluginManifest:
+    """
+    The cached list of plugin commands, regenerated when the plugin sources change.
+
+    Attributes:
+        path (str): The JSON file the manifest is cached in.
+        package_dir (str): The plugins directory.
+        plugins_package (str): The dotted package name of the plugins directory.
+    """
+
+    def __init__(self, package_dir, plugins_package, path=DEFAULT_MANIFEST_FILE):
+        self.path = path
+        self.package_dir = package_dir
+        self.plugins_package = plugins_package
+
+    def _read(self):
+        """Return the cached manifest, or None if it is missing or unreadable."""
+        try:
+            with open(self.path, encoding='utf-8') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, manifest):
+        """Write the manifest atomically, ignoring an unwritable location."""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logging.warning("Could not write plugin manifest %s: %s", self.path, e)
+
+    def commands(self):
+        """
+        Return the plugin commands, from the cache when it is still valid.
+
+        Returns:
+            list: [command name, module name, class name] entries.
+        """
+        fingerprint = plugin_fingerprint(self.package_dir)
+        manifest = self._read()
+        if (manifest and manifest.get('version') == MANIFEST_VERSION
+                and manifest.get('package') == self.plugins_package
+                and manifest.get('fingerprint') == fingerprint):
+            logging.debug("Using cached plugin manifest %s.", self.path)
+            return manifest['commands']
+
+        logging.info("Plugin manifest is missing or stale; discovering plugins.")
+        commands = discover_plugins(self.package_dir, self.plugins_package)
+        self._write({
+            'version': MANIFEST_VERSION,
+            'package': self.plugins_package,
+            'fingerprint': fingerprint,
+            'commands': commands,
+        })
+        return commands
@@ -0,0 +1,98 @@
+"""
+Module: backend_command
+
+This module defines the `BackendCommand` class, which shows or sets the numeric backend
+calculations are computed with: the current session's (see `app.sessions`), or the
+process-wide default outside a session.
+
+    backend                                  # show the current backend
+    backend fraction                         # exact rational arithmetic
+    backend decimal precision=50 rounding=ROUND_HALF_UP
+    backend default                          # back to the configured default
+"""
+import logging
+from app.calculator.backends import (
+    BACKENDS, DecimalBackend, get_backend, set_default_backend)
+from app.commands import Command, report_failure
+from app.sessions import current_backend, current_session
+
+logger = logging.getLogger(__name__)
+
+DECIMAL_KEYS = ('precision', 'rounding')
+
+
+def parse_backend(name, options):
+    """
+    Create the backend named by the command arguments.
+
+    Args:
+        name (str): The backend name.
+        options (tuple): key=value options; 'precision' and 'rounding' for 'decimal'.
+
+    Returns:
+        NumericBackend: The backend.
+
+    Raises:
+        ValueError: If the name or an option is not valid.
+    """
+    values = {}
+    for option in options:
+        key, separator, value = option.partition('=')
+        if not separator or key not in DECIMAL_KEYS:
+            raise ValueError(f"Invalid option '{option}'. "
+                             f"Use {'=..., '.join(DECIMAL_KEYS)}=... with 'decimal'.")
+        values[key] = value
+    if not values:
+        return get_backend(name)
+    if name.strip().lower() != 'decimal':
+        raise ValueError(f"The '{name}' backend takes no options.")
+    # Options that are not given keep their configured values
+    configured = get_backend('decimal')
+    try:
+        precision = int(values.get('precision', configured.precision))
+    except ValueError:
+        raise ValueError(f"Invalid precision '{values['precision']}'.") from None
+    return DecimalBackend(precision, values.get('rounding', configured.rounding).upper())
+
+
+class BackendCommand(Command):
+    """
+    BackendCommand class for showing and choosing the numeric backend.
+    """
+
+    def execute(self, *args):
+        """
+        Show the current backend, or set it.
+
+        Args:
+            *args: Nothing to show the backend; a backend name ('int', 'float',
+                'decimal' or 'fraction') with optional key=value options
+                (precision, rounding) for 'decimal'; or 'default' to use the
+                configured default again.
+
+        Returns:
+            bool: False if the arguments are invalid, True otherwise.
+        """
+        session = current_session()
+        if not args:
+            print(f"Numeric backend: {current_backend()}")
+            return True
+        if args[0] == 'default':
+            backend = None
+        else:
+            try:
+                backend = parse_backend(args[0], args[1:])
+            except ValueError as e:
+                report_failure(e)
+                logger.warning("Invalid backend arguments %s: %s", args, e)
+                print(f"Error: {e}")
+                print(f"Usage: backend [{'|'.join(BACKENDS)}|default] "
+                      "[precision=N] [rounding=MODE]")
+                return False
+        if session is None:
+            set_default_backend(backend)
+        else:
+            session.backend = backend
+        logger.info("Numeric backend set to %s.", current_backend())
+        print(f"Numeric backend: {current_backend()}")
+        return True
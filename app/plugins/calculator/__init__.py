@@ -1,9 +1,10 @@
-from decimal import Decimal, InvalidOperation
+from decimal import InvalidOperation
 import logging
-from app.commands import Command
+from app.commands import Command, read_input, report_failure
+from app.calculator.backends import get_backend
 from app.calculator.operations import add, subtract, multiply, divide
-from app.calculator.calculation_history import CalculationsHistory
 from app.calculator.calculations import Calculation
+from app.sessions import current_backend, current_history, current_variables
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -15,23 +16,37 @@ class CalculatorCommand(Command):
     The CalculatorCommand class allows the user to dynamically input arithmetic operations, such as
     addition, subtraction, multiplication, and division, through the command-line interface. It also 
     supports retrieving and clearing the history of previous calculations.
+
+    The operation and numbers can be given on the command line (`calculator add 2 3`);
+    only the ones that are missing are asked for. Numbers are parsed and computed with
+    the current numeric backend (see `app.sessions.current_backend`), or with the one
+    named by a `backend=NAME` argument (`calculator divide 1 3 backend=fraction`).
+
+    The command keeps no per-call state, so the single registered instance can run on
+    several threads at once. Calculations go to the history of the active session
+    (see `app.sessions`), or to the process-wide history outside a session.
     """
-    def __init__(self, operation_func=None, num_one=0, num_two=0):
-        self.operation_func = operation_func
-        self.num_one = num_one
-        self.num_two = num_two
 
     def execute(self, *args):
         """
-        Dynamically ask for input when executing the command.
+        Run an operation, asking for the operation and numbers that were not given.
         
         Args:
-            *args: Optional positional arguments.
+            *args: Optional operation name followed by up to two numbers,
+                e.g. ('add', '2', '3'), and optionally 'backend=NAME'.
+
+        Returns:
+            bool: False if the operation failed, True otherwise.
         """
+        backend_names = [arg.partition('=')[2] for arg in args if arg.startswith('backend=')]
+        args = tuple(arg for arg in args if not arg.startswith('backend='))
         try:
-            operation_name = input(
-                "Enter operation (add, subtract, multiply, divide"
-                ", 'history', 'clear_history' or 'exit'): ").strip().lower()
+            if args:
+                operation_name = args[0].strip().lower()
+            else:
+                operation_name = read_input(
+                    "Enter operation (add, subtract, multiply, divide"
+                    ", 'history', 'clear_history' or 'exit'): ").strip().lower()
 
             if operation_name == "exit":
                 logger.info("User chose to exit the calculator.")
@@ -47,70 +62,107 @@ class CalculatorCommand(Command):
                 self.clear_history()
 
             else:
-                logger.info(f"User selected '{operation_name}' operation.")
-                self.handle_arithmetic_operations(operation_name)
+                logger.info("User selected '%s' operation.", operation_name)
+                return self.handle_arithmetic_operations(
+                    operation_name, *args[1:],
+                    backend=backend_names[-1] if backend_names else None)
 
-        except InvalidOperation:
+        except InvalidOperation as e:
+            report_failure(e)
             logger.error("Invalid operation or input was encountered.")
             print("Invalid operation or input was encountered.")
-        except ZeroDivisionError:
+        except ZeroDivisionError as e:
+            report_failure(e)
             logger.error("Division by zero is not allowed.")
             print("Error: Division by zero is not allowed.")
-        except ValueError:
+        except ValueError as e:
+            report_failure(e)
             logger.error("Invalid numeric value provided.")
             print("Error: Invalid numeric value provided.")
         except Exception as e:
-            logger.critical(f"Critical error in execute method: {e}")
+            report_failure(e)
+            logger.critical("Critical error in execute method: %s", e)
             print("Critical error occurred. Exiting...")
+        else:
+            return True
+        return False
 
-    def handle_arithmetic_operations(self, operation_name):
-        """Handles the arithmetic operations like add, subtract, etc."""
-        self.operation_func = self.get_operation_function(operation_name)
-        if not self.operation_func:
-            logger.warning(f"'{operation_name}' is not a valid operation.")
-            print(f"Error: '{operation_name}' is not a valid operation. Exiting to main menu.")
-            return  # Exit on invalid operation
-
-        num_one = input("Enter first number: ").strip()
-        num_two = input("Enter second number: ").strip()
+    def handle_arithmetic_operations(self, operation_name, *numbers, backend=None):
+        """
+        Handles the arithmetic operations like add, subtract, etc.
 
+        Args:
+            operation_name (str): The operation to perform.
+            *numbers: Up to two numbers given on the command line; missing ones are
+                asked for.
+            backend (str or NumericBackend): The numeric backend to compute with
+                (default: the current backend).
+        """
+        operation_func = self.get_operation_function(operation_name)
+        if not operation_func:
+            logger.warning("'%s' is not a valid operation.", operation_name)
+            print(f"Error: '{operation_name}' is not a valid operation. Exiting to main menu.")
+            return False  # Exit on invalid operation
         try:
-            num_one_decimal, num_two_decimal = Decimal(num_one), Decimal(num_two)
+            backend = current_backend() if backend is None else get_backend(backend)
+        except ValueError as e:
+            report_failure(e)
+            logger.warning("Invalid numeric backend: %s", e)
+            print(f"Error: {e}")
+            return False
+        if len(numbers) > 2:
+            logger.warning("Too many arguments for '%s': %s", operation_name, numbers)
+            print(f"Error: '{operation_name}' takes two numbers, got {len(numbers)}.")
+            return False
+
+        prompts = ("Enter first number: ", "Enter second number: ")
+        num_one, num_two = (numbers[index].strip() if index < len(numbers)
+                            else read_input(prompts[index]).strip()
+                            for index in range(2))
 
-            self.num_one = num_one_decimal
-            self.num_two = num_two_decimal
+        try:
+            number_one, number_two = backend.parse(num_one), backend.parse(num_two)
 
             # Create a Calculation instance with the operation function
-            calculation = Calculation(num_one_decimal, num_two_decimal, self.operation_func)
+            calculation = Calculation(number_one, number_two, operation_func, backend=backend)
 
             # Get the result using the Calculation instance
             result = calculation.get_result()
-            logger.info(f"Calculated result for {num_one} {operation_name} {num_two}: {result}")
+            logger.info("Calculated result for %s %s %s: %s",
+                        num_one, operation_name, num_two, result)
             print(f"The result of {num_one} {operation_name} {num_two} is: {result}")
 
-            # Add to history
-            CalculationsHistory.add_calculation(calculation)
-            logger.debug(f"Added calculation to history: {num_one} {operation_name} {num_two}")
+            # Add to history, and make the result the 'ans' of expressions
+            current_history().add_calculation(calculation)
+            current_variables().ans = result
+            logger.debug("Added calculation to history: %s %s %s", num_one, operation_name, num_two)
+            return True
 
-        except InvalidOperation:
-            logger.error(f"Invalid number input: '{num_one}' or '{num_two}' is not a valid number.")
+        except (InvalidOperation, ValueError) as e:
+            report_failure(e)
+            logger.error("Invalid number input: '%s' or '%s' is not a valid number.",
+                         num_one, num_two)
             print(f"Invalid number input: '{num_one}' or '{num_two}' is not a valid number.")
-        except ZeroDivisionError:
+        except ZeroDivisionError as e:
+            report_failure(e)
             logger.error("Division by zero is not allowed.")
             print("Error: Division by zero is not allowed.")
         except Exception as e:
-            logger.critical(f"Critical error in handle_arithmetic_operations: {e}")
+            report_failure(e)
+            logger.critical("Critical error in handle_arithmetic_operations: %s", e)
             print("Critical error occurred. Exiting...")
+        return False
 
     def display_history(self):
         """Displays the history of calculations."""
-        history = CalculationsHistory.get_history()
+        history = current_history().snapshot()
         if history:
             logger.info("Displaying calculation history.")
             print("\nCalculation History:")
             for calc in history:
                 result = calc.get_result()
-                logger.debug(f"History: {calc.number_one} {calc.operation_func.__name__} {calc.number_two} = {result}")
+                logger.debug("History: %s %s %s = %s",
+                             calc.number_one, calc.operation_func.__name__, calc.number_two, result)
                 print(f"{calc.number_one} {calc.operation_func.__name__} {calc.number_two} = {result}")
         else:
             logger.info("No calculations in history.")
@@ -118,7 +170,7 @@ class CalculatorCommand(Command):
 
     def clear_history(self):
         """Clears the history of calculations."""
-        CalculationsHistory.clear_history()
+        current_history().clear_history()
         logger.info("Calculation history cleared.")
         print("Calculation history cleared.")
 
@@ -132,7 +184,7 @@ class CalculatorCommand(Command):
         }
         operation_func = operations_map.get(operation_name)
         if operation_func:
-            logger.debug(f"Mapped '{operation_name}' to function '{operation_func.__name__}'.")
+            logger.debug("Mapped '%s' to function '%s'.", operation_name, operation_func.__name__)
         else:
-            logger.warning(f"Invalid operation name: '{operation_name}'.")
+            logger.warning("Invalid operation name: '%s'.", operation_name)
         return operation_func
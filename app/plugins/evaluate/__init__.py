@@ -0,0 +1,57 @@
+"""
+Module: evaluate_command
+
+This module defines the `EvaluateCommand` class, which evaluates a whole infix expression
+such as '(1.5 + 2) * 3 / 7' in a single step. It inherits from the `Command` abstract
+base class. Expressions can refer to the variables defined with the `let` command and
+to 'ans', the last result; their result becomes the new 'ans'.
+"""
+import logging
+from app.commands import Command, read_input, report_failure
+from app.calculator.expressions import ExpressionError
+from app.sessions import current_variables
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluateCommand(Command):
+    """
+    EvaluateCommand class for evaluating arithmetic expressions.
+
+    The expression is compiled once and cached, so repeated formulas skip parsing.
+    """
+
+    def execute(self, *args):
+        """
+        Evaluate the expression given as arguments, or ask for one, and print the result.
+
+        Args:
+            *args: Optional words of the expression, e.g. ('(1 + 2)', '*', '3').
+
+        Returns:
+            bool: False if the expression could not be evaluated, True otherwise.
+        """
+        if args:
+            expression = " ".join(args).strip()
+        else:
+            expression = read_input("Enter expression: ").strip()
+        try:
+            result = current_variables().evaluate(expression)
+        except ExpressionError as e:
+            report_failure(e)
+            logger.error("Invalid expression '%s': %s", expression, e)
+            print(f"Error: Invalid expression: {e}")
+            return False
+        except ZeroDivisionError as e:
+            report_failure(e)
+            logger.error("Division by zero is not allowed.")
+            print("Error: Division by zero is not allowed.")
+            return False
+        except ArithmeticError as e:
+            report_failure(e)
+            logger.error("Arithmetic error in '%s': %s", expression, e)
+            print(f"Error: {type(e).__name__} while evaluating the expression.")
+            return False
+        logger.info("Evaluated expression %s = %s", expression, result)
+        print(f"The result of {expression} is: {result}")
+        return True
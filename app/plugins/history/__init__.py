@@ -0,0 +1,275 @@
+"""
+Module: history_command
+
+This module defines the `HistoryCommand` class, which lists, queries, exports and
+imports the calculation history of the current session (or the process-wide history
+outside a session).
+
+Queries use the history's indexes instead of scanning it:
+    history                                  # every calculation, oldest first
+    history query op=divide min=1000         # divisions with a result of at least 1000
+    history query min=-5 max=5               # results between -5 and 5, ascending
+    history query top=3 op=multiply          # the three largest products
+    history query bottom=3                   # the three smallest results
+
+Exports and imports stream the history in chunks (see `app.calculator.history_io`):
+    history export history.csv               # CSV or NDJSON, from the extension
+    history export dump.txt format=ndjson chunk=50000
+    history import history.csv               # resumes an interrupted import
+
+Checkpoints name versions of the history, which `undo` and `redo` move between:
+    history checkpoint before-import         # name the current version
+    history restore before-import            # undo or redo back to it
+    history checkpoints                      # list the checkpoints
+
+With HISTORY_SHARED_FILE set, the history is shared with other processes:
+    history shared                           # every process's calculations, merged
+"""
+from decimal import Decimal, InvalidOperation
+import logging
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.history_io import DEFAULT_CHUNK_SIZE, export_history, import_history
+from app.calculator.operations import OPERATIONS
+from app.commands import Command, report_failure
+from app.sessions import current_history
+
+logger = logging.getLogger(__name__)
+
+QUERY_KEYS = ('op', 'min', 'max', 'top', 'bottom')
+TRANSFER_KEYS = ('format', 'chunk')
+
+
+class HistoryCommand(Command):
+    """
+    HistoryCommand class for listing, querying, exporting and importing previous
+    calculations.
+    """
+
+    def execute(self, *args):
+        """
+        List the history, or run the subcommand given as arguments.
+
+        Args:
+            *args: Nothing to list the history; 'query' followed by key=value
+                filters (op, min, max, top, bottom); 'export' or 'import', a
+                file path and key=value options (format, chunk); 'checkpoint' or
+                'restore' and a checkpoint name; 'checkpoints'; or 'shared'.
+
+        Returns:
+            bool: False if the arguments are invalid or the transfer failed,
+            True otherwise.
+        """
+        if not args:
+            return self.show("Calculation History:", current_history().snapshot())
+        if args[0] == 'query':
+            return self.query(args[1:])
+        if args[0] in ('export', 'import'):
+            return self.transfer(args[0], args[1:])
+        if args[0] in ('checkpoint', 'restore', 'checkpoints'):
+            return self.checkpoint(args[0], args[1:])
+        if args[0] == 'shared':
+            if CalculationsHistory.shared is None:
+                print("Error: No shared history. Set HISTORY_SHARED_FILE to share one.")
+                return False
+            return self.show("Shared Calculation History:",
+                             CalculationsHistory.shared.snapshot())
+        print(f"Error: Unknown history subcommand '{args[0]}'. Use 'query', 'export', "
+              "'import', 'checkpoint', 'restore', 'checkpoints' or 'shared'.")
+        return False
+
+    @staticmethod
+    def checkpoint(subcommand, args):
+        """
+        Take, restore or list checkpoints of the history.
+
+        Args:
+            subcommand (str): 'checkpoint', 'restore' or 'checkpoints'.
+            args (tuple): The checkpoint name, for 'checkpoint' and 'restore'.
+
+        Returns:
+            bool: False if the arguments are invalid or the checkpoint is unknown,
+            True otherwise.
+        """
+        history = current_history()
+        if subcommand == 'checkpoints':
+            checkpoints = history.list_checkpoints()
+            if not checkpoints:
+                print("No checkpoints.")
+            for name, size in checkpoints.items():
+                print(f"{name}: {size} calculations")
+            return True
+        if len(args) != 1:
+            print(f"Usage: history {subcommand} NAME")
+            return False
+        if subcommand == 'checkpoint':
+            history.checkpoint(args[0])
+            print(f"Checkpoint '{args[0]}' taken.")
+            return True
+        try:
+            steps = history.restore_checkpoint(args[0])
+        except ValueError as e:
+            report_failure(e)
+            print(f"Error: {e}")
+            return False
+        action = "redone" if steps > 0 else "undone"
+        print(f"Restored checkpoint '{args[0]}' ({abs(steps)} calculations {action}).")
+        logger.info("Restored history checkpoint %s in %s steps.", args[0], steps)
+        return True
+
+    def transfer(self, direction, args):
+        """
+        Export the history to a file or import calculations from one.
+
+        Args:
+            direction (str): 'export' or 'import'.
+            args (tuple): The file path followed by key=value options.
+
+        Returns:
+            bool: False if the arguments are invalid or the transfer failed, True otherwise.
+        """
+        try:
+            if not args or '=' in args[0]:
+                raise ValueError(f"Usage: history {direction} PATH [format=csv|ndjson] "
+                                 "[chunk=N]")
+            path, options = args[0], self.parse_transfer_options(args[1:])
+            transfer_func = export_history if direction == 'export' else import_history
+            report = transfer_func(current_history(), path, options.get('format'),
+                                   options.get('chunk', DEFAULT_CHUNK_SIZE))
+        except (OSError, ValueError) as e:
+            report_failure(e)
+            logger.error("History %s of %s failed: %s", direction, args, e)
+            print(f"Error: {e}")
+            return False
+
+        verb = "Exported" if direction == 'export' else "Imported"
+        preposition = "to" if direction == 'export' else "from"
+        print(f"{verb} {report.rows} calculations {preposition} {path} in "
+              f"{report.seconds:.2f} s ({report.rows_per_second:,.0f} calculations/s, "
+              f"{report.megabytes_per_second:.1f} MB/s).")
+        if report.skipped:
+            print(f"Skipped {report.skipped} calculations that cannot be exported.")
+        if report.resumed_rows:
+            print(f"Resumed after {report.resumed_rows} calculations imported earlier.")
+        logger.info("%s %s calculations %s %s in %.3f s.", verb, report.rows, preposition,
+                    path, report.seconds)
+        return True
+
+    @staticmethod
+    def parse_transfer_options(options):
+        """
+        Parse key=value export and import options.
+
+        Args:
+            options (tuple): key=value strings.
+
+        Returns:
+            dict: The options, with the chunk size converted.
+
+        Raises:
+            ValueError: If an option is malformed or unknown.
+        """
+        parsed = {}
+        for item in options:
+            key, separator, value = item.partition('=')
+            if not separator or key not in TRANSFER_KEYS:
+                raise ValueError(f"Invalid option '{item}'. Use key=value with keys "
+                                 f"{', '.join(TRANSFER_KEYS)}.")
+            if key == 'chunk':
+                if not value.isdigit() or int(value) < 1:
+                    raise ValueError("'chunk' must be a positive integer.")
+                parsed[key] = int(value)
+            else:
+                parsed[key] = value
+        return parsed
+
+    def query(self, filters):
+        """
+        Run an indexed query and print the matching calculations.
+
+        Args:
+            filters (tuple): key=value strings.
+
+        Returns:
+            bool: False if a filter is invalid, True otherwise.
+        """
+        try:
+            options = self.parse_filters(filters)
+        except ValueError as e:
+            report_failure(e)
+            logger.error("Invalid history query %s: %s", filters, e)
+            print(f"Error: {e}")
+            return False
+
+        history = current_history()
+        operation_name = options.get('op')
+        if 'top' in options or 'bottom' in options:
+            largest = 'top' in options
+            calculations = history.top_k(options['top' if largest else 'bottom'],
+                                         operation_name, largest,
+                                         options.get('min'), options.get('max'))
+        elif 'min' in options or 'max' in options:
+            calculations = history.find_by_result(options.get('min'), options.get('max'),
+                                                  operation_name)
+        elif operation_name is not None:
+            calculations = history.find_by_operation(operation_name)
+        else:
+            calculations = history.snapshot()
+        logger.info("History query %s matched %s calculations.", filters, len(calculations))
+        return self.show(f"Found {len(calculations)} calculations:", calculations)
+
+    @staticmethod
+    def parse_filters(filters):
+        """
+        Parse key=value query filters.
+
+        Args:
+            filters (tuple): key=value strings.
+
+        Returns:
+            dict: The filters, with numbers converted.
+
+        Raises:
+            ValueError: If a filter is malformed, unknown or has an invalid value.
+        """
+        options = {}
+        for item in filters:
+            key, separator, value = item.partition('=')
+            if not separator or key not in QUERY_KEYS:
+                raise ValueError(f"Invalid filter '{item}'. Use key=value with keys "
+                                 f"{', '.join(QUERY_KEYS)}.")
+            if key == 'op':
+                if value not in OPERATIONS:
+                    raise ValueError(f"'{value}' is not a valid operation.")
+                options[key] = value
+            elif key in ('top', 'bottom'):
+                if not value.isdigit():
+                    raise ValueError(f"'{key}' must be a non-negative integer.")
+                options[key] = int(value)
+            else:
+                try:
+                    options[key] = Decimal(value)
+                except InvalidOperation:
+                    raise ValueError(f"'{value}' is not a valid number.") from None
+                if not options[key].is_finite():
+                    raise ValueError(f"'{key}' must be a finite number.")
+        if 'top' in options and 'bottom' in options:
+            raise ValueError("Use either 'top' or 'bottom', not both.")
+        return options
+
+    @staticmethod
+    def show(title, calculations):
+        """
+        Print calculations, one per line.
+
+        Returns:
+            bool: True.
+        """
+        if not calculations:
+            print("No calculations in history." if title.endswith("History:")
+                  else "No calculations match the query.")
+            return True
+        print(f"\n{title}")
+        for calc in calculations:
+            print(f"{calc.number_one} {calc.operation_func.__name__} {calc.number_two} "
+                  f"= {calc.get_result()}")
+        return True
@@ -0,0 +1,89 @@
+"""
+Module: let_command
+
+This module defines the `LetCommand` class, which defines reactive variables in the
+variables of the current session (or the process-wide ones outside a session). An
+input line that is an assignment runs this command, so `let` can be left out:
+
+    x = 5
+    y = x * 3                                # 15
+    x = 2                                    # recomputes y: 6
+    total = ans + y                          # 'ans' is the last result
+    let                                      # list the variables
+
+Redefining a variable recomputes only the variables that depend on it, in
+topological order (see `app.calculator.variables`).
+"""
+import logging
+from app.calculator.expressions import ExpressionError
+from app.commands import Command, report_failure
+from app.sessions import current_variables
+
+logger = logging.getLogger(__name__)
+
+# Recomputed variables listed after an assignment; the rest are only counted
+SHOWN_RECOMPUTED = 10
+
+
+def format_variable(variable):
+    """
+    Format a variable and its value, or the reason it has none.
+
+    Args:
+        variable (Variable): The variable.
+
+    Returns:
+        str: 'name = value', or 'name = <error: ...>'.
+    """
+    if variable.value is None:
+        return f"{variable.name} = <error: {variable.error}>"
+    return f"{variable.name} = {variable.value}"
+
+
+class LetCommand(Command):
+    """
+    LetCommand class for defining and listing variables.
+    """
+
+    def execute(self, *args):
+        """
+        Define a variable and print it with the variables that were recomputed, or list
+        the variables.
+
+        Args:
+            *args: Nothing to list the variables, or the words of an assignment such
+                as ('y', '=', 'x', '*', '3') or ('y = x * 3',).
+
+        Returns:
+            bool: False if the assignment is invalid, True otherwise.
+        """
+        variables = current_variables()
+        if not args:
+            if not len(variables):
+                print("No variables defined.")
+            for name in variables.values():
+                print(format_variable(variables.get(name)))
+            return True
+
+        name, separator, source = " ".join(args).partition('=')
+        name = name.strip()
+        try:
+            if not separator or not source.strip():
+                raise ExpressionError("Usage: let NAME = EXPRESSION")
+            recomputed = variables.define(name, source)
+        except ExpressionError as e:
+            report_failure(e)
+            logger.error("Invalid assignment %s: %s", args, e)
+            print(f"Error: {e}")
+            return False
+
+        print(format_variable(recomputed[0]))
+        dependents = recomputed[1:]
+        if dependents:
+            print(f"Recomputed {len(dependents)} dependent variables:")
+            for variable in dependents[:SHOWN_RECOMPUTED]:
+                print(f"  {format_variable(variable)}")
+            if len(dependents) > SHOWN_RECOMPUTED:
+                print(f"  ... and {len(dependents) - SHOWN_RECOMPUTED} more")
+        logger.info("Defined %s, recomputing %s variables.", name, len(recomputed))
+        return True
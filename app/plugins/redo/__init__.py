@@ -0,0 +1,50 @@
+"""
+Module: redo_command
+
+This module defines the `RedoCommand` class, which adds calculations removed by the
+`undo` command back to the history, newest undone first. Adding a new calculation
+after an undo discards the undone ones:
+
+    redo                                     # redo the last undone calculation
+    redo 3                                   # redo the three last undone calculations
+"""
+import logging
+from app.commands import Command, report_failure
+from app.plugins.undo import parse_count
+from app.sessions import current_history
+
+logger = logging.getLogger(__name__)
+
+
+class RedoCommand(Command):
+    """
+    RedoCommand class for adding undone calculations back to the history.
+    """
+
+    def execute(self, *args):
+        """
+        Redo the last undone calculations and print each one.
+
+        Args:
+            *args: An optional number of calculations to redo (default: 1).
+
+        Returns:
+            bool: False if the arguments are invalid or there was nothing to redo,
+            True otherwise.
+        """
+        try:
+            count = parse_count(args, 'redo')
+        except ValueError as e:
+            report_failure(e)
+            print(f"Error: {e}")
+            return False
+        history = current_history()
+        for redone in range(count):
+            calculation = history.redo()
+            if calculation is None:
+                print("Nothing to redo.")
+                return redone > 0
+            print(f"Redone: {calculation.number_one} {calculation.operation_func.__name__} "
+                  f"{calculation.number_two} = {calculation.get_result()}")
+        logger.info("Redid %s calculations.", count)
+        return True
@@ -0,0 +1,104 @@
+"""
+Module: reduce_command
+
+This module defines the `ReduceCommand` class, which sums, multiplies or averages a
+stream of numbers given on the command line or read from a file. The file is read
+lazily (see `app.calculator.reductions`), so it may be far larger than memory:
+
+    reduce sum 1 2 3.5                       # numbers on the command line
+    reduce mean file=numbers.txt             # whitespace-separated numbers in a file
+    reduce sum file=numbers.txt backend=float
+"""
+import logging
+from app.calculator import Calculator
+from app.calculator.reductions import REDUCTIONS
+from app.commands import Command, report_failure
+from app.sessions import current_backend
+
+logger = logging.getLogger(__name__)
+
+OPTION_KEYS = ('file', 'backend')
+
+
+def read_numbers(path):
+    """
+    Yield the whitespace-separated numbers of a file, one line at a time.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        Iterator[str]: The numbers, as text.
+    """
+    with open(path, encoding='utf-8') as numbers_file:
+        for line in numbers_file:
+            yield from line.split()
+
+
+class ReduceCommand(Command):
+    """
+    ReduceCommand class for summing, multiplying or averaging many numbers at once.
+    """
+
+    def execute(self, *args):
+        """
+        Reduce the numbers and print the result, the count and the elapsed time.
+
+        Args:
+            *args: 'sum', 'product' or 'mean', followed by numbers and/or key=value
+                options: file=PATH to read the numbers from a file, backend=NAME to
+                choose the numeric backend (default: the current one).
+
+        Returns:
+            bool: False if the arguments or a number are invalid, True otherwise.
+        """
+        if not args or args[0] not in REDUCTIONS:
+            print(f"Usage: reduce {'|'.join(REDUCTIONS)} [NUMBER ...] [file=PATH] "
+                  "[backend=NAME]")
+            return False
+        reduction_name = args[0]
+        numbers = [arg for arg in args[1:] if '=' not in arg]
+        try:
+            options = self.parse_options([arg for arg in args[1:] if '=' in arg])
+            if 'file' in options:
+                if numbers:
+                    raise ValueError("Give the numbers either on the command line or "
+                                     "in a file, not both.")
+                numbers = read_numbers(options['file'])
+            reduce_func = getattr(Calculator, reduction_name)
+            result = reduce_func(numbers, options.get('backend') or current_backend())
+        except (OSError, ValueError, ArithmeticError) as e:
+            report_failure(e)
+            logger.error("Reduction %s failed: %s", args, e)
+            print(f"Error: {e}")
+            return False
+
+        print(f"{reduction_name.capitalize()} of {result.count} values: {result.value}")
+        print(f"Reduced {result.count} values in {result.seconds:.2f} s "
+              f"({result.values_per_second:,.0f} values/s).")
+        logger.info("Reduced %s values (%s) in %.3f s.", result.count, reduction_name,
+                    result.seconds)
+        return True
+
+    @staticmethod
+    def parse_options(options):
+        """
+        Parse key=value options.
+
+        Args:
+            options (list): key=value strings.
+
+        Returns:
+            dict: The options.
+
+        Raises:
+            ValueError: If an option is unknown.
+        """
+        parsed = {}
+        for item in options:
+            key, _, value = item.partition('=')
+            if key not in OPTION_KEYS:
+                raise ValueError(f"Invalid option '{item}'. Use key=value with keys "
+                                 f"{', '.join(OPTION_KEYS)}.")
+            parsed[key] = value
+        return parsed
@@ -0,0 +1,42 @@
+"""
+Module: stats_command
+
+This module defines the `StatsCommand` class, which displays the execution statistics
+collected by the command handler: the number of calls and errors of every command and
+its p50/p95/p99 latency.
+"""
+import json
+from app.commands import Command
+
+class StatsCommand(Command):
+    """
+    StatsCommand class for displaying per-command latency and error statistics.
+
+    Attributes:
+        command_handler (CommandHandler): The command handler whose statistics are shown.
+    """
+
+    def __init__(self, command_handler):
+        """
+        Initialize the StatsCommand with a command handler.
+
+        Args:
+            command_handler (CommandHandler): The handler that records the statistics.
+        """
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """
+        Execute the stats command, displaying the statistics as a table.
+
+        Args:
+            *args: Pass 'json' to print the statistics as JSON instead.
+
+        Returns:
+            None
+        """
+        if args and args[0] == 'json':
+            print(json.dumps(self.command_handler.stats.snapshot(), indent=2))
+            return
+        print("\nCommand statistics:")
+        print(self.command_handler.stats.format())
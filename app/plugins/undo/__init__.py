@@ -0,0 +1,72 @@
+"""
+Module: undo_command
+
+This module defines the `UndoCommand` class, which removes the newest calculations
+from the history of the current session (or the process-wide history outside a
+session). Undone calculations are kept until the next calculation is added, so the
+`redo` command can bring them back:
+
+    undo                                     # undo the newest calculation
+    undo 3                                   # undo the three newest calculations
+"""
+import logging
+from app.commands import Command, report_failure
+from app.sessions import current_history
+
+logger = logging.getLogger(__name__)
+
+
+def parse_count(args, command_name):
+    """
+    Parse the optional number of steps of an undo or redo command.
+
+    Args:
+        args (tuple): The command arguments.
+        command_name (str): 'undo' or 'redo', for the usage message.
+
+    Returns:
+        int: The number of steps (default: 1).
+
+    Raises:
+        ValueError: If the arguments are not a single positive integer.
+    """
+    if not args:
+        return 1
+    if len(args) > 1 or not args[0].isdigit() or int(args[0]) < 1:
+        raise ValueError(f"Usage: {command_name} [COUNT], where COUNT is a positive "
+                         "integer.")
+    return int(args[0])
+
+
+class UndoCommand(Command):
+    """
+    UndoCommand class for removing the newest calculations from the history.
+    """
+
+    def execute(self, *args):
+        """
+        Undo the newest calculations and print each one.
+
+        Args:
+            *args: An optional number of calculations to undo (default: 1).
+
+        Returns:
+            bool: False if the arguments are invalid or there was nothing to undo,
+            True otherwise.
+        """
+        try:
+            count = parse_count(args, 'undo')
+        except ValueError as e:
+            report_failure(e)
+            print(f"Error: {e}")
+            return False
+        history = current_history()
+        for undone in range(count):
+            calculation = history.undo()
+            if calculation is None:
+                print("Nothing to undo.")
+                return undone > 0
+            print(f"Undone: {calculation.number_one} {calculation.operation_func.__name__} "
+                  f"{calculation.number_two} = {calculation.get_result()}")
+        logger.info("Undid %s calculations.", count)
+        return True
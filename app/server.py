@@ -0,0 +1,425 @@
+"""
+This module serves the registered commands and the `Calculator` operations over HTTP/JSON.
+
+`CalculatorServer` is a small asyncio HTTP/1.1 server with keep-alive connections, so a
+client pays for connecting once and then makes requests against a warm process. It is
+meant for local use by other services (`python main.py --serve 127.0.0.1:8080`) and has
+no authentication.
+
+Endpoints (request and response bodies are JSON):
+- `GET /commands`: The names of the commands that can be run.
+- `POST /commands/<name>`: Run a command with `{"args": [...]}`. The response holds
+  `ok` and everything the command printed in `output`. Commands cannot prompt: if one
+  asks for input it was not given, the request fails with status 400.
+- `POST /calculate`: `{"operation": "add", "a": "2", "b": "3"}` returns `{"result": "5"}`.
+  An optional `"backend"` ('int', 'float', 'decimal' or 'fraction') selects the
+  numeric backend for this call.
+- `POST /batch`: `{"operation": "add", "a": [...], "b": [...]}` returns the `values`
+  and the per-element `errors` of `Calculator.batch`.
+- `GET /history`, `DELETE /history`: List or clear the session's calculations.
+
+Numbers are exchanged as strings (JSON numbers are accepted too), so no precision is
+lost on the way. `/calculate` computes them with the session's numeric backend (set
+with the 'backend' command; NUMERIC_BACKEND by default) and `/batch` as Decimal.
+A session is named by the `X-Session-Id` request header; without one, each
+connection gets its own session, whose id is returned in the `X-Session-Id` response
+header. Every session has its own quota-bounded history (see `app.sessions`), which
+`/calculate` and commands such as 'calculator' record to. Sessions that stay idle
+longer than SESSION_IDLE_TIMEOUT are removed by a background reaper.
+"""
+
+import asyncio
+from contextlib import redirect_stdout
+from decimal import Decimal, DecimalException, InvalidOperation
+import functools
+import io
+import json
+import logging
+import threading
+from app.calculator import Calculator
+from app.calculator.backends import get_backend
+from app.calculator.calculations import Calculation
+from app.calculator.operations import OPERATIONS
+from app.commands import redirected_input
+from app.sessions import SessionManager, activate, current_backend
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Commands that would stop the server process
+EXCLUDED_COMMANDS = ('exit',)
+
+SESSION_HEADER = 'x-session-id'
+
+STATUS_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class RequestError(Exception):
+    """
+    Raised while handling a request to answer it with an error status.
+
+    Attributes:
+        status (int): The HTTP status code.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def describe_error(error):
+    """
+    Describe an arithmetic error for a response.
+
+    Decimal signals raised by a context carry only a list of signal classes as their
+    message, so they are described by their name alone.
+
+    Args:
+        error (ArithmeticError): The error.
+
+    Returns:
+        str: The error name, and its message if it has a useful one.
+    """
+    if isinstance(error, DecimalException) and (
+            not error.args or isinstance(error.args[0], list)):
+        return type(error).__name__
+    return f"{type(error).__name__}: {error}"
+
+
+def parse_number(value, backend=None):
+    """
+    Convert a JSON number or numeric string to Decimal, or to the type of a backend.
+
+    Args:
+        value: The value from the request body.
+        backend (NumericBackend): The backend to convert with (default: Decimal).
+
+    Returns:
+        Decimal: The number (of the backend's type, if one is given).
+
+    Raises:
+        RequestError: If the value is not a number.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise RequestError(400, f"Invalid number: {value!r}.")
+    try:
+        return Decimal(str(value)) if backend is None else backend.convert(value)
+    except (InvalidOperation, ValueError):
+        raise RequestError(400, f"Invalid number: {value!r}.") from None
+
+
+def parse_backend(body, session):
+    """
+    Return the numeric backend of a request body, or else the session's.
+
+    Raises:
+        RequestError: If the backend is unknown.
+    """
+    name = body.get('backend')
+    if name is None:
+        with activate(session):
+            return current_backend()
+    if not isinstance(name, str):
+        raise RequestError(400, "'backend' must be a string.")
+    try:
+        return get_backend(name)
+    except ValueError as e:
+        raise RequestError(400, str(e)) from None
+
+
+def parse_operation(body):
+    """
+    Return the operation name of a request body.
+
+    Raises:
+        RequestError: If the operation is missing or unknown.
+    """
+    operation_name = body.get('operation')
+    if operation_name not in OPERATIONS:
+        raise RequestError(400, f"'{operation_name}' is not a valid operation.")
+    return operation_name
+
+
+class CalculatorServer:
+    """
+    An HTTP/JSON front end for a `CommandHandler` and the `Calculator`.
+
+    Attributes:
+        command_handler (CommandHandler): The handler whose commands are exposed.
+        sessions (SessionManager): The client sessions.
+    """
+
+    def __init__(self, command_handler, sessions=None):
+        """
+        Initialize the server.
+
+        Args:
+            command_handler (CommandHandler): The handler whose commands are exposed.
+            sessions (SessionManager): The session manager (default: one configured
+                from the environment).
+        """
+        self.command_handler = command_handler
+        self.sessions = SessionManager() if sessions is None else sessions
+        self._server = None
+        self._writers = set()
+        # Commands print to the process-wide stdout, so they run one at a time
+        self._command_lock = threading.Lock()
+        self.routes = {
+            ('GET', '/commands'): self.list_commands,
+            ('POST', '/calculate'): self.calculate,
+            ('POST', '/batch'): self.batch,
+            ('GET', '/history'): self.get_history,
+            ('DELETE', '/history'): self.clear_history,
+        }
+
+    async def start(self, host, port):
+        """
+        Start listening.
+
+        Args:
+            host (str): The address to bind to.
+            port (int): The port to bind to (0 picks a free one).
+
+        Returns:
+            tuple: The (host, port) actually bound.
+        """
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        self.sessions.start_reaper()
+        address = self._server.sockets[0].getsockname()[:2]
+        logging.info("Serving on http://%s:%s", *address)
+        return address
+
+    async def serve_forever(self):
+        """
+        Serve requests until the task is cancelled.
+        """
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """
+        Stop listening and wait for the server to close.
+        """
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise stay open
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.sessions.stop_reaper()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answer the requests of one connection until the client closes it.
+        """
+        connection_session = None
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except RequestError as e:
+                    await self.send(writer, e.status, {'error': str(e)}, None, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                session_id = headers.get(SESSION_HEADER)
+                if session_id is None:
+                    # The connection's own session; recreated if it was reaped
+                    session_id = connection_session
+                session = self.sessions.get(session_id)
+                if headers.get(SESSION_HEADER) is None:
+                    connection_session = session.session_id
+
+                status, response = await self.dispatch(method, path, body, session)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.send(writer, status, response, session.session_id, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Error serving a connection.")
+            try:
+                await self.send(writer, 500, {'error': "Internal server error."}, None,
+                                keep_alive=False)
+            except ConnectionError:
+                pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def read_request(self, reader):
+        """
+        Read one request from the connection.
+
+        Returns:
+            tuple: (method, path, headers, body), or None if the client closed the
+            connection.
+
+        Raises:
+            RequestError: If the request is malformed or too large.
+        """
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise RequestError(400, "Incomplete request.") from None
+            return None
+        except asyncio.LimitOverrunError:
+            raise RequestError(413, "Request headers are too large.") from None
+
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, path, _version = request_line.split(' ')
+        except ValueError:
+            raise RequestError(400, "Malformed request line.") from None
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length.") from None
+        if length > MAX_BODY_SIZE:
+            raise RequestError(413, "Request body is too large.")
+        body = await reader.readexactly(length) if length else b''
+        return method, path, headers, body
+
+    async def send(self, writer, status, response, session_id, keep_alive=True):
+        """
+        Write a JSON response.
+        """
+        payload = json.dumps(response).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {STATUS_REASONS[status]}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(payload)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if session_id is not None:
+            head.append(f"X-Session-Id: {session_id}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + payload)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body, session):
+        """
+        Route a request to its handler, which runs in the loop's default executor so that
+        slow commands and large batches do not hold up other connections.
+
+        Returns:
+            tuple: The status code and the response object.
+        """
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise RequestError(400, "The request body must be a JSON object.")
+            if path.startswith('/commands/'):
+                if method != 'POST':
+                    raise RequestError(405, f"Use POST to run a command, not {method}.")
+                handler = functools.partial(self.run_command, path[len('/commands/'):])
+            else:
+                handler = self.routes.get((method, path))
+            if handler is None:
+                if any(route_path == path for _, route_path in self.routes):
+                    raise RequestError(405, f"{method} is not allowed on {path}.")
+                raise RequestError(404, f"Unknown path: {path}.")
+            return 200, await asyncio.get_running_loop().run_in_executor(
+                None, handler, data, session)
+        except json.JSONDecodeError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        except RequestError as e:
+            return e.status, {'error': str(e)}
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Error handling %s %s.", method, path)
+            return 500, {'error': "Internal server error."}
+
+    def list_commands(self, _data, _session):
+        """List the commands that can be run."""
+        return {'commands': [name for name in self.command_handler.get_registered_commands()
+                             if name not in EXCLUDED_COMMANDS]}
+
+    def run_command(self, name, data, session):
+        """
+        Run a registered command in the session and capture what it prints.
+
+        Raises:
+            RequestError: If the command is unknown or asks for input it was not given.
+        """
+        if name in EXCLUDED_COMMANDS or name not in self.command_handler.commands:
+            raise RequestError(404, f"Command '{name}' not found.")
+        args = data.get('args', [])
+        if not isinstance(args, list):
+            raise RequestError(400, "'args' must be a list.")
+        prompts = []
+
+        def refuse_input(prompt):
+            # Commands may catch the error, so remember that they asked
+            prompts.append(prompt)
+            raise EOFError("No input is available over HTTP.")
+
+        output = io.StringIO()
+        try:
+            with self._command_lock, activate(session), redirected_input(refuse_input), \
+                    redirect_stdout(output):
+                succeeded = self.command_handler.execute_command(name, *map(str, args))
+        except EOFError:
+            pass
+        if prompts:
+            raise RequestError(400, f"Command '{name}' needs more arguments "
+                                    f"(it asked: {prompts[0].strip()!r}).")
+        return {'ok': succeeded, 'output': output.getvalue()}
+
+    def calculate(self, data, session):
+        """Compute one operation and add it to the session's history."""
+        operation_name = parse_operation(data)
+        backend = parse_backend(data, session)
+        calculation = Calculation(parse_number(data.get('a'), backend),
+                                  parse_number(data.get('b'), backend),
+                                  OPERATIONS[operation_name], backend=backend)
+        try:
+            result = calculation.get_result()
+        except ArithmeticError as e:
+            raise RequestError(400, describe_error(e)) from None
+        session.history.add_calculation(calculation)
+        return {'result': str(result)}
+
+    def batch(self, data, _session):
+        """Compute an operation over two lists of operands."""
+        operation_name = parse_operation(data)
+        numbers_one, numbers_two = data.get('a'), data.get('b')
+        if not isinstance(numbers_one, list) or not isinstance(numbers_two, list):
+            raise RequestError(400, "'a' and 'b' must be lists of numbers.")
+        if len(numbers_one) != len(numbers_two):
+            raise RequestError(400, "'a' and 'b' must have the same length.")
+        # Imported here because NumPy is only needed for batches
+        from app.calculator.batch import to_decimal_array  # pylint: disable=import-outside-toplevel
+        result = Calculator.batch(operation_name,
+                                  to_decimal_array(map(parse_number, numbers_one)),
+                                  to_decimal_array(map(parse_number, numbers_two)))
+        return {'values': [None if value is None else str(value) for value in result.values],
+                'errors': result.errors.tolist()}
+
+    def get_history(self, _data, session):
+        """List the session's calculations."""
+        return {'history': [{
+            'operation': calculation.operation_func.__name__,
+            'a': str(calculation.number_one),
+            'b': str(calculation.number_two),
+            'result': str(calculation.get_result()),
+        } for calculation in session.history.snapshot()]}
+
+    def clear_history(self, _data, session):
+        """Clear the session's calculations."""
+        session.history.clear_history()
+        return {'cleared': True}
@@ -0,0 +1,269 @@
+"""
+This module manages user sessions and their calculation histories.
+
+A `Session` owns a `SessionHistory`, so every user or connection hosted by the process
+gets its own, bounded history. The `SessionManager` creates sessions on demand, applies
+the same quotas to all of them and removes the ones that have been idle for too long,
+either when `reap_idle` is called or from a background reaper thread.
+
+Commands do not receive the session as an argument. Instead, the caller activates it
+with `activate(session)` around the command, and the command asks for
+`current_history()`. Outside any session (the interactive REPL, scripts) that is the
+process-wide `CalculationsHistory`. The active session is kept in a context variable,
+so it follows the command into coroutines and into `CommandHandler`'s thread pool.
+In the same way, `current_backend()` returns the numeric backend commands compute
+with: the session's own, if one was chosen, or else the process-wide default, and
+`current_variables()` returns the session's variables (or the process-wide ones).
+
+Settings (environment variables):
+- `SESSION_MAX_ENTRIES`: Calculations kept per session (default: HISTORY_MAX_ENTRIES).
+- `SESSION_MAX_BYTES`: Estimated bytes kept per session (default 0, meaning no limit).
+- `SESSION_IDLE_TIMEOUT`: Seconds after which an idle session is removed (default 900).
+"""
+
+from contextlib import contextmanager
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from app.calculator.backends import default_backend
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.session_history import SessionHistory
+from app.calculator.variables import VariableGraph
+
+DEFAULT_IDLE_TIMEOUT = 900
+
+_current_session = contextvars.ContextVar('current_session', default=None)
+# The variables of the REPL and scripts, which run outside any session
+_process_variables = VariableGraph()
+
+
+class Session:
+    """
+    One user's state.
+
+    Attributes:
+        session_id (str): The session id.
+        history (SessionHistory): The session's calculations.
+        backend (NumericBackend): The session's numeric backend, or None for the
+            process-wide default.
+        variables (VariableGraph): The session's variables.
+        last_active (float): `time.monotonic()` of the last use.
+    """
+
+    def __init__(self, session_id, history, backend=None):
+        self.session_id = session_id
+        self.history = history
+        self.backend = backend
+        self.variables = VariableGraph()
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        """
+        Mark the session as used now.
+        """
+        self.last_active = time.monotonic()
+
+
+class SessionManager:
+    """
+    Creates, finds and expires sessions.
+
+    Attributes:
+        max_entries (int): Calculations kept per session.
+        max_bytes (int): Estimated bytes kept per session, or None for no limit.
+        idle_timeout (float): Seconds after which an idle session is removed.
+        reaped_count (int): Number of sessions removed for being idle.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, idle_timeout=None):
+        """
+        Initialize the manager. Settings that are not given come from the environment.
+
+        Args:
+            max_entries (int): Calculations kept per session.
+            max_bytes (int): Estimated bytes kept per session.
+            idle_timeout (float): Seconds after which an idle session is removed.
+        """
+        self.max_entries = max_entries or int(os.getenv(
+            "SESSION_MAX_ENTRIES", os.getenv("HISTORY_MAX_ENTRIES", "10000")))
+        self.max_bytes = max_bytes or int(os.getenv("SESSION_MAX_BYTES", "0")) or None
+        self.idle_timeout = idle_timeout or float(os.getenv(
+            "SESSION_IDLE_TIMEOUT", str(DEFAULT_IDLE_TIMEOUT)))
+        self.reaped_count = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._session_ids = itertools.count(1)
+        self._reaper = None
+        self._stop_reaper = threading.Event()
+
+    def get(self, session_id=None):
+        """
+        Return the session with the given id, creating it if needed, and mark it used.
+
+        Args:
+            session_id (str): The session id, or None for a new session.
+
+        Returns:
+            Session: The session.
+        """
+        with self._lock:
+            if session_id is None:
+                session_id = f"session-{next(self._session_ids)}"
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(
+                    session_id, SessionHistory(self.max_entries, self.max_bytes))
+            session.touch()
+            return session
+
+    def close(self, session_id):
+        """
+        Remove a session.
+
+        Args:
+            session_id (str): The session id.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def reap_idle(self, now=None):
+        """
+        Remove the sessions that have not been used for `idle_timeout` seconds.
+
+        Args:
+            now (float): The current `time.monotonic()` (for testing).
+
+        Returns:
+            int: The number of sessions removed.
+        """
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        with self._lock:
+            idle = [session_id for session_id, session in self._sessions.items()
+                    if session.last_active < deadline]
+            for session_id in idle:
+                del self._sessions[session_id]
+            self.reaped_count += len(idle)
+        if idle:
+            logging.info("Removed %s idle sessions.", len(idle))
+        return len(idle)
+
+    def start_reaper(self, interval=None):
+        """
+        Start a daemon thread that removes idle sessions periodically.
+
+        Args:
+            interval (float): Seconds between checks (default: a tenth of the timeout).
+        """
+        if self._reaper is not None:
+            return
+        interval = interval or self.idle_timeout / 10
+        self._stop_reaper.clear()
+
+        def reap_periodically():
+            while not self._stop_reaper.wait(interval):
+                self.reap_idle()
+
+        self._reaper = threading.Thread(target=reap_periodically, name='session-reaper',
+                                        daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        """
+        Stop the reaper thread, if it is running.
+        """
+        if self._reaper is not None:
+            self._stop_reaper.set()
+            self._reaper.join()
+            self._reaper = None
+
+    def stats(self):
+        """
+        Report the number of sessions and the memory their histories hold.
+
+        Returns:
+            dict: 'sessions', 'entries', 'bytes' and 'reaped' counts.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            'sessions': len(sessions),
+            'entries': sum(len(session.history) for session in sessions),
+            'bytes': sum(session.history.bytes_used for session in sessions),
+            'reaped': self.reaped_count,
+        }
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+
+@contextmanager
+def activate(session):
+    """
+    Make `session` the current session for the code run inside the block.
+
+    Args:
+        session (Session): The session, or None for the process-wide history.
+    """
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def current_session():
+    """
+    Return the active session.
+
+    Returns:
+        Session: The session activated by the caller, or None.
+    """
+    return _current_session.get()
+
+
+def current_history():
+    """
+    Return the calculation history commands should use.
+
+    Returns:
+        SessionHistory: The active session's history, or the process-wide one
+        (`CalculationsHistory.default`) when no session is active.
+    """
+    session = _current_session.get()
+    return CalculationsHistory.default if session is None else session.history
+
+
+def current_backend():
+    """
+    Return the numeric backend commands should compute with.
+
+    Returns:
+        NumericBackend: The active session's backend, or the process-wide default
+        (see `app.calculator.backends.default_backend`) when no session is active or
+        the session has none.
+    """
+    session = _current_session.get()
+    if session is None or session.backend is None:
+        return default_backend()
+    return session.backend
+
+
+def current_variables():
+    """
+    Return the variables commands should read and define.
+
+    Returns:
+        VariableGraph: The active session's variables, or the process-wide ones when
+        no session is active.
+    """
+    session = _current_session.get()
+    return _process_variables if session is None else session.variables
@@ -0,0 +1,97 @@
+"""
+This module measures how long the app takes to start, phase by phase.
+
+`profile_startup` runs the same steps as `App.run` up to the first prompt, timing each
+one, and then resolves every lazily registered plugin command to time its import and
+initialization. The resulting `StartupReport` can be printed as a table, which makes
+cold-start latency easy to compare across releases:
+
+    python main.py --startup-report
+"""
+
+from contextlib import contextmanager
+import time
+from app import App
+from app.commands import LazyCommand
+
+
+class StartupReport:
+    """
+    Timings collected while starting the app.
+
+    Attributes:
+        phases (list): (phase name, seconds) in the order the phases ran.
+        plugins (list): (command name, seconds) to import and initialize each plugin.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.plugins = []
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a startup phase.
+
+        Args:
+            name (str): The phase name shown in the report.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def total(self):
+        """
+        Return the total time of all phases and plugins, in seconds.
+
+        Returns:
+            float: The sum of all timings.
+        """
+        return sum(seconds for _, seconds in self.phases + self.plugins)
+
+    def format(self):
+        """
+        Format the report as a text table with timings in milliseconds.
+
+        Returns:
+            str: The report.
+        """
+        lines = ["Startup report (ms)", "Phases:"]
+        lines += [f"  {name:<32}{seconds * 1000:>10.3f}" for name, seconds in self.phases]
+        lines.append("Plugins (import + init):")
+        lines += [f"  {name:<32}{seconds * 1000:>10.3f}" for name, seconds in self.plugins]
+        lines.append(f"  {'total':<32}{self.total() * 1000:>10.3f}")
+        return "\n".join(lines)
+
+
+def profile_startup(import_seconds=None):
+    """
+    Start an app, timing every startup phase and every plugin import.
+
+    Args:
+        import_seconds (float): Time it took to import the `app` package, if the caller
+            measured it; it is reported as the first phase.
+
+    Returns:
+        StartupReport: The collected timings.
+    """
+    report = StartupReport()
+    if import_seconds is not None:
+        report.phases.append(("import app", import_seconds))
+    with report.phase("bootstrap (.env, logging)"):
+        App.bootstrap()
+    with report.phase("create App"):
+        app = App()
+    with report.phase("register commands"):
+        app.register_commands()
+    with report.phase("restore history"):
+        app.restore_history()
+
+    for name, command in app.command_handler.commands.items():
+        if isinstance(command, LazyCommand):
+            started = time.perf_counter()
+            command.resolve()
+            report.plugins.append((name, time.perf_counter() - started))
+    return report
@@ -0,0 +1,14 @@
+"""
+Microbenchmarks for the calculator's hot paths.
+
+Run the whole suite with:
+
+    python -m benchmarks --num_records 1000 10000 --output bench.json
+
+The workload is the random arithmetic data used by the test suite (see
+`tests.conftest.generate_test_data`), run with int, float, Decimal and Fraction
+operands; `backend_parse_calculate` compares the numeric backends of those types.
+Results are written as JSON (nanoseconds per operation). Passing `--baseline FILE`
+compares them with a saved run and exits with status 1 if any benchmark got slower
+than the allowed `--threshold`.
+"""
@@ -0,0 +1,56 @@
+"""
+Command-line entry point of the benchmark suite: `python -m benchmarks --help`.
+"""
+
+import argparse
+import sys
+from benchmarks.hot_paths import BENCHMARKS
+from benchmarks.runner import DEFAULT_SEED, compare, load_results, run_suite, save_results
+
+
+def parse_args(argv=None):
+    """Parse the command-line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark the calculator's hot paths.")
+    parser.add_argument("--num_records", type=int, nargs="+", default=[1000, 10000],
+                        help="workload sizes, in generated records (default: 1000 10000)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per benchmark; the fastest is kept (default: 5)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"seed of the generated workloads (default: {DEFAULT_SEED})")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="compare with the results in FILE and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown against the baseline (default: 0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the suite, print the results and check them against the baseline."""
+    args = parse_args(argv)
+    results = run_suite(args.num_records, args.repeat, args.only, args.seed)
+    for name, nanoseconds in results.items():
+        print(f"{name:<48}{nanoseconds:>12.1f} ns/op")
+    if args.output:
+        save_results(args.output, results, args.seed)
+
+    if args.baseline:
+        baseline, baseline_seed = load_results(args.baseline)
+        if baseline_seed != args.seed:
+            print(f"Warning: {args.baseline} was measured with seed {baseline_seed}, "
+                  f"this run used {args.seed}; the workloads differ.")
+        regressions = compare(results, baseline, args.threshold)
+        for name, (before, after) in regressions.items():
+            print(f"REGRESSION {name}: {before:.1f} -> {after:.1f} ns/op "
+                  f"(+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
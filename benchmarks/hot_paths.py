@@ -0,0 +1,113 @@
+"""
+Benchmark definitions for the hot paths of the calculator.
+
+Each benchmark takes the prepared operand records and returns a function that runs
+the measured code once for every record.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+from app.calculator.backends import get_backend
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.operations import OPERATIONS
+from app.commands import Command, CommandHandler
+
+OPERAND_TYPES = {
+    'int': int,
+    'float': float,
+    'Decimal': Decimal,
+    'Fraction': Fraction,
+}
+
+# The numeric backend that computes with each operand type
+BACKENDS_BY_TYPE = {
+    int: 'int',
+    float: 'float',
+    Decimal: 'decimal',
+    Fraction: 'fraction',
+}
+
+
+class OperationCommand(Command):
+    """Command that applies the named operation to its two arguments."""
+
+    def execute(self, *args):
+        operation_name, number_one, number_two = args
+        return OPERATIONS[operation_name](number_one, number_two) is not None
+
+
+def prepare_records(test_data, operand_type):
+    """
+    Convert generated test data into (operation function, name, a, b) records.
+
+    Args:
+        test_data (list): Records from `tests.conftest.generate_test_data`.
+        operand_type (type): The type to convert the operands to.
+
+    Returns:
+        list: The prepared records.
+    """
+    return [(OPERATIONS[operation], operation, operand_type(first_num), operand_type(second_num))
+            for first_num, second_num, operation, _ in test_data]
+
+
+def bench_operations(records):
+    """Call the operation functions of the Operations module directly."""
+    def run():
+        for operation_func, _, number_one, number_two in records:
+            operation_func(number_one, number_two)
+    return run
+
+
+def bench_calculation(records):
+    """Create a Calculation and read its result."""
+    def run():
+        for operation_func, _, number_one, number_two in records:
+            Calculation(number_one, number_two, operation_func).get_result()
+    return run
+
+
+def bench_backend(records):
+    """Parse the operands with the backend of their type and compute through it."""
+    backend = get_backend(BACKENDS_BY_TYPE[type(records[0][2])])
+    texts = [(operation_func, str(number_one), str(number_two))
+             for operation_func, _, number_one, number_two in records]
+
+    def run():
+        for operation_func, text_one, text_two in texts:
+            Calculation(backend.parse(text_one), backend.parse(text_two), operation_func,
+                        backend=backend).get_result()
+    return run
+
+
+def bench_history_add(records):
+    """Add calculations to a history sized to hold all of them."""
+    calculations = [Calculation(number_one, number_two, operation_func)
+                    for operation_func, _, number_one, number_two in records]
+
+    def run():
+        CalculationsHistory.configure(max_entries=len(calculations))
+        for calculation in calculations:
+            CalculationsHistory.add_calculation(calculation)
+    return run
+
+
+def bench_command_dispatch(records):
+    """Dispatch a command through CommandHandler.execute_command."""
+    handler = CommandHandler()
+    handler.register_command('operation', OperationCommand())
+
+    def run():
+        for _, operation_name, number_one, number_two in records:
+            handler.execute_command('operation', operation_name, number_one, number_two)
+    return run
+
+
+BENCHMARKS = {
+    'operations': bench_operations,
+    'calculation_get_result': bench_calculation,
+    'backend_parse_calculate': bench_backend,
+    'history_add_calculation': bench_history_add,
+    'command_dispatch': bench_command_dispatch,
+}
@@ -0,0 +1,120 @@
+"""
+Memory footprint of the calculation history.
+
+Measures, with tracemalloc, the bytes per entry of a list of evaluated Calculation
+objects (how the history used to keep calculations), of a `ColumnarBuffer` alone and
+of a `SessionHistory` (the columnar storage plus its indexes), on the seeded
+benchmark workload.
+Run with `python -m benchmarks.memory --help`.
+"""
+
+import argparse
+from decimal import Decimal
+import sys
+import tracemalloc
+from app.calculator.calculations import Calculation
+from app.calculator.columnar_buffer import ColumnarBuffer
+from app.calculator.operations import OPERATIONS
+from app.calculator.session_history import SessionHistory
+from benchmarks.runner import DEFAULT_SEED, seeded_test_data
+
+
+def workload(entries, seed=DEFAULT_SEED):
+    """
+    Return (operation function, a, b) tuples with the operands as strings.
+
+    The operands are parsed inside the measured code, as they would be when read
+    from the user, so each calculation owns its operands.
+
+    Args:
+        entries (int): Number of calculations.
+        seed (int): Seed of the workload.
+
+    Returns:
+        list: The calculation arguments.
+    """
+    return [(OPERATIONS[operation], str(first_num), str(second_num))
+            for first_num, second_num, operation, _ in seeded_test_data(entries, seed)]
+
+
+def traced_bytes(build):
+    """
+    Return the memory still allocated by `build()` when it returns.
+
+    Args:
+        build (Callable[[], object]): Builds and returns the measured structure.
+
+    Returns:
+        int: Allocated bytes.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return allocated
+
+
+def measure(entries, seed=DEFAULT_SEED):
+    """
+    Measure the bytes per entry of both history representations.
+
+    Args:
+        entries (int): Number of calculations kept.
+        seed (int): Seed of the workload.
+
+    Returns:
+        dict: Bytes per entry for 'objects', 'columnar' and 'history'.
+    """
+    arguments = workload(entries, seed)
+
+    def build_objects():
+        calculations = [Calculation(Decimal(number_one), Decimal(number_two), operation_func)
+                        for operation_func, number_one, number_two in arguments]
+        for calculation in calculations:
+            try:
+                calculation.get_result()
+            except ArithmeticError:
+                pass
+        return calculations
+
+    def build_columnar():
+        buffer = ColumnarBuffer(entries)
+        for operation_func, number_one, number_two in arguments:
+            buffer.append(Calculation(Decimal(number_one), Decimal(number_two), operation_func))
+        return buffer
+
+    def build_history():
+        history = SessionHistory(max_entries=entries)
+        for operation_func, number_one, number_two in arguments:
+            history.add_calculation(Calculation(Decimal(number_one), Decimal(number_two),
+                                                operation_func))
+        return history
+
+    return {'objects': traced_bytes(build_objects) / entries,
+            'columnar': traced_bytes(build_columnar) / entries,
+            'history': traced_bytes(build_history) / entries}
+
+
+def main(argv=None):
+    """Print the bytes per history entry of both representations."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory",
+                                     description="Measure the memory per history entry.")
+    parser.add_argument("--entries", type=int, default=100000,
+                        help="calculations kept (default: 100000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"seed of the workload (default: {DEFAULT_SEED})")
+    args = parser.parse_args(argv)
+    result = measure(args.entries, args.seed)
+    print(f"Calculation objects: {result['objects']:.0f} bytes per entry")
+    for name, label in (('columnar', "Columnar buffer:    "), ('history', "Indexed history:    ")):
+        print(f"{label} {result[name]:.0f} bytes per entry "
+              f"({result['objects'] / result[name]:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
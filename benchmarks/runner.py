@@ -0,0 +1,131 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+
+import json
+import platform
+import random
+import time
+from benchmarks.hot_paths import BENCHMARKS, OPERAND_TYPES, prepare_records
+from tests.conftest import generate_test_data
+
+# Seed of the generated workloads, so that runs (and baselines) time the same operands
+DEFAULT_SEED = 12345
+
+
+def time_per_operation(run, num_records, repeat):
+    """
+    Time a benchmark function and return the best time per record.
+
+    Args:
+        run (Callable): Runs the measured code once per record.
+        num_records (int): Number of records `run` processes.
+        repeat (int): Number of timed runs; the fastest one is kept.
+
+    Returns:
+        float: Nanoseconds per record.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        run()
+        best = min(best, time.perf_counter_ns() - started)
+    return best / num_records
+
+
+def seeded_test_data(num_records, seed):
+    """
+    Generate a reproducible workload without disturbing the global random state.
+
+    Args:
+        num_records (int): The number of records to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list: The records from `tests.conftest.generate_test_data`.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return generate_test_data(num_records)
+    finally:
+        random.setstate(state)
+
+
+def run_suite(sizes, repeat=5, selected=None, seed=DEFAULT_SEED):
+    """
+    Run every benchmark for every operand type and workload size.
+
+    Args:
+        sizes (list): Numbers of records to generate, one workload per size.
+        repeat (int): Timed runs per benchmark.
+        selected (list): Names of the benchmarks to run (default: all).
+        seed (int): Seed of the generated workloads.
+
+    Returns:
+        dict: Nanoseconds per operation keyed by 'benchmark[type-size]'.
+    """
+    results = {}
+    for size in sizes:
+        test_data = seeded_test_data(size, seed)
+        for type_name, operand_type in OPERAND_TYPES.items():
+            records = prepare_records(test_data, operand_type)
+            for name, benchmark in BENCHMARKS.items():
+                if selected and name not in selected:
+                    continue
+                results[f"{name}[{type_name}-{size}]"] = time_per_operation(
+                    benchmark(records), size, repeat)
+    return results
+
+
+def save_results(path, results, seed=DEFAULT_SEED):
+    """
+    Write benchmark results to a JSON file.
+
+    Args:
+        path (str): The output file.
+        results (dict): The results from `run_suite`.
+        seed (int): The workload seed the results were measured with.
+    """
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump({
+            'python': platform.python_version(),
+            'seed': seed,
+            'unit': 'ns/op',
+            'results': results,
+        }, output, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    Read benchmark results written by `save_results`.
+
+    Args:
+        path (str): The results file.
+
+    Returns:
+        tuple: The results keyed by benchmark, and the workload seed (None for
+        files written before seeds were recorded).
+    """
+    with open(path, encoding='utf-8') as results_file:
+        data = json.load(results_file)
+    return data['results'], data.get('seed')
+
+
+def compare(results, baseline, threshold):
+    """
+    Find the benchmarks that got slower than the baseline by more than the threshold.
+
+    Benchmarks missing from either side are ignored.
+
+    Args:
+        results (dict): The current results.
+        baseline (dict): The baseline results.
+        threshold (float): Allowed slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        dict: (baseline, current) nanoseconds per op for each regressed benchmark.
+    """
+    return {name: (baseline[name], current)
+            for name, current in results.items()
+            if name in baseline and current > baseline[name] * (1 + threshold)}
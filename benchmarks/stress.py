@@ -0,0 +1,194 @@
+"""
+Multi-threaded stress tests for the calculation history and the command layer.
+
+Each scenario starts many threads at once (with a very short thread switch interval,
+so they interleave as much as possible), then checks invariants that break when
+shared state is corrupted: no calculation lost or duplicated, per-thread order kept,
+counters consistent. Run with `python -m benchmarks.stress --help`.
+"""
+
+import argparse
+from contextlib import contextmanager, redirect_stdout
+from decimal import Decimal
+import io
+import sys
+import threading
+import time
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.operations import add
+from app.commands import CommandHandler
+from app.plugins.calculator import CalculatorCommand
+
+
+@contextmanager
+def frequent_switches(interval=1e-6):
+    """Make the interpreter switch threads as often as possible."""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(interval)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(previous)
+
+
+def run_threads(thread_count, work):
+    """
+    Run `work(thread_index)` on several threads released at the same moment.
+
+    Args:
+        thread_count (int): Number of threads.
+        work (Callable[[int], None]): The work of one thread.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    barrier = threading.Barrier(thread_count)
+    errors = []
+
+    def target(thread_index):
+        barrier.wait()
+        try:
+            work(thread_index)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(index,)) for index in range(thread_count)]
+    started = time.perf_counter()
+    with frequent_switches():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - started
+
+
+def check_history(thread_count, per_thread, capacity):
+    """
+    Compare the history left by a stress run with what the threads added.
+
+    Returns:
+        list: Descriptions of the violated invariants (empty if none).
+    """
+    problems = []
+    history = CalculationsHistory.snapshot()
+    stats = CalculationsHistory.get_eviction_stats()
+    total = thread_count * per_thread
+    if len(history) != min(total, capacity):
+        problems.append(f"history holds {len(history)} calculations, "
+                        f"expected {min(total, capacity)}")
+    if stats['evicted'] != total - len(history):
+        problems.append(f"evicted count is {stats['evicted']}, expected {total - len(history)}")
+    last_seen = {}
+    for calculation in history:
+        thread_index, sequence = int(calculation.number_one), int(calculation.number_two)
+        if sequence <= last_seen.get(thread_index, -1):
+            problems.append(f"thread {thread_index}: entry {sequence} is out of order "
+                            "or duplicated")
+        last_seen[thread_index] = sequence
+    if capacity >= total and len(last_seen) != thread_count:
+        problems.append(f"only {len(last_seen)} of {thread_count} threads are in the history")
+    return problems
+
+
+def stress_history(thread_count=8, per_thread=5000, capacity=None):
+    """
+    Add calculations to the history from many threads at once.
+
+    Thread t adds Calculation(t, 0), Calculation(t, 1), ... so the history can be
+    checked for lost, duplicated and reordered entries.
+
+    Args:
+        thread_count (int): Number of threads.
+        per_thread (int): Calculations added by each thread.
+        capacity (int): History capacity (default: room for every calculation).
+
+    Returns:
+        tuple: The list of problems found and the elapsed seconds.
+    """
+    capacity = capacity or thread_count * per_thread
+    CalculationsHistory.configure(max_entries=capacity)
+
+    def work(thread_index):
+        for sequence in range(per_thread):
+            CalculationsHistory.add_calculation(Calculation(thread_index, sequence, add))
+            if sequence % 97 == 0:
+                CalculationsHistory.snapshot()
+
+    elapsed = run_threads(thread_count, work)
+    return check_history(thread_count, per_thread, capacity), elapsed
+
+
+def stress_calculator_command(thread_count=8, per_thread=500):
+    """
+    Execute the calculator command from many threads through one CommandHandler.
+
+    Returns:
+        tuple: The list of problems found and the elapsed seconds.
+    """
+    CalculationsHistory.configure(max_entries=thread_count * per_thread)
+    handler = CommandHandler()
+    handler.register_command('calculator', CalculatorCommand())
+    failures = []
+
+    def work(thread_index):
+        for sequence in range(per_thread):
+            if not handler.execute_command(f'calculator add {thread_index} {sequence}'):
+                failures.append((thread_index, sequence))
+
+    with redirect_stdout(io.StringIO()):
+        elapsed = run_threads(thread_count, work)
+
+    problems = check_history(thread_count, per_thread, thread_count * per_thread)
+    if failures:
+        problems.append(f"{len(failures)} commands failed")
+    for calculation in CalculationsHistory.snapshot():
+        if calculation.get_result() != calculation.number_one + calculation.number_two:
+            problems.append(f"wrong result for {calculation.number_one} add "
+                            f"{calculation.number_two}: {calculation.get_result()}")
+            break
+        if not isinstance(calculation.number_one, Decimal):
+            problems.append("operands were not parsed as Decimal")
+            break
+    calls = handler.stats.snapshot()['calculator']['calls']
+    if calls != thread_count * per_thread:
+        problems.append(f"stats recorded {calls} calls, expected {thread_count * per_thread}")
+    return problems, elapsed
+
+
+SCENARIOS = {
+    'history': stress_history,
+    'calculator': stress_calculator_command,
+}
+
+
+def main(argv=None):
+    """Run the stress scenarios and report any violated invariant."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stress",
+                                     description="Stress the history and commands with threads.")
+    parser.add_argument("--threads", type=int, default=16, help="number of threads (default: 16)")
+    parser.add_argument("--per-thread", type=int, default=2000,
+                        help="operations per thread (default: 2000)")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS),
+                        help="run only these scenarios")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, scenario in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        problems, elapsed = scenario(args.threads, args.per_thread)
+        operations = args.threads * args.per_thread
+        print(f"{name}: {operations} operations on {args.threads} threads in {elapsed:.2f} s "
+              f"({operations / elapsed:,.0f} ops/s)")
+        for problem in problems:
+            print(f"  FAILED: {problem}")
+        failed = failed or bool(problems)
+    CalculationsHistory.configure()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,87 @@ This script initializes and runs the main application by creating an instance of
 and invoking its `run` method. 
 The `App` class is responsible for loading plugins, handling commands, 
 and managing the application's core logic.
+
+Usage:
+    python main.py                  # Interactive REPL
+    python main.py --script FILE    # Replay the commands in FILE without prompts
+    python main.py < FILE           # Same as --script when stdin is not a terminal
+    python main.py --async          # Asyncio REPL; slow commands run in the background
+    python main.py --startup-report # Print how long each startup phase and plugin takes
+    python main.py --stats-file FILE # Write per-command latency statistics to FILE on exit
+    python main.py --serve HOST:PORT # Serve the commands and calculator over HTTP/JSON
 """
-from app import App
+import argparse
+import asyncio
+import sys
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+from app import App  # pylint: disable=wrong-import-position
+APP_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+# Size of the buffer used for script output, so results are not flushed line by line
+SCRIPT_OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def parse_address(text):
+    """Parse a HOST:PORT address for --serve."""
+    host, _, port = text.rpartition(":")
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got '{text}'")
+    return host, int(port)
+
+
+def parse_args(argv=None):
+    """Parse the command-line arguments."""
+    parser = argparse.ArgumentParser(description="Command-line calculator application.")
+    parser.add_argument("--script", metavar="FILE",
+                        help="execute the commands in FILE without prompting")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run the asyncio REPL, where commands can run concurrently")
+    parser.add_argument("--serve", metavar="HOST:PORT", type=parse_address,
+                        help="serve the commands and the calculator over HTTP/JSON")
+    parser.add_argument("--stats-file", metavar="FILE",
+                        help="write per-command latency statistics to FILE as JSON on exit")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print a breakdown of startup time per phase and plugin, then exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the REPL, or replay a script when one is given or stdin is not a terminal."""
+    args = parse_args(argv)
+    if args.startup_report:
+        # Imported here so that normal runs do not pay for it
+        from app.startup_report import profile_startup  # pylint: disable=import-outside-toplevel
+        print(profile_startup(APP_IMPORT_SECONDS).format())
+        return 0
+
+    app = App()
+    if args.stats_file:
+        app.dump_stats_on_exit(args.stats_file)
+    if args.serve:
+        try:
+            asyncio.run(app.serve(*args.serve))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.script is None and sys.stdin.isatty():
+        if args.use_async:
+            asyncio.run(app.run_async())
+        else:
+            app.run()
+        return 0
+
+    with open(sys.stdout.fileno(), "w", buffering=SCRIPT_OUTPUT_BUFFER_SIZE,
+              encoding=sys.stdout.encoding, closefd=False) as output:
+        if args.script is None:
+            _, failed = app.run_script(sys.stdin, output)
+        else:
+            with open(args.script, encoding="utf-8") as script:
+                _, failed = app.run_script(script, output)
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    App().run()  # Run the app without assigning the return since it's not needed.
+    sys.exit(main())
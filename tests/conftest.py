@@ -6,6 +6,7 @@ test cases based on command-line arguments, such as the number of records to gen
 import random
 import pytest
 from app import App
+from app.calculator.calculation_history import CalculationsHistory
 
 # Add a pytest command-line option for generating records
 def pytest_addoption(parser):
@@ -17,6 +18,21 @@ def pytest_addoption(parser):
     )
 
 
+@pytest.fixture(autouse=True)
+def isolated_app_files(monkeypatch, tmp_path):
+    """
+    Keep the history log and plugin manifest of every test in its own temporary
+    directory, so tests neither write to nor restore from the files under 'logs/',
+    and share no history between test runs.
+    """
+    monkeypatch.setenv("HISTORY_LOG_FILE", str(tmp_path / "history.wal"))
+    monkeypatch.setenv("PLUGIN_MANIFEST_FILE", str(tmp_path / "plugin_manifest.json"))
+    monkeypatch.delenv("HISTORY_SHARED_FILE", raising=False)
+    yield
+    CalculationsHistory.detach_log()
+    CalculationsHistory.detach_shared()
+
+
 @pytest.fixture
 def run_app_with_input():
     """
@@ -58,6 +74,46 @@ def run_app_with_input():
 
 
 
+def generate_test_data(num_records):
+    """
+    Generates random arithmetic records.
+
+    Each record holds two random numbers between 1 and 100, a random operation
+    ('add', 'subtract', 'multiply' or 'divide') and the expected result. The same
+    workload is reused by the benchmark suite in `benchmarks/`.
+
+    Args:
+        num_records (int): The number of records to generate.
+
+    Returns:
+        list: (first_num, second_num, operation, expected_result) tuples.
+    """
+    operations = ['add', 'subtract', 'multiply', 'divide']
+    test_data = []
+
+    for _ in range(num_records):
+        first_num = random.randint(1, 100)
+        second_num = random.randint(1, 100)
+        operation = random.choice(operations)
+
+        expected_result = None
+
+        if operation == 'add':
+            expected_result = first_num + second_num
+        elif operation == 'subtract':
+            expected_result = first_num - second_num
+        elif operation == 'multiply':
+            expected_result = first_num * second_num
+        elif operation == 'divide':
+            second_num = second_num if second_num != 0 else 1  # Avoid division by zero
+            expected_result = first_num / second_num
+
+        # Add the generated data to the test cases
+        test_data.append((first_num, second_num, operation, expected_result))
+
+    return test_data
+
+
 def pytest_generate_tests(metafunc):
     """
     Dynamically generates test cases based on the --num_records argument.
@@ -75,28 +131,7 @@ def pytest_generate_tests(metafunc):
     # Only parametrize if all required parameters are in the test function
     if "first_num" in metafunc.fixturenames and "second_num" in metafunc.fixturenames and \
        "operation" in metafunc.fixturenames and "expected_result" in metafunc.fixturenames:
-        operations = ['add', 'subtract', 'multiply', 'divide']
-        test_data = []
-
-        for _ in range(num_records):
-            first_num = random.randint(1, 100)
-            second_num = random.randint(1, 100)
-            operation = random.choice(operations)
-
-            expected_result = None
-
-            if operation == 'add':
-                expected_result = first_num + second_num
-            elif operation == 'subtract':
-                expected_result = first_num - second_num
-            elif operation == 'multiply':
-                expected_result = first_num * second_num
-            elif operation == 'divide':
-                second_num = second_num if second_num != 0 else 1  # Avoid division by zero
-                expected_result = first_num / second_num
-
-            # Add the generated data to the test cases
-            test_data.append((first_num, second_num, operation, expected_result))
+        test_data = generate_test_data(num_records)
 
         # Parametrize the test function with the generated test data
         metafunc.parametrize("first_num, second_num, operation, expected_result", test_data)
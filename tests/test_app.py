@@ -47,7 +47,7 @@ def test_app_menu_command(capfd, monkeypatch, run_app_with_input):
     """Test the 'menu' command to verify it displays the available commands."""
     inputs = iter(['menu', 'exit'])  # Simulate user entering 'menu', followed by 'exit'
     captured = run_app_with_input(monkeypatch, capfd, inputs)
-    assert ("Available commands:\n - menu\n - calculator\n"
+    assert ("Available commands:\n - menu\n - backend\n - calculator\n - evaluate\n"
             " - exit\n - goodbye\n - greet\n" in captured.out)
 
 # Test the 'greet' command
@@ -0,0 +1,66 @@
+"""
+This test suite verifies the non-interactive script mode of the app.
+
+Scripts are fed to `App.run_script` as a list of lines and the output is captured in a
+StringIO buffer, so no prompts or user input are involved.
+"""
+
+import io
+from app import App
+from app.calculator.calculation_history import CalculationsHistory
+
+
+def run_script(lines):
+    """Run the given script lines and return the output and the summary counts."""
+    output = io.StringIO()
+    succeeded, failed = App().run_script(lines, output)
+    return output.getvalue(), succeeded, failed
+
+
+def test_script_runs_commands_without_prompts():
+    """Test that commands and calculator answers are read from the script."""
+    CalculationsHistory.clear_history()
+    out, succeeded, failed = run_script(['greet', 'calculator', 'add', '5', '10'])
+    assert "Hello, World!\n" in out
+    assert "The result of 5 add 10 is: 15\n" in out
+    assert "Enter" not in out
+    assert (succeeded, failed) == (2, 0)
+
+
+def test_script_skips_comments_and_blank_lines():
+    """Test that blank lines and '#' comments are ignored."""
+    _, succeeded, failed = run_script(['# say hello', '', 'greet\n'])
+    assert (succeeded, failed) == (1, 0)
+
+
+def test_script_counts_failures():
+    """Test that unknown commands and failed calculations are counted as failures."""
+    out, succeeded, failed = run_script(
+        ['unknown_command', 'calculator', 'divide', '1', '0', 'greet'])
+    assert "Command 'unknown_command' not found." in out
+    assert "Error: Division by zero is not allowed.\n" in out
+    assert (succeeded, failed) == (1, 2)
+    assert out.endswith("Script finished: 1 succeeded, 2 failed.\n")
+
+
+def test_script_stops_at_exit():
+    """Test that the 'exit' command ends the script."""
+    out, succeeded, failed = run_script(['exit', 'greet'])
+    assert "Hello, World!" not in out
+    assert (succeeded, failed) == (1, 0)
+
+
+def test_script_ending_mid_command():
+    """Test that a script ending while a command waits for input is a failure."""
+    _, succeeded, failed = run_script(['calculator', 'add', '5'])
+    assert (succeeded, failed) == (0, 1)
+
+
+def test_script_history_is_persisted():
+    """Test that the calculations of a script are in the history log when it returns."""
+    run_script(['calculator', 'add', '2', '3', 'exit'])
+    assert CalculationsHistory.log is None
+    CalculationsHistory.clear_history()
+    out, _, _ = run_script(['calculator', 'add', '1', '1'])
+    assert "The result of 1 add 1 is: 2" in out
+    assert len(CalculationsHistory.get_history()) == 2
@@ -0,0 +1,103 @@
+"""
+This test suite verifies asynchronous command execution and the asyncio-based REPL.
+
+Synchronous commands are offloaded to the handler's thread pool, `AsyncCommand`
+coroutines are awaited on the event loop, and the asyncio REPL hands typed lines
+either to a new command or to a running command that is waiting for input.
+"""
+
+import asyncio
+import os
+import pty
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import app as app_module
+from app import App
+from app.commands import AsyncCommand, Command, CommandHandler
+
+
+class SleepCommand(AsyncCommand):
+    """Async command that sleeps and then records that it finished."""
+    def __init__(self):
+        self.finished = 0
+
+    async def execute(self, *args):
+        await asyncio.sleep(0.2)
+        self.finished += 1
+
+
+class ThreadNameCommand(Command):
+    """Sync command that records the thread it ran on."""
+    def __init__(self):
+        self.thread_name = None
+
+    def execute(self, *args):
+        self.thread_name = threading.current_thread().name
+
+
+def test_async_commands_run_concurrently():
+    """Test that several async commands overlap instead of running one after another."""
+    handler = CommandHandler()
+    command = SleepCommand()
+    handler.register_command('sleep', command)
+
+    async def run_three():
+        return await asyncio.gather(*(handler.execute_command_async('sleep') for _ in range(3)))
+
+    started = time.perf_counter()
+    assert asyncio.run(run_three()) == [True, True, True]
+    assert time.perf_counter() - started < 0.5
+    assert command.finished == 3
+
+
+def test_sync_command_is_offloaded_to_thread_pool():
+    """Test that a synchronous command runs on a worker thread."""
+    handler = CommandHandler()
+    command = ThreadNameCommand()
+    handler.register_command('where', command)
+    assert asyncio.run(handler.execute_command_async('where'))
+    assert command.thread_name.startswith('command')
+
+
+def test_async_unknown_command(capfd):
+    """Test that unknown commands are reported as by the synchronous handler."""
+    assert not asyncio.run(CommandHandler().execute_command_async('missing'))
+    assert "Command 'missing' not found." in capfd.readouterr().out
+
+
+def test_sync_handler_runs_async_command():
+    """Test that execute_command runs an AsyncCommand to completion."""
+    handler = CommandHandler()
+    command = SleepCommand()
+    handler.register_command('sleep', command)
+    assert handler.execute_command('sleep')
+    assert command.finished == 1
+
+
+def test_async_repl_answers_command_prompts(monkeypatch, capfd):
+    """Test that the asyncio REPL feeds follow-up lines to the waiting command."""
+    monkeypatch.setattr(app_module, 'COMMAND_START_GRACE', 2.0)
+    inputs = iter(['calculator', 'add', '5', '10', 'greet', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    asyncio.run(App().run_async())
+    out = capfd.readouterr().out
+    assert "The result of 5 add 10 is: 15\n" in out
+    assert "Hello, World!\n" in out
+
+
+def test_async_repl_exit_ends_the_process():
+    """Test that 'exit' in the asyncio REPL of main.py ends the process."""
+    controller, terminal = pty.openpty()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        process = subprocess.Popen([sys.executable, "main.py", "--async"], cwd=root,
+                                   stdin=terminal, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        os.write(controller, b"calculator add 1 2\nexit\n")
+        assert process.wait(timeout=60) == 0
+    finally:
+        os.close(controller)
+        os.close(terminal)
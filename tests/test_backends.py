@@ -0,0 +1,156 @@
+"""
+This test suite verifies the numeric backends: parsing, conversion and computation
+with each of them, selecting one per call, per session or from the environment, and
+the 'backend' command.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.calculator import Calculator
+from app.calculator.backends import (
+    DecimalBackend, FloatBackend, FractionBackend, IntegerBackend, backend_from_spec,
+    default_backend, get_backend, set_default_backend)
+from app.calculator.calculations import Calculation
+from app.calculator.operations import add, divide, multiply, subtract
+from app.plugins.backend import BackendCommand
+from app.plugins.calculator import CalculatorCommand
+from app.sessions import SessionManager, activate, current_backend
+
+
+@pytest.fixture(autouse=True)
+def restore_default_backend():
+    """Reset the process-wide backend after each test."""
+    yield
+    set_default_backend(None)
+
+
+@pytest.mark.parametrize("backend, text, expected", [
+    (IntegerBackend(), "42", 42),
+    (FloatBackend(), "0.5", 0.5),
+    (DecimalBackend(), "1.50", Decimal('1.50')),
+    (FractionBackend(), "3/4", Fraction(3, 4)),
+    (FractionBackend(), "0.25", Fraction(1, 4)),
+])
+def test_parse(backend, text, expected):
+    """Test that each backend parses text to its own number type."""
+    number = backend.parse(text)
+    assert number == expected and type(number) is type(expected)
+
+
+@pytest.mark.parametrize("backend, text", [
+    (IntegerBackend(), "1.5"),
+    (FloatBackend(), "abc"),
+    (DecimalBackend(), "1..2"),
+    (FractionBackend(), "1/0"),
+])
+def test_parse_rejects_invalid_numbers(backend, text):
+    """Test that invalid input raises ValueError for every backend."""
+    with pytest.raises(ValueError):
+        backend.parse(text)
+
+
+def test_convert():
+    """Test conversions between number types."""
+    assert IntegerBackend().convert(Decimal('4.0')) == 4
+    with pytest.raises(ValueError):
+        IntegerBackend().convert(Fraction(1, 2))
+    assert DecimalBackend().convert(0.1) == Decimal('0.1')
+    assert DecimalBackend(5).convert(Fraction(2, 3)) == Decimal('0.66667')
+    assert FractionBackend().convert(0.1) == Fraction(1, 10)
+    assert FloatBackend().convert(Fraction(1, 4)) == 0.25
+    with pytest.raises(ValueError):
+        FloatBackend().convert(True)
+
+
+def test_integer_division_is_exact():
+    """Test that the integer backend keeps exact quotients as ints and others as Fractions."""
+    backend = IntegerBackend()
+    assert backend.compute(divide, 6, 3) == 2 and type(backend.compute(divide, 6, 3)) is int
+    assert backend.compute(divide, 1, 3) == Fraction(1, 3)
+    assert backend.compute(multiply, 2 ** 70, 2) == 2 ** 71
+    with pytest.raises(ZeroDivisionError):
+        backend.compute(divide, 1, 0)
+
+
+def test_decimal_context():
+    """Test that the decimal backend rounds results to its precision and rounding mode."""
+    backend = DecimalBackend(5, 'ROUND_DOWN')
+    assert backend.compute(divide, Decimal(2), Decimal(3)) == Decimal('0.66666')
+    assert backend.compute(add, Decimal('1.000049'), Decimal(0)) == Decimal('1.0000')
+    assert DecimalBackend(5, 'ROUND_UP').compute(
+        subtract, Decimal('1.000041'), Decimal(0)) == Decimal('1.0001')
+    assert backend_from_spec(backend.spec).precision == 5
+    with pytest.raises(ValueError):
+        DecimalBackend(10, 'ROUND_SIDEWAYS')
+
+
+def test_calculator_per_call_backend():
+    """Test that Calculator methods convert the operands to the backend they are given."""
+    assert Calculator.divide(1, 3, backend='fraction') == Fraction(1, 3)
+    assert Calculator.add(0.1, 0.2, backend='decimal') == Decimal('0.3')
+    assert Calculator.multiply('1.5', 2, backend=FloatBackend()) == 3.0
+    assert Calculator.subtract(5, 3) == 2
+    with pytest.raises(ValueError):
+        Calculator.add(1, 2, backend='complex')
+
+
+def test_default_backend_from_env(monkeypatch):
+    """Test that the default backend comes from the environment unless it was set."""
+    monkeypatch.setenv('NUMERIC_BACKEND', 'decimal')
+    monkeypatch.setenv('DECIMAL_PRECISION', '6')
+    monkeypatch.setenv('DECIMAL_ROUNDING', 'round_half_up')
+    backend = default_backend()
+    assert (backend.name, backend.precision, backend.rounding) == (
+        'decimal', 6, 'ROUND_HALF_UP')
+    monkeypatch.setenv('NUMERIC_BACKEND', 'fraction')
+    assert get_backend().name == 'fraction'
+    set_default_backend('float')
+    assert default_backend().name == 'float'
+
+
+def test_calculator_command_uses_the_session_backend(capfd):
+    """Test that the calculator parses and computes with the session's backend."""
+    session = SessionManager().get()
+    session.backend = FractionBackend()
+    command = CalculatorCommand()
+    with activate(session):
+        assert current_backend() is session.backend
+        assert command.execute('divide', '1', '3')
+        assert command.execute('add', '0.1', '0.2', 'backend=float')
+        assert not command.execute('add', '0.5', '1', 'backend=int')
+        assert not command.execute('add', '1', '1', 'backend=complex')
+    out = capfd.readouterr().out
+    assert "The result of 1 divide 3 is: 1/3" in out
+    assert "The result of 0.1 add 0.2 is: 0.30000000000000004" in out
+    assert "Invalid number input: '0.5' or '1' is not a valid number." in out
+    assert "Error: Unknown numeric backend 'complex'" in out
+    assert [calc.get_result() for calc in session.history.snapshot()] == [
+        Fraction(1, 3), 0.30000000000000004]
+
+
+def test_backend_command(capfd):
+    """Test that the backend command shows and sets the session's or the default backend."""
+    command = BackendCommand()
+    session = SessionManager().get()
+    with activate(session):
+        assert command.execute('decimal', 'precision=4', 'rounding=round_up')
+        assert str(current_backend()) == "decimal (precision=4, rounding=ROUND_UP)"
+        assert not command.execute('int', 'precision=4')
+    assert current_backend() is not session.backend
+    assert command.execute('int')
+    assert default_backend().name == 'int'
+    assert command.execute('default')
+    with activate(session):
+        assert command.execute()
+    out = capfd.readouterr().out
+    assert "Error: The 'int' backend takes no options." in out
+    assert out.strip().splitlines()[-1] == (
+        "Numeric backend: decimal (precision=4, rounding=ROUND_UP)")
+
+
+def test_calculation_backend():
+    """Test that a Calculation performs its operation through its backend."""
+    calculation = Calculation(Decimal(1), Decimal(7), divide, backend=DecimalBackend(3))
+    assert calculation.get_result() == Decimal('0.143')
+    assert Calculation(Decimal(1), Decimal(7), divide).get_result() == Decimal(1) / Decimal(7)
@@ -0,0 +1,104 @@
+"""
+Unit tests for the vectorized batch operations on the Calculator class.
+"""
+from array import array
+from decimal import Decimal
+import numpy as np
+import pytest
+from app.calculator import Calculator
+from app.calculator.batch import to_decimal_array
+
+
+def test_add_many():
+    """
+    Test element-wise addition of two arrays.
+    """
+    result = Calculator.add_many(np.array([1, 2, 3]), np.array([4, 5, 6]))
+    assert result.values.tolist() == [5, 7, 9]
+    assert result.error_count == 0
+
+
+def test_subtract_and_multiply_many():
+    """
+    Test element-wise subtraction and multiplication, including broadcasting.
+    """
+    assert Calculator.subtract_many([10, 20], [1, 2]).values.tolist() == [9, 18]
+    assert Calculator.multiply_many([1.5, 2.0], 2).values.tolist() == [3.0, 4.0]
+
+
+def test_batch_accepts_buffers():
+    """
+    Test that objects exposing the buffer protocol are accepted.
+    """
+    result = Calculator.batch('add', array('d', [1.0, 2.0]), array('d', [0.5, 0.5]))
+    assert result.values.tolist() == [1.5, 2.5]
+
+
+def test_divide_many_masks_zero_divisors():
+    """
+    Test that zero divisors are flagged per element instead of raising.
+    """
+    result = Calculator.divide_many([6, 1, 9], [3, 0, 3])
+    assert result.errors.tolist() == [False, True, False]
+    assert result.values[0] == 2
+    assert np.isnan(result.values[1])
+    assert result.error_count == 1
+
+
+def test_decimal_fallback_is_exact():
+    """
+    Test that object arrays of Decimal keep exact results.
+    """
+    numbers_one = to_decimal_array(['0.1', '1', '2'])
+    numbers_two = to_decimal_array(['0.2', '0', '4'])
+    assert Calculator.add_many(numbers_one, numbers_two).values[0] == Decimal('0.3')
+    result = Calculator.divide_many(numbers_one, numbers_two)
+    assert result.values.tolist() == [Decimal('0.5'), None, Decimal('0.5')]
+    assert result.errors.tolist() == [False, True, False]
+
+
+def test_batch_invalid_operation():
+    """
+    Test that an unknown operation name raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        Calculator.batch('modulo', [1], [1])
+
+
+def test_integer_overflow_is_masked():
+    """
+    Test that integer results that wrap around are reported as errors.
+    """
+    result = Calculator.add_many(np.array([2**62, 1], dtype=np.int64),
+                                 np.array([2**62, 1], dtype=np.int64))
+    assert result.errors.tolist() == [True, False]
+    assert result.values[1] == 2
+
+    result = Calculator.multiply_many(np.array([-2**63, 3], dtype=np.int64),
+                                      np.array([-1, 4], dtype=np.int64))
+    assert result.errors.tolist() == [True, False]
+
+    result = Calculator.subtract_many(np.array([0, 5], dtype=np.uint8),
+                                      np.array([1, 2], dtype=np.uint8))
+    assert result.errors.tolist() == [True, False]
+
+
+def test_object_batch_masks_type_errors():
+    """
+    Test that mixing Decimal and float in an object array fails per element.
+    """
+    numbers_one = to_decimal_array([1, 2])
+    numbers_two = np.array([1.5, Decimal(3)], dtype=object)
+    result = Calculator.add_many(numbers_one, numbers_two)
+    assert result.errors.tolist() == [True, False]
+    assert result.values[1] == Decimal(5)
+
+
+def test_scalar_operands():
+    """
+    Test that scalar operands are computed as one-element batches, overflow included.
+    """
+    result = Calculator.add_many(np.int64(2 ** 62), np.int64(2 ** 62))
+    assert len(result) == 1 and result.errors.tolist() == [True]
+    assert Calculator.multiply_many(3, 4).values.tolist() == [12]
+    assert Calculator.divide_many(Decimal(1), Decimal(0)).errors.tolist() == [True]
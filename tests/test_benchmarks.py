@@ -0,0 +1,58 @@
+"""
+Unit tests for the benchmark suite in `benchmarks/`.
+"""
+
+from benchmarks.__main__ import main
+from benchmarks.memory import measure
+from benchmarks.runner import (
+    compare, load_results, run_suite, save_results, seeded_test_data)
+
+
+def test_run_suite_covers_types_and_sizes():
+    """Test that every benchmark runs for each operand type and size."""
+    results = run_suite([5, 10], repeat=1, selected=['operations', 'command_dispatch'])
+    assert set(results) == {
+        f"{name}[{type_name}-{size}]"
+        for name in ('operations', 'command_dispatch')
+        for type_name in ('int', 'float', 'Decimal', 'Fraction')
+        for size in (5, 10)}
+    assert all(nanoseconds > 0 for nanoseconds in results.values())
+
+
+def test_compare_reports_only_regressions():
+    """Test that only slowdowns beyond the threshold are reported."""
+    baseline = {'a': 100.0, 'b': 100.0, 'c': 100.0}
+    results = {'a': 115.0, 'b': 130.0, 'c': 50.0, 'new': 1.0}
+    assert compare(results, baseline, threshold=0.2) == {'b': (100.0, 130.0)}
+
+
+def test_main_fails_on_regression(tmp_path, capsys):
+    """Test that the command line fails when a benchmark regressed."""
+    baseline_file = str(tmp_path / "baseline.json")
+    save_results(baseline_file, {'operations[int-5]': 0.001})
+    assert load_results(baseline_file) == ({'operations[int-5]': 0.001}, 12345)
+    assert main(['--num_records', '5', '--repeat', '1', '--only', 'operations',
+                 '--baseline', baseline_file]) == 1
+    assert "REGRESSION operations[int-5]" in capsys.readouterr().out
+
+
+def test_workloads_are_seeded():
+    """Test that the same seed always generates the same operands."""
+    assert seeded_test_data(20, seed=1) == seeded_test_data(20, seed=1)
+    assert seeded_test_data(20, seed=1) != seeded_test_data(20, seed=2)
+
+
+def test_main_warns_on_seed_mismatch(tmp_path, capsys):
+    """Test that comparing against a baseline measured on another workload is flagged."""
+    baseline_file = str(tmp_path / "baseline.json")
+    save_results(baseline_file, {}, seed=7)
+    assert main(['--num_records', '5', '--repeat', '1', '--only', 'operations',
+                 '--seed', '8', '--baseline', baseline_file]) == 0
+    assert "measured with seed 7" in capsys.readouterr().out
+
+
+def test_columnar_history_uses_less_memory():
+    """Test that the columnar history takes less memory than Calculation objects."""
+    result = measure(2000)
+    assert result['columnar'] * 3 < result['objects']
+    assert result['history'] < result['objects']
@@ -1,4 +1,6 @@
 '''My Calculator Test'''
+import pytest
+from app.calculator.calculations import Calculation, CalculationBatch
 from app.calculator.operations import add, subtract, multiply, divide
 
 def test_addition():
@@ -16,3 +18,38 @@ def test_multiplication():
 def test_division():
     '''Test that division function works'''
     assert divide(2,2)== 1
+
+def test_calculation_result_is_cached():
+    '''Test that the operation runs only once however often the result is read'''
+    calls = []
+
+    def counting_add(number_one, number_two):
+        calls.append((number_one, number_two))
+        return add(number_one, number_two)
+
+    calculation = Calculation(2, 3, counting_add)
+    assert not calculation.is_evaluated()
+    assert calculation.get_result() == 5
+    assert calculation.get_result() == 5
+    assert len(calls) == 1
+    assert not hasattr(calculation, '__dict__')
+
+def test_calculation_error_is_cached():
+    '''Test that a failed operation raises the same error on every read'''
+    calculation = Calculation(1, 0, divide)
+    with pytest.raises(ZeroDivisionError):
+        calculation.get_result()
+    with pytest.raises(ZeroDivisionError):
+        calculation.get_result()
+
+def test_calculation_batch_is_deferred():
+    '''Test that a batch is evaluated as a whole when the first result is read'''
+    batch = CalculationBatch()
+    first = batch.add(6, 3, divide)
+    second = batch.add(2, 5, multiply)
+    assert len(batch) == 2
+    assert not second.is_evaluated()
+    assert first.get_result() == 2
+    assert second.is_evaluated()
+    assert len(batch) == 0
+    assert second.get_result() == 10
@@ -3,7 +3,7 @@ Unit tests for the alculationsHistory class using pytest.
 """
 
 import pytest
-from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculation_history import CalculationsHistory, SpillToDiskPolicy
 from app.calculator.calculations import Calculation
 from app.calculator.operations import add, subtract, multiply, divide
 
@@ -22,7 +22,7 @@ def test_add_calculation_to_history():
     """
     calculation = Calculation(1, 2, add)
     CalculationsHistory.add_calculation(calculation)
-    assert len(CalculationsHistory.history) == 1
+    assert len(CalculationsHistory.get_history()) == 1
     assert CalculationsHistory.get_last_calculation().get_result() == 3
 
 
@@ -45,9 +45,9 @@ def test_clear_history():
     """
     calculation = Calculation(5, 5, add)
     CalculationsHistory.add_calculation(calculation)
-    assert len(CalculationsHistory.history) == 1
+    assert len(CalculationsHistory.get_history()) == 1
     CalculationsHistory.clear_history()
-    assert len(CalculationsHistory.history) == 0
+    assert len(CalculationsHistory.get_history()) == 0
 
 
 def test_get_history():
@@ -62,3 +62,36 @@ def test_get_history():
     assert len(history) == 2
     assert history[0].get_result() == 8  # 10 - 2
     assert history[1].get_result() == 8  # 3 + 5
+
+
+def test_history_is_bounded():
+    """
+    Test that the oldest calculations are evicted once the capacity is reached.
+    """
+    CalculationsHistory.configure(max_entries=2)
+    try:
+        for number in range(5):
+            CalculationsHistory.add_calculation(Calculation(number, 1, add))
+        assert [calc.number_one for calc in CalculationsHistory.get_history()] == [3, 4]
+        assert CalculationsHistory.get_last_calculation().get_result() == 5
+        stats = CalculationsHistory.get_eviction_stats()
+        assert (stats['capacity'], stats['size'], stats['evicted']) == (2, 2, 3)
+        assert stats['max_bytes'] is None
+    finally:
+        CalculationsHistory.configure()
+
+
+def test_spill_to_disk_policy(tmp_path):
+    """
+    Test that the spill policy writes evicted calculations to a CSV file.
+    """
+    spill_file = tmp_path / "spill.csv"
+    policy = SpillToDiskPolicy(str(spill_file))
+    CalculationsHistory.configure(max_entries=1, eviction_policy=policy)
+    try:
+        CalculationsHistory.add_calculation(Calculation(6, 2, divide))
+        CalculationsHistory.add_calculation(Calculation(1, 1, add))
+        policy.close()
+        assert spill_file.read_text(encoding='utf-8').splitlines() == ["6,divide,2,3.0"]
+    finally:
+        CalculationsHistory.configure()
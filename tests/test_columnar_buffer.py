@@ -0,0 +1,161 @@
+"""
+Unit tests for the ColumnarBuffer class and the columnar history views.
+"""
+
+from decimal import Decimal
+import numpy as np
+import pytest
+from app.calculator.backends import backend_from_spec
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.columnar_buffer import (
+    ENTRY_BYTES, KIND_DECIMAL, KIND_ERROR, KIND_FLOAT, KIND_INT, KIND_OBJECT,
+    ColumnarBuffer, encode_number, stored_size)
+from app.calculator.operations import add, divide, multiply, subtract
+from app.calculator.session_history import SessionHistory
+
+
+def modulo(number_one, number_two):
+    """An operation that is not in OPERATIONS."""
+    return number_one % number_two
+
+
+@pytest.mark.parametrize("number, kind", [
+    (Decimal('12.50'), KIND_DECIMAL),
+    (Decimal('-0.000123'), KIND_DECIMAL),
+    (Decimal(1) / Decimal(3), KIND_DECIMAL),
+    (Decimal('1E+100'), KIND_DECIMAL),
+    (-7, KIND_INT),
+    (2 ** 100, KIND_INT),
+    (0.1, KIND_FLOAT),
+    (-0.0, KIND_FLOAT),
+    (Decimal('-0'), KIND_OBJECT),
+    (Decimal('NaN'), KIND_OBJECT),
+    (Decimal('Infinity'), KIND_OBJECT),
+    (Decimal('1E+200'), KIND_OBJECT),
+    (Decimal('1' * 40), KIND_OBJECT),
+    (10 ** 400, KIND_OBJECT),
+])
+def test_numbers_round_trip(number, kind):
+    """Test that every number is stored in the expected kind and read back exactly."""
+    assert encode_number(number)[0] == kind
+    buffer = ColumnarBuffer(4)
+    buffer.append(Calculation(number, 1, modulo if kind == KIND_OBJECT else subtract))
+    restored = buffer[0]
+    assert type(restored.number_one) is type(number)
+    assert str(restored.number_one) == str(number)
+    assert restored.number_two == 1
+
+
+def test_calculations_are_materialized_on_read():
+    """Test that entries come back as evaluated calculations, errors included."""
+    buffer = ColumnarBuffer(4)
+    buffer.append(Calculation(Decimal('7'), Decimal('2'), divide))
+    buffer.append(Calculation(Decimal('7'), Decimal('0'), divide))
+    buffer.append(Calculation(7, 3, modulo))
+    first, failed, custom = buffer
+    assert first.is_evaluated() and first.get_result() == Decimal('3.5')
+    assert first.operation_func is divide
+    with pytest.raises(ZeroDivisionError):
+        failed.get_result()
+    assert custom.operation_func is modulo and custom.get_result() == 1
+    assert buffer.entry_size(1) > ENTRY_BYTES == buffer.entry_size(0)
+
+
+def test_backends_are_kept():
+    """Test that a calculation's backend is read back, and dropped with the entry."""
+    buffer = ColumnarBuffer(2)
+    buffer.append(Calculation(7, 2, divide, backend=backend_from_spec('int')))
+    buffer.append(Calculation(7, 2, divide))
+    assert buffer[0].backend.spec == 'int'
+    assert buffer[1].backend is None
+    buffer.append(Calculation(1, 2, add))
+    assert not buffer._objects  # pylint: disable=protected-access
+
+
+def test_buffer_drops_oldest_and_keeps_sequence_numbers():
+    """Test ring behaviour, sequence numbers and relocation of the columns."""
+    buffer = ColumnarBuffer(3)
+    for number in range(50):
+        assert buffer.append(Calculation(number, 1, add)) == number
+    assert buffer.is_full()
+    assert [calc.number_one for calc in buffer] == [47, 48, 49]
+    assert (buffer.first_seq, buffer.next_seq) == (47, 50)
+    assert buffer[-1].get_result() == 50
+    assert buffer.get(48).number_one == 48
+    with pytest.raises(IndexError):
+        buffer.get(46)
+    buffer.popleft()
+    assert len(buffer) == 2 and buffer[0].number_one == 48
+    buffer.clear()
+    assert len(buffer) == 0 and list(buffer) == []
+    with pytest.raises(IndexError):
+        buffer.popleft()
+
+
+def test_invalid_capacity():
+    """Test that the capacity must be positive."""
+    with pytest.raises(ValueError):
+        ColumnarBuffer(0)
+
+
+def test_as_arrays_shares_memory_and_is_stable():
+    """Test that the NumPy views are zero-copy and unaffected by later appends."""
+    buffer = ColumnarBuffer(100)
+    for number in range(10):
+        buffer.append(Calculation(Decimal(number), Decimal('0.5'), multiply))
+    arrays = buffer.as_arrays()
+    assert np.shares_memory(arrays['result'], buffer.as_arrays()['result'])
+    np.testing.assert_array_equal(arrays['result'], np.arange(10) * 0.5)
+    assert set(arrays['opcode'].tolist()) == {2}
+    assert arrays['seq'].tolist() == list(range(10))
+    assert (arrays['a_low'] == np.arange(10)).all() and (arrays['b_exp'] == -1).all()
+    for number in range(500):
+        buffer.append(Calculation(Decimal(-1), Decimal(number), add))
+    np.testing.assert_array_equal(arrays['result'], np.arange(10) * 0.5)
+    assert len(buffer.as_arrays()['a']) == 100
+
+
+def test_views_survive_appends_after_undo():
+    """Test that an append after an undo does not overwrite an entry under a view."""
+    buffer = ColumnarBuffer(100)
+    for number in range(3):
+        buffer.append(Calculation(Decimal(number), Decimal(1), add))
+    arrays = buffer.as_arrays()
+    buffer.undo()
+    buffer.append(Calculation(Decimal(40), Decimal(2), add))
+    np.testing.assert_array_equal(arrays['result'], [1, 2, 3])
+    assert [calc.get_result() for calc in buffer] == [1, 2, 42]
+    buffer.undo()
+    buffer.append(Calculation(Decimal(7), Decimal(0), add))
+    assert buffer.as_arrays()['result'].tolist() == [1, 2, 7]
+
+
+def test_failed_results_are_nan_in_views():
+    """Test that failed calculations are marked in the kind and float columns."""
+    buffer = ColumnarBuffer(4)
+    buffer.append(Calculation(1.0, 0.0, divide))
+    arrays = buffer.as_arrays()
+    assert arrays['result_kind'][0] == KIND_ERROR and np.isnan(arrays['result'][0])
+
+
+def test_history_as_arrays_supports_vectorized_analytics():
+    """Test analytics over the process-wide and session histories."""
+    CalculationsHistory.configure(max_entries=5)
+    session_history = SessionHistory(max_entries=5)
+    try:
+        for number in range(8):
+            calculation = Calculation(Decimal(number), Decimal(2), multiply)
+            CalculationsHistory.add_calculation(calculation)
+            session_history.add_calculation(calculation)
+        for history in (CalculationsHistory, session_history):
+            arrays = history.as_arrays()
+            assert arrays['result'].sum() == sum(number * 2 for number in range(3, 8))
+    finally:
+        CalculationsHistory.configure()
+
+
+def test_stored_size_counts_overflow_objects():
+    """Test the size estimate of a stored calculation."""
+    assert stored_size(Calculation(Decimal(1), Decimal(2), add)) == ENTRY_BYTES
+    assert stored_size(Calculation(Decimal('NaN'), Decimal(2), add)) > ENTRY_BYTES
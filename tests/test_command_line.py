@@ -0,0 +1,65 @@
+"""
+This test suite verifies single-line commands: an input line is split into the command
+name and its arguments, and commands only prompt for the arguments that are missing.
+"""
+
+import pytest
+from app.commands import Command, CommandHandler, parse_command_line
+
+
+class EchoCommand(Command):
+    """Command that prints its arguments."""
+    def execute(self, *args):
+        print(list(args))
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("calculator add 2 3", ("calculator", ("add", "2", "3"))),
+    ("  greet  ", ("greet", ())),
+    ("", ("", ())),
+    ('evaluate "(1 + 2) * 3"', ("evaluate", ("(1 + 2) * 3",))),
+    ('echo "unbalanced', ("echo", ('"unbalanced',))),
+])
+def test_parse_command_line(line, expected):
+    """Test that lines are split like a shell would, quotes included."""
+    assert parse_command_line(line) == expected
+
+
+def test_execute_command_splits_lines(capfd):
+    """Test that execute_command accepts a whole command line."""
+    handler = CommandHandler()
+    handler.register_command('echo', EchoCommand())
+    assert handler.execute_command('echo a b')
+    assert handler.execute_command('echo', 'a b')
+    assert capfd.readouterr().out == "['a', 'b']\n['a b']\n"
+    assert handler.stats.snapshot()['echo']['calls'] == 2
+
+
+def test_app_calculator_on_one_line(run_app_with_input, monkeypatch, capfd):
+    """Test that the calculator uses the operation and numbers given on the line."""
+    inputs = iter(['calculator add 5 10', 'calculator divide 1 0', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "The result of 5 add 10 is: 15\n" in out
+    assert "Error: Division by zero is not allowed." in out
+
+
+def test_app_calculator_prompts_for_missing_numbers(run_app_with_input, monkeypatch, capfd):
+    """Test that the calculator prompts only for the numbers that were not given."""
+    inputs = iter(['calculator multiply 3', '4', 'calculator history', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "The result of 3 multiply 4 is: 12\n" in out
+    assert "3 multiply 4 = 12" in out
+
+
+def test_app_calculator_too_many_numbers(run_app_with_input, monkeypatch, capfd):
+    """Test that extra numbers are rejected."""
+    inputs = iter(['calculator add 1 2 3', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "Error: 'add' takes two numbers, got 3." in out
+
+
+def test_app_evaluate_on_one_line(run_app_with_input, monkeypatch, capfd):
+    """Test that the evaluate command takes its expression from the line."""
+    inputs = iter(['evaluate (1 + 2) * 3', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "The result of (1 + 2) * 3 is: 9\n" in out
@@ -0,0 +1,148 @@
+"""
+This test suite verifies the per-command latency statistics recorded by the
+`CommandHandler` and displayed by the 'stats' command.
+"""
+
+import asyncio
+import json
+import pytest
+from app.commands import AsyncCommand, Command, CommandHandler, report_failure
+from app.commands.stats import CommandStats, LatencyHistogram
+from app.plugins.evaluate import EvaluateCommand
+from app.plugins.stats import StatsCommand
+
+
+class ResultCommand(Command):
+    """Command that returns its first argument, or raises it if it is an exception."""
+    def execute(self, *args):
+        if isinstance(args[0], BaseException):
+            raise args[0]
+        return args[0]
+
+
+class CaughtCommand(Command):
+    """Command that catches the exception it is given, reports it and fails."""
+    def execute(self, *args):
+        try:
+            raise args[0]
+        except ArithmeticError as e:
+            report_failure(e)
+            return False
+
+
+class AsyncOkCommand(AsyncCommand):
+    """Async command that succeeds."""
+    async def execute(self, *args):
+        return None
+
+
+def test_histogram_percentiles():
+    """Test that percentiles fall within one bucket of the true value."""
+    histogram = LatencyHistogram()
+    for latency_us in range(1, 101):
+        histogram.record(latency_us * 1000)
+    assert histogram.count == 100
+    assert histogram.max_ns == 100_000
+    assert 50_000 <= histogram.percentile(50) <= 50_000 * 1.2
+    assert 99_000 <= histogram.percentile(99) <= 100_000
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_histogram_clamps_extreme_latencies():
+    """Test that tiny and huge latencies land in the first and last buckets."""
+    histogram = LatencyHistogram()
+    histogram.record(0)
+    histogram.record(10 ** 15)
+    assert histogram.buckets[0] == 1
+    assert histogram.buckets[-1] == 1
+    assert histogram.percentile(100) == 10 ** 15
+
+
+def test_handler_records_calls_and_error_types(capfd):
+    """Test that successes, failures and exceptions are counted by type."""
+    handler = CommandHandler()
+    handler.register_command('result', ResultCommand())
+    assert handler.execute_command('result', None)
+    assert not handler.execute_command('result', False)
+    assert not handler.execute_command('result', TypeError('bad'))
+    with pytest.raises(ValueError):
+        handler.execute_command('result', ValueError('boom'))
+    capfd.readouterr()
+
+    entry = handler.stats.snapshot()['result']
+    assert entry['calls'] == 4
+    assert entry['errors'] == {'Failed': 1, 'TypeError': 1, 'ValueError': 1}
+    assert entry['p50_ms'] <= entry['p99_ms'] <= entry['max_ms']
+
+
+def test_caught_exceptions_are_recorded_by_type(capfd):
+    """Test that failures reported by the command are recorded under their type."""
+    handler = CommandHandler()
+    handler.register_command('caught', CaughtCommand())
+    assert not handler.execute_command('caught', ZeroDivisionError())
+    assert not asyncio.run(handler.execute_command_async('caught', OverflowError()))
+    handler.register_command('evaluate', EvaluateCommand())
+    assert not handler.execute_command('evaluate', '1', '+')
+    capfd.readouterr()
+    snapshot = handler.stats.snapshot()
+    assert snapshot['caught']['errors'] == {'ZeroDivisionError': 1, 'OverflowError': 1}
+    assert snapshot['evaluate']['errors'] == {'ExpressionError': 1}
+    # Outside a command run by a handler, reporting a failure does nothing
+    report_failure(ValueError())
+
+
+def test_unknown_commands_are_not_recorded(capfd):
+    """Test that unknown command names do not create statistics entries."""
+    handler = CommandHandler()
+    assert not handler.execute_command('missing')
+    assert "Command 'missing' not found" in capfd.readouterr().out
+    assert not handler.stats.snapshot()
+
+
+def test_async_execution_is_recorded():
+    """Test that commands run through execute_command_async are recorded too."""
+    handler = CommandHandler()
+    handler.register_command('ok', AsyncOkCommand())
+    handler.register_command('result', ResultCommand())
+    assert asyncio.run(handler.execute_command_async('ok'))
+    assert not asyncio.run(handler.execute_command_async('result', False))
+    snapshot = handler.stats.snapshot()
+    assert snapshot['ok']['calls'] == 1
+    assert snapshot['result']['errors'] == {'Failed': 1}
+
+
+def test_stats_command_output(capfd):
+    """Test the table and JSON output of the stats command."""
+    handler = CommandHandler()
+    command = StatsCommand(handler)
+    command.execute()
+    assert "No commands have been executed yet." in capfd.readouterr().out
+
+    handler.register_command('result', ResultCommand())
+    handler.execute_command('result', False)
+    command.execute()
+    out = capfd.readouterr().out
+    assert "Command statistics:" in out
+    assert "result" in out
+    assert "errors: Failed=1" in out
+
+    command.execute('json')
+    assert json.loads(capfd.readouterr().out)['result']['calls'] == 1
+
+
+def test_stats_command_in_app(run_app_with_input, monkeypatch, capfd):
+    """Test that the app registers the stats command and records the commands run."""
+    out = run_app_with_input(monkeypatch, capfd, iter(['greet', 'stats', 'exit'])).out
+    assert "Command statistics:" in out
+    assert " greet " in out
+
+
+def test_dump_writes_json(tmp_path):
+    """Test that the statistics can be written to a JSON file."""
+    stats = CommandStats()
+    stats.record('greet', 2_000_000)
+    path = tmp_path / 'stats.json'
+    stats.dump(str(path))
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['greet']['calls'] == 1
+    assert data['greet']['max_ms'] == 2.0
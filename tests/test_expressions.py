@@ -0,0 +1,89 @@
+"""
+Unit tests for the infix expression engine and the 'evaluate' command.
+"""
+
+from decimal import Decimal
+import pytest
+from app.calculator import Calculator
+from app.calculator.expressions import (
+    ExpressionError, Node, compile_expression, evaluate_expression, expression_cache_info,
+    parse_expression)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("1 + 2", Decimal('3')),
+    ("(1.5 + 2) * 3 / 7", Decimal('10.5') / Decimal('7')),
+    ("2 + 3 * 4", Decimal('14')),
+    ("10 - 4 - 3", Decimal('3')),
+    ("-(2 + 3) * +2", Decimal('-10')),
+    ("1e2 / .5", Decimal('200')),
+])
+def test_evaluate_expression(expression, expected):
+    """Test that expressions follow the usual precedence and associativity."""
+    assert Calculator.evaluate(expression) == expected
+
+
+def test_expression_variables():
+    """Test that names are looked up in the variables mapping."""
+    compiled = compile_expression("x * 3 + y")
+    assert compiled.names == frozenset({'x', 'y'})
+    assert compiled.evaluate({'x': Decimal('2'), 'y': Decimal('1')}) == Decimal('7')
+    with pytest.raises(ExpressionError):
+        compiled.evaluate({'x': Decimal('2')})
+
+
+def test_expression_variables_are_converted_to_decimal():
+    """Test that int and float variables mix with Decimal literals."""
+    assert Calculator.evaluate('x + 1', {'x': 1.5}) == Decimal('2.5')
+    assert Calculator.evaluate('x * y', {'x': 0.1, 'y': 3}) == Decimal('0.3')
+    with pytest.raises(ExpressionError):
+        Calculator.evaluate('x + 1', {'x': 'abc'})
+
+
+def test_node_is_abstract():
+    """Test that the syntax tree base class cannot be instantiated."""
+    with pytest.raises(TypeError):
+        Node()  # pylint: disable=abstract-class-instantiated
+
+
+@pytest.mark.parametrize("expression", ["", "1 +", "(1 + 2", "1 2", "2 % 3", ")"])
+def test_invalid_expression(expression):
+    """Test that malformed expressions raise ExpressionError."""
+    with pytest.raises(ExpressionError):
+        parse_expression(expression)
+
+
+def test_long_and_deep_expressions():
+    """Test that long operator chains evaluate and deep nesting is rejected cleanly."""
+    assert evaluate_expression('+'.join(['1'] * 1200)) == 1200
+    assert evaluate_expression(' * '.join(['2'] * 10) + ' - 1' * 1000) == 24
+    assert evaluate_expression('-' * 98 + '1') == 1
+    assert evaluate_expression('(' * 99 + '1' + ')' * 99) == 1
+    for expression in ('-' * 1200 + '1', '(' * 1200 + '1' + ')' * 1200):
+        with pytest.raises(ExpressionError):
+            parse_expression(expression)
+
+
+def test_expression_division_by_zero():
+    """Test that dividing by zero raises ZeroDivisionError."""
+    with pytest.raises(ZeroDivisionError):
+        evaluate_expression("1 / (2 - 2)")
+
+
+def test_expression_cache_hits():
+    """Test that evaluating the same text again is served from the cache."""
+    compile_expression.cache_clear()
+    evaluate_expression("4 * 4")
+    evaluate_expression("4 * 4")
+    info = expression_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_app_evaluate_command(run_app_with_input, monkeypatch, capfd):
+    """Test the 'evaluate' command in the REPL."""
+    inputs = iter(['evaluate', '(1 + 2) * 4', 'evaluate', '1 +', 'evaluate', '1e999999 * 10',
+                   'exit'])
+    captured = run_app_with_input(monkeypatch, capfd, inputs)
+    assert "Error: Overflow while evaluating the expression.\n" in captured.out
+    assert "The result of (1 + 2) * 4 is: 12\n" in captured.out
+    assert "Error: Invalid expression: Unexpected end of expression.\n" in captured.out
@@ -0,0 +1,144 @@
+"""
+This test suite verifies the history indexes: queries by operation and result range,
+top-k queries, index maintenance under eviction, and the 'history' command.
+"""
+
+from decimal import Decimal
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.columnar_buffer import ColumnarBuffer
+from app.calculator.history_index import HistoryIndex
+from app.calculator.operations import add, divide, multiply
+from app.calculator.session_history import SessionHistory
+from app.plugins.history import HistoryCommand
+from app.sessions import SessionManager, activate
+
+
+def calc(number_one, number_two, operation):
+    """Return a Decimal calculation."""
+    return Calculation(Decimal(number_one), Decimal(number_two), operation)
+
+
+def build_index(*calculations):
+    """Return an index over a buffer holding the calculations."""
+    store = ColumnarBuffer(100)
+    index = HistoryIndex(store)
+    for calculation in calculations:
+        index.add(store.append(calculation))
+    return index
+
+
+def results(calculations):
+    """Return the results of calculations."""
+    return [calculation.get_result() for calculation in calculations]
+
+
+def test_range_and_operation_queries():
+    """Test range queries overall and per operation, including equal results."""
+    index = build_index(calc(1, 1, add), calc(3, 3, multiply), calc(5, 0, add),
+                        calc(4, 2, divide), calc(2, 0, add))
+    assert results(index.by_result(2, 5)) == [2, 2, 2, 5]
+    assert results(index.by_result(low=5)) == [5, 9]
+    assert results(index.by_result(high=2, operation_name='add')) == [2, 2]
+    assert results(index.by_result(3, 4)) == []
+    assert results(index.by_operation('add')) == [2, 5, 2]
+    assert index.by_operation('subtract') == []
+    assert len(index) == 5
+
+
+def test_top_k():
+    """Test the largest and smallest k results, overall and per operation."""
+    index = build_index(*(calc(number, 0, add) for number in (4, 9, 1, 7)),
+                        calc(100, 2, multiply))
+    assert results(index.top_k(2)) == [200, 9]
+    assert results(index.top_k(2, largest=False)) == [1, 4]
+    assert results(index.top_k(10, 'add')) == [9, 7, 4, 1]
+    assert index.top_k(0) == []
+
+
+def test_errors_and_nan_are_not_ranked():
+    """Test that calculations without an ordered result only appear in posting lists."""
+    index = build_index(calc(1, 0, divide), Calculation(Decimal('NaN'), Decimal(1), add),
+                        calc(6, 3, divide))
+    assert results(index.by_result()) == [2]
+    assert len(index.by_operation('divide')) == 2
+
+
+def test_eviction_keeps_session_index_consistent():
+    """Test that evicted calculations disappear from every index."""
+    history = SessionHistory(max_entries=3)
+    for number in range(6):
+        history.add_calculation(calc(number, 2, multiply if number % 2 else add))
+    assert results(history.find_by_result()) == [6, 6, 10]
+    assert results(history.find_by_operation('add')) == [6]
+    assert results(history.top_k(1, 'multiply')) == [10]
+    history.clear_history()
+    assert history.find_by_result() == []
+
+
+def test_same_calculation_added_twice():
+    """Test that a calculation added twice is evicted one entry at a time."""
+    history = SessionHistory(max_entries=2)
+    repeated = calc(1, 1, add)
+    history.add_calculation(repeated)
+    history.add_calculation(repeated)
+    history.add_calculation(calc(5, 5, add))
+    assert results(history.find_by_result()) == [2, 10]
+    assert len(history.find_by_operation('add')) == 2
+
+
+def test_process_history_queries():
+    """Test the queries of the process-wide history and its index under eviction."""
+    CalculationsHistory.configure(max_entries=3)
+    try:
+        for number in range(5):
+            CalculationsHistory.add_calculation(calc(number, 10, divide))
+        assert results(CalculationsHistory.find_by_result(Decimal('0.25'))) == [
+            Decimal('0.3'), Decimal('0.4')]
+        assert len(CalculationsHistory.find_by_operation('divide')) == 3
+        assert results(CalculationsHistory.top_k(1, largest=False)) == [Decimal('0.2')]
+        CalculationsHistory.clear_history()
+        assert CalculationsHistory.top_k(3) == []
+    finally:
+        CalculationsHistory.configure()
+
+
+def test_history_command_queries_session(capsys):
+    """Test the 'history' command against the active session's history."""
+    session = SessionManager(max_entries=10).get()
+    for number_one, number_two, operation in ((5000, 2, divide), (10, 2, divide),
+                                              (3, 4, multiply), (7, 1, add)):
+        session.history.add_calculation(calc(number_one, number_two, operation))
+    command = HistoryCommand()
+    with activate(session):
+        assert command.execute('query', 'op=divide', 'min=1000')
+        assert "Found 1 calculations:\n5000 divide 2 = 2500" in capsys.readouterr().out
+        assert command.execute('query', 'top=2')
+        assert capsys.readouterr().out.endswith("5000 divide 2 = 2500\n3 multiply 4 = 12\n")
+        assert command.execute('query', 'min=100', 'max=1')
+        assert "No calculations match the query." in capsys.readouterr().out
+        assert command.execute('query', 'top=2', 'max=100')
+        assert capsys.readouterr().out.endswith("3 multiply 4 = 12\n7 add 1 = 8\n")
+        assert command.execute()
+        assert "Calculation History:" in capsys.readouterr().out
+
+
+def test_history_command_rejects_invalid_filters(capsys):
+    """Test that malformed query filters are reported."""
+    command = HistoryCommand()
+    assert not command.execute('query', 'op=modulo')
+    assert not command.execute('query', 'top=-1')
+    assert not command.execute('query', 'min=abc')
+    assert not command.execute('query', 'size=3')
+    assert not command.execute('query', 'top=1', 'bottom=1')
+    assert not command.execute('query', 'min=nan')
+    assert not command.execute('query', 'max=Infinity')
+    assert not command.execute('search')
+    assert capsys.readouterr().out.count("Error:") == 8
+
+
+def test_history_command_in_app(run_app_with_input, monkeypatch, capfd):
+    """Test the 'history' command from the REPL."""
+    captured = run_app_with_input(monkeypatch, capfd, iter([
+        'calculator multiply 4 5', 'calculator add 1 1', 'history query bottom=1', 'exit']))
+    assert "Found 1 calculations:\n1 add 1 = 2" in captured.out
@@ -0,0 +1,216 @@
+"""
+This test suite verifies streaming history export and import: CSV and NDJSON round
+trips, chunked reads of the history, resuming interrupted imports, and the
+'history export' and 'history import' commands.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+import json
+import os
+import tracemalloc
+import pytest
+from app.calculator.backends import backend_from_spec
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.history_io import (
+    detect_format, export_history, import_history, progress_path)
+from app.calculator.operations import add, divide, multiply, subtract
+from app.calculator.session_history import SessionHistory
+
+
+def modulo(number_one, number_two):
+    """An operation that cannot be exported."""
+    return number_one % number_two
+
+
+def make_history(calculations, max_entries=100):
+    """Return a session history holding the calculations."""
+    history = SessionHistory(max_entries=max_entries)
+    for calculation in calculations:
+        history.add_calculation(calculation)
+    return history
+
+
+def describe(history):
+    """Return comparable (operation, a, b) triples with operand types."""
+    return [(calc.operation_func.__name__, type(calc.number_one), str(calc.number_one),
+             type(calc.number_two), str(calc.number_two)) for calc in history.snapshot()]
+
+
+SAMPLE = [
+    Calculation(Decimal('1.50'), Decimal('2'), add),
+    Calculation(7, 2, divide),
+    Calculation(0.1, 0.2, add),
+    Calculation(Decimal('1'), Decimal('0'), divide),
+    Calculation(Decimal('-3'), 4, multiply),
+    Calculation(Fraction(1, 3), Fraction(2), add),
+]
+
+
+@pytest.mark.parametrize("file_name", ["history.csv", "history.ndjson"])
+def test_round_trip(tmp_path, file_name):
+    """Test that an export imports back with the same operations, operands and types."""
+    source = make_history(SAMPLE)
+    path = str(tmp_path / file_name)
+    report = export_history(source, path, chunk_size=2)
+    assert (report.rows, report.skipped) == (6, 0)
+    assert report.size == os.path.getsize(path)
+
+    target = make_history([])
+    report = import_history(target, path, chunk_size=2)
+    assert report.rows == 6 and report.resumed_rows == 0
+    assert describe(target) == describe(source)
+    assert target.snapshot()[0].get_result() == Decimal('3.50')
+    assert target.snapshot()[5].get_result() == Fraction(7, 3)
+    with pytest.raises(ZeroDivisionError):
+        target.snapshot()[3].get_result()
+    assert not os.path.exists(progress_path(path))
+
+
+def test_file_contents(tmp_path):
+    """Test the CSV and NDJSON layouts."""
+    history = make_history(SAMPLE[:2] + SAMPLE[3:4])
+    export_history(history, str(tmp_path / "out.csv"))
+    assert (tmp_path / "out.csv").read_text(encoding='utf-8').splitlines() == [
+        "operation,a,b,result,a_type,b_type,backend",
+        "add,1.50,2,3.50,d,d,",
+        "divide,7,2,3.5,i,i,",
+        "divide,1,0,,d,d,",
+    ]
+    export_history(history, str(tmp_path / "out.txt"), file_format='ndjson')
+    lines = (tmp_path / "out.txt").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'operation': 'add', 'a': '1.50', 'b': '2', 'result': '3.50', 'backend': None},
+        {'operation': 'divide', 'a': 7, 'b': 2, 'result': '3.5', 'backend': None},
+        {'operation': 'divide', 'a': '1', 'b': '0', 'result': None, 'backend': None},
+    ]
+
+
+@pytest.mark.parametrize("file_name", ["history.csv", "history.ndjson"])
+def test_backends_are_exported_and_applied_on_import(tmp_path, file_name):
+    """Test that calculations are computed again with the backend they were computed with."""
+    source = make_history([
+        Calculation(7, 2, divide, backend=backend_from_spec('int')),
+        Calculation(Decimal(1), Decimal(3), divide,
+                    backend=backend_from_spec('decimal:5:ROUND_UP')),
+        Calculation(1, 3, divide)])
+    path = str(tmp_path / file_name)
+    export_history(source, path)
+    target = make_history([])
+    import_history(target, path)
+    assert [calc.backend.spec if calc.backend else None for calc in target.snapshot()] == [
+        'int', 'decimal:5:ROUND_UP', None]
+    assert [calc.get_result() for calc in target.snapshot()] == [
+        calc.get_result() for calc in source.snapshot()]
+    assert target.snapshot()[1].get_result() == Decimal('0.33334')
+
+
+def test_unexportable_calculations_are_skipped(tmp_path):
+    """Test that calculations that could not be imported again are skipped."""
+    history = make_history([Calculation(7, 3, modulo), Calculation(1, 1, subtract)])
+    report = export_history(history, str(tmp_path / "out.csv"))
+    assert (report.rows, report.skipped) == (1, 1)
+
+
+def test_iter_chunks_is_bounded_and_skips_new_entries():
+    """Test chunked reads of both histories."""
+    CalculationsHistory.configure(max_entries=10)
+    try:
+        for number in range(7):
+            CalculationsHistory.add_calculation(Calculation(number, 1, add))
+        chunks = CalculationsHistory.iter_chunks(3)
+        first = next(chunks)
+        CalculationsHistory.add_calculation(Calculation(100, 1, add))
+        rest = list(chunks)
+        assert [len(chunk) for chunk in [first] + rest] == [3, 3, 1]
+        assert [calc.number_one for calc in rest[-1]] == [6]
+    finally:
+        CalculationsHistory.configure()
+    history = make_history([Calculation(number, 1, add) for number in range(10)], 4)
+    assert [[calc.number_one for calc in chunk] for chunk in history.iter_chunks(3)] == [
+        [6, 7, 8], [9]]
+
+
+def test_export_memory_does_not_grow_with_history(tmp_path):
+    """Test that exporting a larger history does not take more memory."""
+    def peak_for(entries):
+        history = make_history([Calculation(Decimal(number), Decimal(3), divide)
+                                for number in range(entries)], entries)
+        tracemalloc.start()
+        try:
+            export_history(history, str(tmp_path / "out.ndjson"), chunk_size=100)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert peak_for(8000) < 2 * peak_for(1000)
+
+
+def test_interrupted_import_resumes(tmp_path):
+    """Test that an import stopped by a malformed row resumes after the last chunk."""
+    path = tmp_path / "history.csv"
+    rows = [f"add,{number},1,{number + 1},i,i" for number in range(7)]
+    broken = rows[:5] + ["add,oops,1,,i,i"] + rows[5:]
+    path.write_text("operation,a,b,result,a_type,b_type\n" + "\n".join(broken) + "\n",
+                    encoding='utf-8')
+    history = make_history([])
+    with pytest.raises(ValueError, match=r"history.csv:7:"):
+        import_history(history, str(path), chunk_size=2)
+    assert [calc.number_one for calc in history.snapshot()] == [0, 1, 2, 3]
+    assert os.path.exists(progress_path(str(path)))
+
+    path.write_text("operation,a,b,result,a_type,b_type\n" + "\n".join(rows) + "\n",
+                    encoding='utf-8')
+    report = import_history(history, str(path), chunk_size=2)
+    assert (report.rows, report.resumed_rows) == (3, 4)
+    assert [calc.number_one for calc in history.snapshot()] == list(range(7))
+    assert not os.path.exists(progress_path(str(path)))
+
+
+def test_progress_of_another_file_is_ignored(tmp_path):
+    """Test that a progress file left by a different file does not skip rows."""
+    path = tmp_path / "history.ndjson"
+    path.write_text('{"operation": "add", "a": 1, "b": 2}\n', encoding='utf-8')
+    (tmp_path / "history.ndjson.progress").write_text(
+        json.dumps({'fingerprint': 'other', 'offset': 5, 'line': 1, 'rows': 1}),
+        encoding='utf-8')
+    history = make_history([])
+    assert import_history(history, str(path)).rows == 1
+    assert history.get_last_calculation().get_result() == 3
+
+
+def test_invalid_files(tmp_path):
+    """Test unknown formats, wrong headers and malformed NDJSON rows."""
+    with pytest.raises(ValueError):
+        detect_format("history.xlsx")
+    with pytest.raises(ValueError):
+        detect_format("history.csv", "xml")
+    header = tmp_path / "bad.csv"
+    header.write_text("x,y\n", encoding='utf-8')
+    with pytest.raises(ValueError, match="header"):
+        import_history(make_history([]), str(header))
+    rows = tmp_path / "bad.ndjson"
+    rows.write_text('{"operation": "power", "a": 1, "b": 2}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match="bad.ndjson:1: 'power'"):
+        import_history(make_history([]), str(rows))
+    rows.write_text('{"operation": "add", "a": 1, "b": 2, "backend": "abacus"}\n',
+                    encoding='utf-8')
+    with pytest.raises(ValueError, match="bad.ndjson:1: Unknown numeric backend"):
+        import_history(make_history([]), str(rows))
+
+
+def test_history_export_and_import_commands(run_app_with_input, monkeypatch, capfd, tmp_path):
+    """Test the 'history export' and 'history import' commands from the REPL."""
+    path = str(tmp_path / "history.ndjson")
+    CalculationsHistory.clear_history()
+    captured = run_app_with_input(monkeypatch, capfd, iter([
+        'calculator add 1 2', 'calculator multiply 3 4', f'history export {path} chunk=1',
+        'calculator clear_history', f'history import {path}', 'history',
+        'history import missing.csv', 'history export', 'exit']))
+    assert f"Exported 2 calculations to {path} in" in captured.out
+    assert f"Imported 2 calculations from {path} in" in captured.out
+    assert "calculations/s" in captured.out
+    assert "Calculation History:\n1 add 2 = 3\n3 multiply 4 = 12" in captured.out
+    assert "Error: [Errno 2]" in captured.out
+    assert "Error: Usage: history export PATH" in captured.out
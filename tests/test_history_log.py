@@ -0,0 +1,143 @@
+"""
+Unit tests for the HistoryLog class and its use by CalculationsHistory.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.calculator.backends import DecimalBackend, IntegerBackend
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.history_log import HistoryLog, encode_calculation
+from app.calculator.operations import add, divide, multiply
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """
+    Fixture providing a log file path and restoring a plain history afterwards.
+    """
+    yield str(tmp_path / "history.wal")
+    CalculationsHistory.detach_log()
+    CalculationsHistory.configure()
+
+
+def test_log_round_trip(log_path):
+    """
+    Test that calculations survive a write and a reload, with their operand types.
+    """
+    log = HistoryLog(log_path, group_size=2)
+    log.append(Calculation(Decimal('1.5'), Decimal('2'), add))
+    log.append(Calculation(3, 0.25, multiply))
+    log.append(Calculation(7, 2, divide))
+    log.close()
+
+    calculations = HistoryLog(log_path).load()
+    assert [calc.get_result() for calc in calculations] == [Decimal('3.5'), 0.75, 3.5]
+    assert isinstance(calculations[0].number_one, Decimal)
+    assert isinstance(calculations[1].number_one, int)
+
+
+def test_log_keeps_numeric_backends(log_path):
+    """
+    Test that calculations restored from the log are computed with their backend.
+    """
+    log = HistoryLog(log_path)
+    log.append(Calculation(Decimal('2'), Decimal('3'), divide,
+                           backend=DecimalBackend(5, 'ROUND_DOWN')))
+    log.append(Calculation(1, 3, divide, backend=IntegerBackend()))
+    log.append(Calculation(Fraction(1, 3), Fraction(1, 6), add))
+    log.close()
+
+    calculations = HistoryLog(log_path).load()
+    assert [calc.get_result() for calc in calculations] == [
+        Decimal('0.66666'), Fraction(1, 3), Fraction(1, 2)]
+    assert calculations[0].backend.spec == 'decimal:5:ROUND_DOWN'
+    assert calculations[2].backend is None
+
+
+def test_log_group_commit(log_path):
+    """
+    Test that records are buffered until the group is full.
+    """
+    log = HistoryLog(log_path, group_size=3, sync_interval=3600)
+    log.append(Calculation(1, 1, add))
+    log.append(Calculation(1, 2, add))
+    assert HistoryLog(log_path).load() == []
+    log.append(Calculation(1, 3, add))
+    assert len(HistoryLog(log_path).load()) == 3
+    log.close()
+
+
+def test_buffered_records_are_written_at_exit(log_path, monkeypatch):
+    """
+    Test that a log with buffered records closes itself at exit, before any sync.
+    """
+    registered = []
+    monkeypatch.setattr('atexit.register', registered.append)
+    monkeypatch.setattr('atexit.unregister', registered.remove)
+    log = HistoryLog(log_path, group_size=64, sync_interval=3600)
+    log.append(Calculation(2, 3, add))
+    assert registered == [log.close]
+
+    registered[0]()
+    assert registered == []
+    assert [calc.get_result() for calc in HistoryLog(log_path).load()] == [5]
+
+
+def test_log_load_limit_and_torn_record(log_path):
+    """
+    Test that only the last records are decoded and a torn tail is discarded.
+    """
+    log = HistoryLog(log_path, group_size=1)
+    for number in range(5):
+        log.append(Calculation(number, 1, add))
+    log.close()
+    with open(log_path, 'ab') as log_file:
+        log_file.write(encode_calculation(Calculation(9, 9, add))[:-3])
+
+    reloaded = HistoryLog(log_path)
+    calculations = reloaded.load(limit=2)
+    assert [calc.number_one for calc in calculations] == [3, 4]
+    assert reloaded.record_count == 5
+    assert len(HistoryLog(log_path).load()) == 5
+
+
+def test_history_restored_from_log(log_path):
+    """
+    Test that CalculationsHistory persists to the log and restores from it.
+    """
+    CalculationsHistory.configure(max_entries=3)
+    CalculationsHistory.attach_log(HistoryLog(log_path, group_size=1))
+    for number in range(4):
+        CalculationsHistory.add_calculation(Calculation(number, 10, add))
+    CalculationsHistory.detach_log()
+
+    CalculationsHistory.configure(max_entries=3)
+    CalculationsHistory.attach_log(HistoryLog(log_path))
+    assert [calc.get_result() for calc in CalculationsHistory.get_history()] == [11, 12, 13]
+
+
+def test_history_log_compaction(log_path):
+    """
+    Test that the log is compacted once it grows past twice the history capacity.
+    """
+    CalculationsHistory.configure(max_entries=2)
+    log = HistoryLog(log_path, group_size=1)
+    CalculationsHistory.attach_log(log)
+    for number in range(3):
+        CalculationsHistory.add_calculation(Calculation(number, 1, add))
+    assert log.record_count == 3
+    CalculationsHistory.add_calculation(Calculation(3, 1, add))
+    assert log.record_count == 2
+    assert [calc.number_one for calc in HistoryLog(log_path).load()] == [2, 3]
+
+
+def test_clear_history_clears_log(log_path):
+    """
+    Test that clearing the history also empties the log.
+    """
+    CalculationsHistory.attach_log(HistoryLog(log_path, group_size=1))
+    CalculationsHistory.add_calculation(Calculation(1, 1, add))
+    CalculationsHistory.clear_history()
+    assert HistoryLog(log_path).load() == []
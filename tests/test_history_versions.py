@@ -0,0 +1,151 @@
+"""
+This test suite verifies undo, redo and checkpoints: in the columnar buffer, in the
+indexes, in both kinds of history, in the history log, and through the 'undo', 'redo'
+and 'history checkpoint' commands.
+"""
+
+from decimal import Decimal
+import pytest
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.columnar_buffer import ColumnarBuffer
+from app.calculator.history_log import HistoryLog
+from app.calculator.operations import add, multiply
+from app.calculator.session_history import SessionHistory
+
+
+@pytest.fixture(autouse=True)
+def fresh_history():
+    """Give every test an empty process-wide history."""
+    CalculationsHistory.configure(max_entries=5)
+    yield
+    CalculationsHistory.detach_log()
+    CalculationsHistory.configure()
+
+
+def results(history):
+    """Return the results of a history, oldest first."""
+    return [int(calc.get_result()) for calc in history.snapshot()]
+
+
+def test_buffer_undo_redo_keeps_sequence_numbers():
+    """Test that undone entries keep their slots and objects until the next append."""
+    buffer = ColumnarBuffer(4)
+    for number in range(3):
+        buffer.append(Calculation(Decimal(number), Decimal(1), add))
+    buffer.append(Calculation(Decimal('1e400'), Decimal(1), add))
+    assert buffer.undo() == 3 and buffer.undo() == 2
+    assert (len(buffer), buffer.redo_count, buffer.next_seq) == (2, 2, 2)
+    with pytest.raises(IndexError):
+        buffer.get(2)
+    assert buffer.redo() == 2 and buffer.redo() == 3
+    assert buffer[-1].get_result() == Decimal('1e400') + 1
+    buffer.undo()
+    buffer.undo()
+    buffer.append(Calculation(Decimal(9), Decimal(1), add))
+    assert buffer.redo_count == 0 and len(buffer) == 3
+    assert [calc.get_result() for calc in buffer] == [1, 2, 10]
+    with pytest.raises(IndexError):
+        buffer.redo()
+
+
+def test_undo_redo_updates_indexes():
+    """Test that queries see undone calculations disappear and redone ones return."""
+    history = CalculationsHistory
+    history.add_calculation(Calculation(Decimal(2), Decimal(3), add))
+    history.add_calculation(Calculation(Decimal(2), Decimal(3), multiply))
+    history.add_calculation(Calculation(Decimal(4), Decimal(4), add))
+    assert history.undo().get_result() == 8
+    assert [calc.get_result() for calc in history.find_by_operation('add')] == [5]
+    assert [calc.get_result() for calc in history.top_k(1)] == [6]
+    assert history.redo().get_result() == 8
+    assert [calc.get_result() for calc in history.top_k(1)] == [8]
+    assert history.redo() is None
+    for _ in range(3):
+        history.undo()
+    assert history.undo() is None and results(history) == []
+
+
+def test_undone_calculations_leave_the_index_lazily():
+    """Test that undone results are skipped by queries and dropped by the next add."""
+    history = SessionHistory(max_entries=10)
+    for number in (5, 9, 7):
+        history.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    history.undo()
+    history.undo()
+    assert [calc.get_result() for calc in history.top_k(2)] == [5]
+    assert [calc.get_result() for calc in history.find_by_result(6, 10)] == []
+    history.redo()
+    assert [calc.get_result() for calc in history.top_k(1, largest=False)] == [5]
+    history.add_calculation(Calculation(Decimal(1), Decimal(0), add))
+    assert [calc.get_result() for calc in history.find_by_result()] == [1, 5, 9]
+    assert history.redo() is None
+
+
+def test_checkpoints_restore_and_branch():
+    """Test restoring checkpoints in both directions, and dropping a discarded branch."""
+    history = SessionHistory(max_entries=5, max_bytes=10_000)
+    history.add_calculation(Calculation(Decimal(1), Decimal(0), add))
+    history.checkpoint('one')
+    history.add_calculation(Calculation(Decimal(2), Decimal(0), add))
+    history.add_calculation(Calculation(Decimal(3), Decimal(0), add))
+    history.checkpoint('three')
+    bytes_used = history.bytes_used
+    assert history.restore_checkpoint('one') == -2 and results(history) == [1]
+    assert history.restore_checkpoint('three') == 2 and results(history) == [1, 2, 3]
+    assert history.bytes_used == bytes_used
+    history.undo()
+    history.add_calculation(Calculation(Decimal(4), Decimal(0), add))
+    assert history.list_checkpoints() == {'one': 1}
+    with pytest.raises(ValueError):
+        history.restore_checkpoint('three')
+    history.clear_history()
+    assert history.list_checkpoints() == {} and history.bytes_used == 0
+
+
+def test_checkpoint_of_evicted_calculations():
+    """Test that a checkpoint taken before evictions restores what is left of it."""
+    history = CalculationsHistory
+    history.checkpoint('empty')
+    for number in range(7):
+        history.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    history.checkpoint('full')
+    assert history.list_checkpoints() == {'empty': 0, 'full': 5}
+    assert history.restore_checkpoint('empty') == -5 and results(history) == []
+    assert history.restore_checkpoint('full') == 5 and results(history) == [2, 3, 4, 5, 6]
+
+
+def test_undo_is_logged(tmp_path):
+    """Test that undos and redos survive a restart through the history log."""
+    path = str(tmp_path / "history.wal")
+    history = CalculationsHistory
+    history.attach_log(HistoryLog(path))
+    for number in range(7):
+        history.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    for _ in range(3):
+        history.undo()
+    history.redo()
+    history.detach_log()
+    expected = results(history)
+    assert expected == [2, 3, 4]
+
+    history.configure(max_entries=5)
+    history.attach_log(HistoryLog(path))
+    assert results(history) == expected
+
+
+def test_undo_and_redo_commands(run_app_with_input, monkeypatch, capfd):
+    """Test the undo, redo and history checkpoint commands."""
+    inputs = iter(['calculator add 1 2', 'history checkpoint start',
+                   'calculator multiply 3 4', 'undo', 'redo', 'redo', 'undo 2',
+                   'undo', 'history restore start', 'history checkpoints',
+                   'history restore nowhere', 'undo x', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "Undone: 3 multiply 4 = 12" in out
+    assert "Redone: 3 multiply 4 = 12" in out
+    assert "Nothing to redo." in out
+    assert "Undone: 1 add 2 = 3" in out and "Nothing to undo." in out
+    assert "Restored checkpoint 'start' (1 calculations redone)." in out
+    assert "start: 1 calculations" in out
+    assert "Error: No checkpoint named 'nowhere'." in out
+    assert "Usage: undo [COUNT], where COUNT is a positive integer." in out
@@ -0,0 +1,90 @@
+"""
+Unit tests for the queued logging pipeline.
+"""
+
+import logging
+import queue
+import threading
+import app.log_pipeline as log_pipeline
+from app.log_pipeline import (
+    DrainingQueueListener, DroppingQueueHandler, RateLimitFilter, stop_logging)
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that keeps the messages it handles, optionally waiting for a gate."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.messages = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(10)
+        self.messages.append(record.getMessage())
+
+
+def make_record(message, *args, level=logging.DEBUG):
+    """Create a log record for the given %-style message."""
+    return logging.LogRecord("app.test", level, __file__, 1, message, args, None)
+
+
+def test_queue_handler_drops_when_full():
+    """Test that a full queue drops records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for number in range(5):
+        handler.handle(make_record("Record %s", number))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_queue_handler_defers_formatting():
+    """Test that records are queued with their %-style arguments unformatted."""
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(make_record("Added calculation to history: %s %s %s", 1, "add", 2))
+    record = handler.queue.get_nowait()
+    assert record.msg == "Added calculation to history: %s %s %s"
+    assert record.getMessage() == "Added calculation to history: 1 add 2"
+
+
+def test_rate_limit_filter():
+    """Test that repeated messages are limited but warnings always pass."""
+    rate_limit = RateLimitFilter(rate=2)
+    results = [rate_limit.filter(make_record("Added %s", number)) for number in range(5)]
+    assert results == [True, True, False, False, False]
+    assert rate_limit.filter(make_record("Other message"))
+    assert rate_limit.filter(make_record("Added %s", 9, level=logging.WARNING))
+    assert rate_limit.dropped == 3
+
+
+def test_listener_stops_with_a_full_queue():
+    """Test that stopping waits for room for the sentinel instead of raising queue.Full."""
+    gate = threading.Event()
+    handler = RecordingHandler(gate)
+    listener = DrainingQueueListener(queue.Queue(1), handler)
+    listener.start()
+    listener.queue.put(make_record("First"))
+    while not listener.queue.empty():
+        pass  # The listener took the first record and waits in the handler
+    listener.queue.put(make_record("Second"))
+    threading.Timer(0.1, gate.set).start()
+    listener.stop()
+    assert handler.messages == ["First", "Second"]
+    assert listener.discarded == 0
+
+
+def test_stop_logging_reports_drops_to_the_handlers(monkeypatch):
+    """Test that the final drop counts reach the handlers after the listener stops."""
+    queue_handler = DroppingQueueHandler(queue.Queue(1))
+    queue_handler.dropped = 3
+    output = RecordingHandler()
+    listener = DrainingQueueListener(queue_handler.queue, output)
+    listener.start()
+    monkeypatch.setattr(log_pipeline, '_listener', listener)
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    try:
+        stop_logging()
+    finally:
+        root.removeHandler(queue_handler)
+    assert output.messages == ["Dropped log records: 3 queue full, 0 rate limited."]
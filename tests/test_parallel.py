@@ -0,0 +1,90 @@
+"""
+Unit tests for the process-pool batch backend of the Calculator class.
+"""
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal, localcontext
+import os
+import pytest
+from app.calculator import Calculator
+from app.calculator.parallel import get_executor, shutdown_executor, warm_up
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    """
+    Fixture sharing one warm two-process pool across the tests in this module.
+    """
+    warm_up(max_workers=2)
+    yield
+    shutdown_executor()
+
+
+def test_parallel_batch_keeps_input_order():
+    """
+    Test that results from several chunks come back in input order.
+    """
+    numbers = list(range(25))
+    result = Calculator.parallel_batch('multiply', numbers, [2] * 25,
+                                       max_workers=2, chunk_size=4)
+    assert result.values == [number * 2 for number in numbers]
+    assert result.error_count == 0
+
+
+def test_parallel_batch_reports_errors_per_element():
+    """
+    Test that a zero divisor fails only its own element.
+    """
+    result = Calculator.parallel_batch('divide', [Decimal(6), Decimal(1), Decimal(9)],
+                                       [Decimal(3), Decimal(0), Decimal(3)],
+                                       max_workers=2, chunk_size=2)
+    assert result.values == [Decimal(2), None, Decimal(3)]
+    assert isinstance(result.errors[1], ZeroDivisionError)
+    assert result.error_count == 1
+
+
+def test_parallel_batch_failed_element():
+    """
+    Test that an element of the wrong type fails alone, not with its whole chunk.
+    """
+    result = Calculator.parallel_batch('add', [1, 'a', 3, 4], [1, 1, 1, 1],
+                                       max_workers=2, chunk_size=2)
+    assert result.values == [2, None, 4, 5]
+    assert isinstance(result.errors[1], TypeError)
+    assert result.error_count == 1
+
+
+def test_broken_pool_is_replaced():
+    """
+    Test that a pool whose worker died is replaced instead of failing every later batch.
+    """
+    broken = get_executor(2)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+    result = Calculator.parallel_batch('multiply', [2, 3], [5, 5], max_workers=2)
+    assert result.values == [10, 15]
+    assert get_executor(2) is not broken
+
+
+def test_parallel_batch_uses_decimal_context():
+    """
+    Test that workers use the caller's Decimal precision.
+    """
+    with localcontext() as context:
+        context.prec = 50
+        result = Calculator.parallel_batch('divide', [Decimal(1)], [Decimal(3)], max_workers=2)
+    assert len(str(result.values[0])) == 52
+
+
+def test_pool_is_reused():
+    """
+    Test that the warm pool is reused across calls with the same worker count.
+    """
+    assert get_executor(2) is get_executor(2)
+
+
+def test_parallel_batch_length_mismatch():
+    """
+    Test that operand sequences of different lengths are rejected.
+    """
+    with pytest.raises(ValueError):
+        Calculator.parallel_batch('add', [1, 2], [1], max_workers=2)
@@ -0,0 +1,73 @@
+"""
+Unit tests for the cached plugin manifest and lazy command registration.
+
+Each test builds a throw-away plugins package in a temporary directory so that the
+manifest can be generated, reused and invalidated without touching the real plugins.
+"""
+
+import os
+import sys
+import pytest
+from app import plugin_manifest
+from app.commands import CommandHandler
+from app.plugin_manifest import PluginManifest
+
+PLUGIN_SOURCE = '''
+from app.commands import Command
+
+class HelloCommand(Command):
+    def execute(self, *args):
+        print("{message}")
+'''
+
+
+@pytest.fixture
+def plugins(tmp_path, monkeypatch):
+    """Create an importable 'fakeplugins' package with a single 'hello' plugin."""
+    package_dir = tmp_path / "fakeplugins"
+    (package_dir / "hello").mkdir(parents=True)
+    (package_dir / "__init__.py").write_text("", encoding="utf-8")
+    (package_dir / "hello" / "__init__.py").write_text(
+        PLUGIN_SOURCE.format(message="Hello from plugin"), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield str(package_dir)
+    for module_name in [name for name in sys.modules if name.startswith("fakeplugins")]:
+        del sys.modules[module_name]
+
+
+def test_manifest_is_generated_and_reused(plugins, tmp_path, monkeypatch):
+    """Test that a valid manifest is reused without discovering plugins again."""
+    manifest = PluginManifest(plugins, "fakeplugins", str(tmp_path / "manifest.json"))
+    assert manifest.commands() == [["hello", "fakeplugins.hello", "HelloCommand"]]
+
+    def fail_discovery(*args, **kwargs):
+        raise AssertionError("plugins should not be discovered again")
+    monkeypatch.setattr(plugin_manifest, "discover_plugins", fail_discovery)
+    assert manifest.commands() == [["hello", "fakeplugins.hello", "HelloCommand"]]
+
+
+def test_manifest_is_invalidated_by_changes(plugins, tmp_path):
+    """Test that adding a plugin makes the manifest stale."""
+    manifest = PluginManifest(plugins, "fakeplugins", str(tmp_path / "manifest.json"))
+    manifest.commands()
+    os.makedirs(os.path.join(plugins, "wave"))
+    with open(os.path.join(plugins, "wave", "__init__.py"), "w", encoding="utf-8") as source:
+        source.write(PLUGIN_SOURCE.format(message="Wave"))
+    assert [entry[0] for entry in manifest.commands()] == ["hello", "wave"]
+
+
+def test_lazy_command_imports_on_first_execute(plugins, tmp_path, capfd):
+    """Test that the plugin module is imported only when its command runs."""
+    manifest = PluginManifest(plugins, "fakeplugins", str(tmp_path / "manifest.json"))
+    manifest.commands()
+    del sys.modules["fakeplugins.hello"]
+
+    handler = CommandHandler()
+    for command_name, module_name, class_name in manifest.commands():
+        handler.register_lazy_command(command_name, module_name, class_name)
+    assert "fakeplugins.hello" not in sys.modules
+    assert not handler.commands["hello"].is_loaded()
+
+    assert handler.execute_command("hello")
+    assert "fakeplugins.hello" in sys.modules
+    assert capfd.readouterr().out == "Hello from plugin\n"
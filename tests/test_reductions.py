@@ -0,0 +1,102 @@
+"""
+This test suite verifies the streaming reductions: compensated float sums, exact
+Decimal, int and Fraction accumulation, constant memory on generators, and the
+'reduce' command.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+from itertools import chain
+import tracemalloc
+import pytest
+from app.calculator import Calculator
+from app.calculator.backends import DecimalBackend
+from app.calculator.reductions import CHUNK_SIZE, reduce_numbers
+
+
+def test_float_sum_is_compensated():
+    """Test that float sums do not accumulate rounding error."""
+    values = [0.1] * 10000
+    assert sum(values) != 1000.0
+    assert Calculator.sum(values).value == 1000.0
+    assert Calculator.sum([1e16, 1.0, -1e16] * CHUNK_SIZE).value == CHUNK_SIZE
+    result = Calculator.sum(0.1 for _ in range(3 * CHUNK_SIZE + 1))
+    assert result.count == 3 * CHUNK_SIZE + 1
+    assert result.value == pytest.approx((3 * CHUNK_SIZE + 1) / 10, rel=1e-16)
+
+
+def test_float_sum_follows_float_arithmetic():
+    """Test overflow and infinities, where math.fsum would raise."""
+    assert Calculator.sum([1e308, 1e308, -1e308]).value == 1e308
+    assert Calculator.sum([1e308, 1e308]).value == float('inf')
+    total = Calculator.sum([float('inf'), float('-inf')]).value
+    assert total != total  # pylint: disable=comparison-with-itself
+
+
+def test_decimal_sum_is_exact_until_rounded():
+    """Test that Decimal sums are exact and rounded to the backend's context once."""
+    values = [Decimal('1e30'), Decimal('1'), Decimal('-1e30')]
+    assert Calculator.sum(values).value == Decimal('1')
+    backend = DecimalBackend(5)
+    assert Calculator.sum(['0.333333'] * 3, backend).value == Decimal('1.0000')
+    assert Calculator.mean(['1', '1', '2'], backend).value == Decimal('1.3333')
+    assert Calculator.product(['1.5'] * 3, backend).value == Decimal('3.375')
+    assert Calculator.product(['1.11111'] * 2, backend).value == Decimal('1.2346')
+
+
+def test_exact_types_and_backends():
+    """Test int and Fraction reductions and the choice of backend."""
+    assert Calculator.product(range(1, 26)).value == 15511210043330985984000000
+    assert Calculator.mean([1, 2]).value == Fraction(3, 2)
+    assert Calculator.sum([Fraction(1, 3)] * 3).value == 1
+    assert Calculator.mean(['1', '2.5'], backend='float').value == 1.75
+    assert Calculator.sum([]).count == 0
+    assert Calculator.product([], backend='int').value == 1
+    with pytest.raises(ValueError):
+        Calculator.mean([])
+    with pytest.raises(ValueError):
+        Calculator.sum([1, 2.5], backend='int')
+    with pytest.raises(ValueError):
+        reduce_numbers('median', [1])
+
+
+def test_int_streams_widen():
+    """Test that ints followed by a float, Decimal or Fraction widen to its type."""
+    assert Calculator.sum([1, 2.5]).value == 3.5
+    assert Calculator.mean([1, 2, Decimal('0.5')]).value == Decimal('1.166666666666666666666666667')
+    assert Calculator.product([2, Fraction(1, 3)]).value == Fraction(2, 3)
+    # The exact int sum of the earlier chunks is converted once
+    result = Calculator.sum(chain([2 ** 60] * CHUNK_SIZE, [0.5]))
+    assert result.value == CHUNK_SIZE * 2 ** 60 + 0.5 and result.count == CHUNK_SIZE + 1
+    assert type(Calculator.sum([1, 2.0]).value) is float
+    assert Calculator.sum([1, 2]).value == 3
+    with pytest.raises(ValueError):
+        Calculator.sum([1, 'x'])
+
+
+def test_generators_use_constant_memory():
+    """Test that a generator is reduced without being held in memory."""
+    count = 20 * CHUNK_SIZE
+    tracemalloc.start()
+    try:
+        result = Calculator.sum(float(number) for number in range(count))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert result.count == count and result.value == count * (count - 1) / 2
+    assert peak < count * 24 / 4
+    assert result.seconds > 0 and result.values_per_second > 0
+
+
+def test_reduce_command(run_app_with_input, monkeypatch, capfd, tmp_path):
+    """Test the reduce command with numbers on the command line and in a file."""
+    numbers_file = tmp_path / "numbers.txt"
+    numbers_file.write_text("0.1 0.2\n\n0.3\n", encoding='utf-8')
+    inputs = iter(['reduce sum 1 2 3.5', f'reduce mean file={numbers_file} backend=fraction',
+                   'reduce product 2 x', 'reduce median 1', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "Sum of 3 values: 6.5" in out
+    assert "Mean of 3 values: 1/5" in out
+    assert "Reduced 3 values in " in out and " values/s)." in out
+    assert "Error: 'x' is not a number" in out
+    assert "Usage: reduce sum|product|mean [NUMBER ...] [file=PATH] [backend=NAME]" in out
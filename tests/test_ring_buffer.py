@@ -0,0 +1,40 @@
+"""
+Unit tests for the RingBuffer class.
+"""
+import pytest
+from app.calculator.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_overwrites_oldest():
+    """
+    Test that appending to a full buffer overwrites the oldest item.
+    """
+    buffer = RingBuffer(3)
+    for item in range(5):
+        buffer.append(item)
+    assert buffer.is_full()
+    assert list(buffer) == [2, 3, 4]
+    assert buffer[0] == 2
+    assert buffer[-1] == 4
+
+
+def test_ring_buffer_index_and_clear():
+    """
+    Test indexing bounds and clearing the buffer.
+    """
+    buffer = RingBuffer(2)
+    buffer.append('a')
+    assert len(buffer) == 1
+    with pytest.raises(IndexError):
+        _ = buffer[1]
+    buffer.clear()
+    assert len(buffer) == 0
+    assert not buffer
+
+
+def test_ring_buffer_invalid_capacity():
+    """
+    Test that a capacity below 1 is rejected.
+    """
+    with pytest.raises(ValueError):
+        RingBuffer(0)
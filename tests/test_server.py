@@ -0,0 +1,196 @@
+"""
+This test suite verifies the HTTP/JSON service mode on localhost.
+
+The server runs on its own event loop in a background thread, and the tests talk to it
+with `http.client`, which keeps the connection alive between requests.
+"""
+
+import asyncio
+import http.client
+import json
+import threading
+import pytest
+from app import App
+from app.calculator.session_history import SessionHistory
+from app.server import CalculatorServer
+from app.sessions import SessionManager
+
+
+@pytest.fixture
+def server_address():
+    """Start a server on a free localhost port and stop it after the test."""
+    app = App()
+    app.register_commands()
+    server = CalculatorServer(app.command_handler, SessionManager(max_entries=3))
+    loop = asyncio.new_event_loop()
+    address = loop.run_until_complete(server.start('127.0.0.1', 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield address
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def request(connection, method, path, body=None, headers=None):
+    """Send a request and return the status, the decoded body and the session id."""
+    payload = None if body is None else json.dumps(body)
+    connection.request(method, path, body=payload, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read()), response.getheader('X-Session-Id')
+
+
+def test_calculate_and_keep_alive(server_address):
+    """Test that several requests share one connection and one session."""
+    connection = http.client.HTTPConnection(*server_address)
+    status, body, session_id = request(connection, 'POST', '/calculate',
+                                       {'operation': 'add', 'a': '0.1', 'b': 0.2})
+    assert (status, body) == (200, {'result': '0.3'})
+    status, body, second_id = request(connection, 'POST', '/calculate',
+                                      {'operation': 'divide', 'a': 1, 'b': 4})
+    assert body == {'result': '0.25'}
+    assert second_id == session_id
+
+    _, body, _ = request(connection, 'GET', '/history')
+    assert [entry['result'] for entry in body['history']] == ['0.3', '0.25']
+    connection.close()
+
+
+def test_calculate_with_numeric_backends(server_address):
+    """Test that /calculate uses the requested backend, or else the session's."""
+    connection = http.client.HTTPConnection(*server_address)
+    _, body, _ = request(connection, 'POST', '/calculate',
+                         {'operation': 'divide', 'a': 1, 'b': 3, 'backend': 'fraction'})
+    assert body == {'result': '1/3'}
+    _, body, _ = request(connection, 'POST', '/commands/backend', {'args': ['float']})
+    assert body == {'ok': True, 'output': "Numeric backend: float\n"}
+    _, body, _ = request(connection, 'POST', '/calculate',
+                         {'operation': 'add', 'a': '0.1', 'b': '0.2'})
+    assert body == {'result': '0.30000000000000004'}
+    status, body, _ = request(connection, 'POST', '/calculate',
+                              {'operation': 'add', 'a': '0.5', 'b': 1, 'backend': 'int'})
+    assert status == 400 and body == {'error': "Invalid number: '0.5'."}
+    status, body, _ = request(connection, 'POST', '/calculate',
+                              {'operation': 'add', 'a': 1, 'b': 1, 'backend': 'complex'})
+    assert status == 400 and "Unknown numeric backend 'complex'" in body['error']
+    connection.close()
+
+
+def test_sessions_have_their_own_history(server_address):
+    """Test that sessions named by header do not see each other's calculations."""
+    connection = http.client.HTTPConnection(*server_address)
+    for session_id, number in (('alice', 1), ('bob', 2), ('alice', 3)):
+        request(connection, 'POST', '/calculate', {'operation': 'multiply', 'a': number, 'b': 2},
+                {'X-Session-Id': session_id})
+    _, alice, _ = request(connection, 'GET', '/history', headers={'X-Session-Id': 'alice'})
+    _, bob, _ = request(connection, 'GET', '/history', headers={'X-Session-Id': 'bob'})
+    assert [entry['result'] for entry in alice['history']] == ['2', '6']
+    assert [entry['result'] for entry in bob['history']] == ['4']
+
+    request(connection, 'DELETE', '/history', headers={'X-Session-Id': 'alice'})
+    _, alice, _ = request(connection, 'GET', '/history', headers={'X-Session-Id': 'alice'})
+    assert alice == {'history': []}
+    connection.close()
+
+
+def test_history_is_bounded(server_address):
+    """Test that a session keeps at most its configured number of calculations."""
+    connection = http.client.HTTPConnection(*server_address)
+    for number in range(5):
+        request(connection, 'POST', '/calculate', {'operation': 'add', 'a': number, 'b': 0})
+    _, body, _ = request(connection, 'GET', '/history')
+    assert [entry['a'] for entry in body['history']] == ['2', '3', '4']
+    connection.close()
+
+
+def test_batch(server_address):
+    """Test a batch body with a per-element error."""
+    connection = http.client.HTTPConnection(*server_address)
+    status, body, _ = request(connection, 'POST', '/batch',
+                              {'operation': 'divide', 'a': [1, '1.5', 3], 'b': [2, 0, '0.5']})
+    assert status == 200
+    assert body == {'values': ['0.5', None, '6'], 'errors': [False, True, False]}
+    connection.close()
+
+
+def test_commands(server_address):
+    """Test listing and running commands, with their printed output."""
+    connection = http.client.HTTPConnection(*server_address)
+    _, body, _ = request(connection, 'GET', '/commands')
+    assert 'calculator' in body['commands']
+    assert 'exit' not in body['commands']
+
+    status, body, _ = request(connection, 'POST', '/commands/calculator',
+                              {'args': ['add', 2, 3]})
+    assert status == 200
+    assert body == {'ok': True, 'output': "The result of 2 add 3 is: 5\n"}
+
+    status, body, _ = request(connection, 'POST', '/commands/calculator', {'args': ['add']})
+    assert status == 400
+    assert "needs more arguments" in body['error']
+    status, _, _ = request(connection, 'POST', '/commands/exit')
+    assert status == 404
+    connection.close()
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ('POST', '/calculate', {'operation': 'power', 'a': 1, 'b': 2}, 400),
+    ('POST', '/calculate', {'operation': 'add', 'a': 'x', 'b': 2}, 400),
+    ('POST', '/calculate', {'operation': 'divide', 'a': 1, 'b': 0}, 400),
+    ('POST', '/batch', {'operation': 'add', 'a': [1], 'b': [1, 2]}, 400),
+    ('GET', '/calculate', None, 405),
+    ('GET', '/unknown', None, 404),
+])
+def test_errors(server_address, method, path, body, status):
+    """Test that bad requests get an error status and message."""
+    connection = http.client.HTTPConnection(*server_address)
+    response_status, response, _ = request(connection, method, path, body)
+    assert response_status == status
+    assert 'error' in response
+    connection.close()
+
+
+def test_arithmetic_errors_are_named(server_address):
+    """Test that Decimal signals are reported by name, not as a list of classes."""
+    connection = http.client.HTTPConnection(*server_address)
+    status, body, _ = request(connection, 'POST', '/calculate',
+                              {'operation': 'multiply', 'a': '1e999999', 'b': 10})
+    assert (status, body) == (400, {'error': 'Overflow'})
+    connection.close()
+
+
+def test_unexpected_errors_answer_500(server_address, monkeypatch):
+    """Test that a failing handler answers 500 and leaves the server running."""
+    def fail(_history):
+        raise RuntimeError("broken")
+    monkeypatch.setattr(SessionHistory, 'snapshot', fail)
+    connection = http.client.HTTPConnection(*server_address)
+    status, body, _ = request(connection, 'GET', '/history')
+    assert (status, body) == (500, {'error': "Internal server error."})
+    status, _, _ = request(connection, 'POST', '/calculate',
+                           {'operation': 'add', 'a': 1, 'b': 2})
+    assert status == 200
+    connection.close()
+
+
+def test_invalid_json(server_address):
+    """Test that a body that is not JSON is rejected."""
+    connection = http.client.HTTPConnection(*server_address)
+    connection.request('POST', '/calculate', body='{not json')
+    response = connection.getresponse()
+    assert response.status == 400
+    assert "Invalid JSON" in json.loads(response.read())['error']
+    connection.close()
+
+
+def test_commands_record_to_the_session(server_address):
+    """Test that the calculator command records to the requesting session's history."""
+    connection = http.client.HTTPConnection(*server_address)
+    request(connection, 'POST', '/commands/calculator', {'args': ['add', 1, 1]},
+            {'X-Session-Id': 'carol'})
+    _, carol, _ = request(connection, 'GET', '/history', headers={'X-Session-Id': 'carol'})
+    _, other, _ = request(connection, 'GET', '/history')
+    assert [entry['result'] for entry in carol['history']] == ['2']
+    assert other == {'history': []}
+    connection.close()
@@ -0,0 +1,133 @@
+"""
+This test suite verifies session-scoped histories: the quotas of `SessionHistory`,
+session creation and reaping in `SessionManager`, and commands recording to the
+active session's history.
+"""
+
+import asyncio
+import time
+from decimal import Decimal
+import pytest
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.operations import add
+from app.calculator.session_history import SessionHistory, calculation_size
+from app.commands import CommandHandler
+from app.plugins.calculator import CalculatorCommand
+from app.sessions import SessionManager, activate, current_history, current_session
+
+
+def make_calculation(number):
+    """Return an evaluated Decimal calculation."""
+    calculation = Calculation(Decimal(number), Decimal(1), add)
+    calculation.get_result()
+    return calculation
+
+
+def test_entry_quota_evicts_oldest():
+    """Test that the oldest calculations are evicted beyond the entry quota."""
+    history = SessionHistory(max_entries=3)
+    for number in range(5):
+        history.add_calculation(make_calculation(number))
+    assert [calc.number_one for calc in history.snapshot()] == [2, 3, 4]
+    assert history.get_last_calculation().number_one == 4
+    stats = history.get_eviction_stats()
+    assert (stats['size'], stats['evicted']) == (3, 2)
+
+
+def test_byte_quota_evicts_oldest():
+    """Test that the byte quota bounds the estimated memory of the history."""
+    size = calculation_size(make_calculation(1))
+    history = SessionHistory(max_entries=100, max_bytes=size * 2)
+    for number in range(10):
+        history.add_calculation(make_calculation(number))
+    assert len(history) == 2
+    assert history.bytes_used <= size * 2
+    history.clear_history()
+    assert history.get_eviction_stats()['bytes'] == 0
+    assert history.get_last_calculation() is None
+
+
+def test_invalid_quota():
+    """Test that quotas must be positive."""
+    with pytest.raises(ValueError):
+        SessionHistory(max_entries=0)
+
+
+def test_manager_creates_and_closes_sessions():
+    """Test that sessions are created on demand and found again by id."""
+    manager = SessionManager(max_entries=5)
+    first = manager.get()
+    assert manager.get(first.session_id) is first
+    named = manager.get('alice')
+    assert named.history is not first.history
+    assert len(manager) == 2
+    assert manager.close('alice')
+    assert 'alice' not in manager
+
+
+def test_reap_idle_sessions():
+    """Test that only sessions idle longer than the timeout are removed."""
+    manager = SessionManager(idle_timeout=60)
+    manager.get('old').last_active -= 120
+    manager.get('new')
+    assert manager.reap_idle() == 1
+    assert 'old' not in manager and 'new' in manager
+    assert manager.stats()['reaped'] == 1
+
+
+def test_reaper_thread():
+    """Test that the background reaper removes idle sessions."""
+    manager = SessionManager(idle_timeout=0.05)
+    manager.get('idle')
+    manager.start_reaper(interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while 'idle' in manager and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop_reaper()
+    assert 'idle' not in manager
+
+
+def test_current_history_follows_the_active_session():
+    """Test that the process-wide history is used outside a session."""
+    assert current_history() is CalculationsHistory.default
+    session = SessionManager().get()
+    with activate(session):
+        assert current_session() is session
+        assert current_history() is session.history
+    assert current_session() is None
+
+
+def test_calculator_records_to_the_session(capfd):
+    """Test that the calculator command writes to the active session only."""
+    CalculationsHistory.clear_history()
+    manager = SessionManager()
+    alice, bob = manager.get('alice'), manager.get('bob')
+    command = CalculatorCommand()
+    with activate(alice):
+        command.execute('add', '1', '2')
+    with activate(bob):
+        command.execute('multiply', '3', '4')
+        command.execute('history')
+    out = capfd.readouterr().out
+    assert "3 multiply 4 = 12" in out
+    assert "1 add 2" not in out.split("Calculation History:")[1]
+    assert [calc.get_result() for calc in alice.history.snapshot()] == [3]
+    assert len(CalculationsHistory.get_history()) == 0
+
+
+def test_session_follows_commands_into_the_thread_pool(capfd):
+    """Test that execute_command_async runs sync commands in the caller's session."""
+    handler = CommandHandler()
+    handler.register_command('calculator', CalculatorCommand())
+    session = SessionManager().get()
+
+    async def run():
+        with activate(session):
+            return await handler.execute_command_async('calculator add 5 5')
+
+    assert asyncio.run(run())
+    capfd.readouterr()
+    assert session.history.get_last_calculation().get_result() == 10
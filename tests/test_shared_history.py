@@ -0,0 +1,132 @@
+"""
+This test suite verifies the shared history: one writer per segment, lock-free reads
+across processes, ring overwrites, and its use by CalculationsHistory and the
+'history shared' command.
+"""
+
+from decimal import Decimal
+import multiprocessing
+import pytest
+from app.calculator.calculation_history import CalculationsHistory
+from app.calculator.calculations import Calculation
+from app.calculator.operations import add, multiply
+from app.calculator.shared_history import SharedHistory
+
+
+def write_calculations(path, first, count, ready, release):
+    """Publish calculations from another process, and keep its segment until released."""
+    shared = SharedHistory(path)
+    for number in range(first, first + count):
+        shared.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    ready.set()
+    release.wait(30)
+    shared.close()
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    """Return the path of a new shared history file."""
+    return str(tmp_path / "history.shm")
+
+
+def test_processes_share_one_history(shared_path):
+    """Test that writers in several processes get their own segments and see each other."""
+    SharedHistory(shared_path, segments=3, capacity=100).close()
+    context = multiprocessing.get_context('spawn')
+    ready = [context.Event(), context.Event()]
+    release = context.Event()
+    writers = [context.Process(target=write_calculations,
+                               args=(shared_path, first, 50, event, release))
+               for first, event in zip((0, 1000), ready)]
+    for writer in writers:
+        writer.start()
+    try:
+        assert all(event.wait(60) for event in ready)
+        shared = SharedHistory(shared_path)
+        results = sorted(int(calc.get_result()) for calc in shared.snapshot())
+        assert results == list(range(50)) + list(range(1000, 1050))
+        # The two other segments are taken, so this process gets the last one
+        shared.add_calculation(Calculation(Decimal(7), Decimal(6), multiply))
+        assert shared.get_eviction_stats()['segment'] == 2
+        assert len(shared) == 101
+        shared.close()
+    finally:
+        release.set()
+        for writer in writers:
+            writer.join(60)
+    assert all(writer.exitcode == 0 for writer in writers)
+
+
+def test_segments_are_exclusive_within_a_process(shared_path):
+    """Test that two writers in one process do not share a segment."""
+    first = SharedHistory(shared_path, segments=2, capacity=4)
+    second = SharedHistory(shared_path)
+    third = SharedHistory(shared_path)
+    first.add_calculation(Calculation(Decimal(1), Decimal(1), add))
+    second.add_calculation(Calculation(Decimal(2), Decimal(2), add))
+    with pytest.raises(OSError):
+        third.add_calculation(Calculation(Decimal(3), Decimal(3), add))
+    assert [calc.get_result() for calc in third.snapshot()] == [2, 4]
+    assert {first.get_eviction_stats()['segment'],
+            second.get_eviction_stats()['segment']} == {0, 1}
+    for shared in (first, second, third):
+        shared.close()
+
+
+def test_full_shared_history_does_not_break_the_local_one(shared_path):
+    """Test that calculations are still recorded when no segment is free."""
+    owner = SharedHistory(shared_path, segments=1, capacity=4)
+    assert owner.claim()
+    shared = SharedHistory(shared_path)
+    assert not shared.claim()
+    CalculationsHistory.attach_shared(shared)
+    CalculationsHistory.add_calculation(Calculation(Decimal(2), Decimal(3), add))
+    assert CalculationsHistory.get_last_calculation().get_result() == 5
+    assert shared.skipped_count == 1
+    CalculationsHistory.detach_shared()
+    owner.close()
+
+
+def test_ring_overwrites_and_incremental_reads(shared_path):
+    """Test that readers see only the newest calculations and only once."""
+    shared = SharedHistory(shared_path, segments=1, capacity=4)
+    reader = SharedHistory(shared_path)
+    for number in range(3):
+        shared.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    assert [int(calc.get_result()) for calc in reader.read_new()] == [0, 1, 2]
+    for number in range(3, 10):
+        shared.add_calculation(Calculation(Decimal(number), Decimal(0), add))
+    assert [int(calc.get_result()) for calc in reader.read_new()] == [6, 7, 8, 9]
+    assert reader.read_new() == []
+    assert shared.get_eviction_stats() == {'capacity': 4, 'size': 4, 'evicted': 6,
+                                           'segment': 0}
+    assert not shared.add_calculation(Calculation(Decimal('1' * 200), Decimal(1), add))
+    shared.clear_history()
+    shared.add_calculation(Calculation(Decimal(5), Decimal(5), add))
+    assert [calc.get_result() for calc in reader.snapshot()] == [10]
+    assert [calc.get_result() for calc in reader.read_new()] == [10]
+    shared.close()
+    reader.close()
+
+
+def test_rejects_other_files(tmp_path):
+    """Test that a file that is not a shared history is not mapped."""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b'x' * 256)
+    with pytest.raises(ValueError):
+        SharedHistory(str(path))
+    with pytest.raises(ValueError):
+        SharedHistory(str(tmp_path / "new.shm"), slot_size=100)
+
+
+def test_history_shared_command(run_app_with_input, monkeypatch, capfd, shared_path):
+    """Test that the app publishes its calculations and lists the shared history."""
+    other = SharedHistory(shared_path, segments=2, capacity=10)
+    other.add_calculation(Calculation(Decimal(20), Decimal(2), multiply))
+    monkeypatch.setenv("HISTORY_SHARED_FILE", shared_path)
+    inputs = iter(['calculator add 1 2', 'history shared', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "Shared Calculation History:\n20 multiply 2 = 40\n1 add 2 = 3\n" in out
+    CalculationsHistory.detach_shared()
+    assert [calc.get_result() for calc in other.snapshot()] == [40, 3]
+    other.close()
@@ -0,0 +1,62 @@
+"""
+This test suite verifies that importing the app has no side effects, that the
+bootstrap step is idempotent, and that the startup report covers every phase
+and plugin.
+"""
+
+import os
+import subprocess
+import sys
+from app import App
+from app.startup_report import profile_startup
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, cwd):
+    """Run a Python snippet with the project on the path and return its stdout."""
+    environment = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    environment.pop("HISTORY_MAX_ENTRIES", None)
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=environment,
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Test that importing the app neither creates 'logs' nor loads '.env'."""
+    (tmp_path / ".env").write_text("HISTORY_MAX_ENTRIES=5\n", encoding="utf-8")
+    out = run_python(
+        "import logging, os, app\n"
+        "from app.calculator import Calculator\n"
+        "print(os.path.exists('logs'), os.getenv('HISTORY_MAX_ENTRIES'),"
+        " len(logging.getLogger().handlers))", tmp_path)
+    assert out.split() == ["False", "None", "0"]
+
+
+def test_bootstrap_is_idempotent(tmp_path):
+    """Test that bootstrapping twice configures logging and the history only once."""
+    (tmp_path / ".env").write_text("HISTORY_MAX_ENTRIES=5\n", encoding="utf-8")
+    out = run_python(
+        "import logging\n"
+        "from app import App\n"
+        "from app.calculator.calculation_history import CalculationsHistory\n"
+        "App.bootstrap(); App.bootstrap(); App()\n"
+        "print(len(logging.getLogger().handlers), CalculationsHistory.max_entries)",
+        tmp_path)
+    assert out.split() == ["1", "5"]
+    assert (tmp_path / "logs" / "app.log").exists()
+
+
+def test_startup_report_covers_phases_and_plugins():
+    """Test that the report times every startup phase and every plugin."""
+    report = profile_startup(import_seconds=0.5)
+    phase_names = [name for name, _ in report.phases]
+    assert phase_names[0] == "import app"
+    assert "register commands" in phase_names
+    assert {name for name, _ in report.plugins} >= {"calculator", "greet", "exit"}
+    assert "menu" not in {name for name, _ in report.plugins}
+    text = report.format()
+    assert "Plugins (import + init):" in text
+    assert "500.000" in text
+    assert report.total() >= 0.5
+    assert App._bootstrapped  # pylint: disable=protected-access
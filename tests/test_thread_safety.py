@@ -0,0 +1,68 @@
+"""
+This test suite runs the multi-threaded stress scenarios from `benchmarks.stress` at a
+small size, and checks that the command layer keeps no per-call state.
+"""
+
+from app.calculator.calculation_history import CalculationsHistory
+from app.commands import Command, LazyCommand
+from app.plugins.calculator import CalculatorCommand
+from benchmarks.stress import main, run_threads, stress_calculator_command, stress_history
+
+
+def teardown_function():
+    """Restore a default-sized history after each test."""
+    CalculationsHistory.configure()
+
+
+def test_history_survives_concurrent_adds():
+    """Test that no calculation is lost, duplicated or reordered."""
+    problems, _ = stress_history(thread_count=8, per_thread=500)
+    assert problems == []
+
+
+def test_history_eviction_under_concurrency():
+    """Test that the eviction counter stays exact when threads overflow the history."""
+    problems, _ = stress_history(thread_count=8, per_thread=500, capacity=100)
+    assert problems == []
+    stats = CalculationsHistory.get_eviction_stats()
+    assert (stats['capacity'], stats['size'], stats['evicted']) == (100, 100, 3900)
+    assert stats['max_bytes'] is None
+
+
+def test_calculator_command_from_many_threads():
+    """Test that one CalculatorCommand instance serves many threads correctly."""
+    problems, _ = stress_calculator_command(thread_count=8, per_thread=50)
+    assert problems == []
+
+
+def test_calculator_command_is_stateless(capfd):
+    """Test that executing the calculator leaves nothing on the instance."""
+    command = CalculatorCommand()
+    assert command.execute('add', '1', '2')
+    capfd.readouterr()
+    assert not vars(command)
+
+
+class CountingCommand(Command):
+    """Command that counts its instances."""
+    instances = 0
+
+    def __init__(self):
+        CountingCommand.instances += 1
+
+    def execute(self, *args):
+        return True
+
+
+def test_lazy_command_resolves_once(monkeypatch):
+    """Test that concurrent first calls create a single command instance."""
+    monkeypatch.setattr(CountingCommand, 'instances', 0)
+    lazy = LazyCommand(__name__, 'CountingCommand')
+    run_threads(8, lambda _: lazy.execute())
+    assert CountingCommand.instances == 1
+
+
+def test_stress_command_line(capsys):
+    """Test the stress harness command line."""
+    assert main(['--threads', '4', '--per-thread', '20']) == 0
+    assert "calculator: 80 operations on 4 threads" in capsys.readouterr().out
@@ -0,0 +1,132 @@
+"""
+This test suite verifies reactive variables: definitions, incremental recomputation
+in topological order, errors, 'ans', and the 'let' and 'evaluate' commands.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.calculator.expressions import ExpressionError
+from app.calculator.variables import VariableGraph
+from app.commands import parse_command_line
+from app.sessions import current_variables
+
+
+@pytest.fixture(autouse=True)
+def clear_variables():
+    """Forget the process-wide variables after each test."""
+    yield
+    current_variables().clear()
+
+
+def names(variables):
+    """Return the names of a list of variables."""
+    return [variable.name for variable in variables]
+
+
+def test_only_dependents_are_recomputed():
+    """Test that redefining a variable recomputes its dependents, each after its inputs."""
+    graph = VariableGraph()
+    graph.define('x', '5')
+    graph.define('unrelated', '1')
+    graph.define('y', 'x * 3')
+    graph.define('z', 'y + x')
+    graph.define('w', 'z - y')
+    assert names(graph.define('x', '2')) == ['x', 'y', 'z', 'w']
+    assert graph.values() == {'x': 2, 'unrelated': 1, 'y': 6, 'z': 8, 'w': 2}
+    # 'x' is unchanged, so nothing depending on it is recomputed
+    assert names(graph.define('x', '1 + 1')) == ['x']
+
+
+def test_recomputation_stops_at_unchanged_values():
+    """Test that a dependent whose value does not change does not propagate."""
+    graph = VariableGraph()
+    graph.define('x', '4')
+    graph.define('zero', 'x - x')
+    graph.define('total', 'zero + 1')
+    assert names(graph.define('x', '9')) == ['x', 'zero']
+
+
+def test_redefinition_reorders_the_graph():
+    """Test that a variable made to depend on a later one is still computed after it."""
+    graph = VariableGraph()
+    graph.define('a', '1')
+    graph.define('b', 'a + 1')
+    graph.define('c', '10')
+    graph.define('a', 'c * 2')
+    assert graph.values() == {'a': 20, 'b': 21, 'c': 10}
+    assert names(graph.define('c', '5')) == ['c', 'a', 'b']
+    assert graph.get('b').value == 11
+
+
+def test_long_chain():
+    """Test incremental recomputation over thousands of chained variables."""
+    graph = VariableGraph()
+    graph.define('cell0', '1')
+    for number in range(1, 3000):
+        graph.define(f'cell{number}', f'cell{number - 1} + 1')
+    graph.define('side', '7')
+    assert len(graph.define('cell0', '2')) == 3000
+    assert graph.get('cell2999').value == 3001
+    assert names(graph.define('side', '8')) == ['side']
+
+
+def test_invalid_definitions():
+    """Test that cycles, unknown names and reserved names are rejected."""
+    graph = VariableGraph()
+    graph.define('x', '1')
+    graph.define('y', 'x + 1')
+    for name, source in (('x', 'y * 2'), ('x', 'x + 1'), ('z', 'q + 1'), ('ans', '1'),
+                         ('2x', '1'), ('z', '1 +'), ('z', 'ans')):
+        with pytest.raises(ExpressionError):
+            graph.define(name, source)
+    assert graph.values() == {'x': 1, 'y': 2}
+
+
+def test_errors_propagate_until_fixed():
+    """Test that a failing variable leaves its dependents without a value."""
+    graph = VariableGraph()
+    graph.define('d', '0')
+    graph.define('q', '1 / d')
+    graph.define('r', 'q + 1')
+    assert graph.get('q').error == "Cannot divide by zero."
+    assert graph.get('r').value is None and graph.get('r').error == "'q' has no value."
+    with pytest.raises(ExpressionError):
+        graph.evaluate('r * 2')
+    graph.define('d', '4')
+    assert graph.values() == {'d': 4, 'q': Decimal('0.25'), 'r': Decimal('1.25')}
+
+
+def test_ans_is_read_once():
+    """Test that 'ans' is the last result and is bound when a variable is defined."""
+    graph = VariableGraph()
+    graph.ans = Fraction(1, 4)
+    graph.define('x', 'ans * 2')
+    assert graph.evaluate('x + 1') == Decimal('1.5')
+    assert graph.ans == Decimal('1.5')
+    graph.define('y', '1')
+    graph.define('x', 'y + ans')
+    assert graph.get('x').value == Decimal('2.5')
+    graph.define('y', '2')
+    assert graph.get('x').value == Decimal('3.5')
+
+
+def test_assignments_run_the_let_command():
+    """Test that assignment lines are routed to the 'let' command."""
+    assert parse_command_line('y = x * 3') == ('let', ('y = x * 3',))
+    assert parse_command_line('total=1') == ('let', ('total=1',))
+    assert parse_command_line('evaluate x == 3')[0] == 'evaluate'
+    assert parse_command_line('calculator add 1 2 backend=int')[0] == 'calculator'
+
+
+def test_let_and_evaluate_commands(run_app_with_input, monkeypatch, capfd):
+    """Test defining variables and using them and 'ans' from the REPL."""
+    inputs = iter(['x = 5', 'y = x * 3', 'calculator add 1 2', 'z = ans + y',
+                   'let x = 2', 'evaluate z / 2', 'let', 'w = nope', 'exit'])
+    out = run_app_with_input(monkeypatch, capfd, inputs).out
+    assert "y = 15" in out
+    assert "z = 18" in out
+    assert "Recomputed 2 dependent variables:\n  y = 6\n  z = 9\n" in out
+    assert "The result of z / 2 is: 4.5" in out
+    assert "x = 2\ny = 6\nz = 9\n" in out
+    assert "Error: Unknown variable 'nope'." in out